@@ -43,6 +43,9 @@ def create_app(test_config=None):
     from app.models.exercise_set import ExerciseSet
     from app.models.challenge import Challenge, ChallengeParticipant
     from app.models.friendship import Friendship
+    from app.models.background_job import BackgroundJob
+    from app.models.personal_record import PersonalRecord
+    from app.models.user_activity_daily import UserActivityDaily
     
     # Set up user loader
     @login_manager.user_loader
@@ -54,7 +57,7 @@ def create_app(test_config=None):
         # Create tables if they don't exist
         try:
             # Check if the exercise tables exist
-            from sqlalchemy import inspect
+            from sqlalchemy import inspect, text
             inspector = inspect(db.engine)
             tables = inspector.get_table_names()
             
@@ -78,12 +81,77 @@ def create_app(test_config=None):
                     ChallengeParticipant.__table__.create(db.engine)
                     app.logger.info("Created ChallengeParticipant table")
                 
+                if 'background_job' not in tables:
+                    BackgroundJob.__table__.create(db.engine)
+                    app.logger.info("Created BackgroundJob table")
+                
+                if 'personal_record' not in tables:
+                    PersonalRecord.__table__.create(db.engine)
+                    app.logger.info("Created PersonalRecord table; run 'flask rebuild-personal-records'")
+                
+                if 'user_activity_daily' not in tables:
+                    UserActivityDaily.__table__.create(db.engine)
+                    app.logger.info("Created UserActivityDaily table; run 'flask backfill-activity-rollup'")
+                
                 # Check if we need to add the subtype column to the workout table
                 workout_columns = [c['name'] for c in inspector.get_columns('workout')]
                 if 'subtype' not in workout_columns:
                     db.session.execute("ALTER TABLE workout ADD COLUMN subtype VARCHAR(50)")
                     db.session.commit()
                     app.logger.info("Added subtype column to Workout table")
+                
+                # Check if we need to add the strava_id column to the workout table
+                if 'strava_id' not in workout_columns:
+                    db.session.execute(text("ALTER TABLE workout ADD COLUMN strava_id VARCHAR(50)"))
+                    db.session.execute(text("CREATE UNIQUE INDEX ix_workout_strava_id ON workout (strava_id)"))
+                    db.session.commit()
+                    app.logger.info("Added strava_id column to Workout table")
+                
+                # Create any missing indexes for the hot query paths
+                for model in (User, Workout, Exercise, ExerciseSet, Friendship, ChallengeParticipant):
+                    table = model.__table__
+                    if table.name not in tables:
+                        continue
+                    existing_indexes = {i['name'] for i in inspector.get_indexes(table.name)}
+                    for index in table.indexes:
+                        if index.name not in existing_indexes:
+                            index.create(db.engine)
+                            app.logger.info(f"Created index {index.name} on {table.name} table")
+
+                # Check that exercises and sets are deleted with their workout
+                # (SQLite tables keep their foreign keys; deletes cascade in the app there)
+                if db.engine.dialect.name == 'postgresql':
+                    for table, column, referred in (('exercise', 'workout_id', 'workout'), ('exercise_set', 'exercise_id', 'exercise')):
+                        for fk in inspector.get_foreign_keys(table):
+                            if fk['constrained_columns'] == [column] and fk['options'].get('ondelete') != 'CASCADE':
+                                db.session.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT {fk["name"]}'))
+                                db.session.execute(text(
+                                    f'ALTER TABLE {table} ADD CONSTRAINT {fk["name"]} FOREIGN KEY ({column}) '
+                                    f'REFERENCES {referred} (id) ON DELETE CASCADE'
+                                ))
+                                db.session.commit()
+                                app.logger.info(f"Added ON DELETE CASCADE to {table}.{column}")
+
+                # Check if we need to add the decay marker column to the user table
+                user_columns = [c['name'] for c in inspector.get_columns('user')]
+                if 'last_decay_applied_at' not in user_columns:
+                    db.session.execute(text('ALTER TABLE "user" ADD COLUMN last_decay_applied_at TIMESTAMP'))
+                    db.session.commit()
+                    app.logger.info("Added last_decay_applied_at column to User table")
+                
+                if 'strava_sync_cursor' not in user_columns:
+                    db.session.execute(text('ALTER TABLE "user" ADD COLUMN strava_sync_cursor TIMESTAMP'))
+                    db.session.commit()
+                    app.logger.info("Added strava_sync_cursor column to User table")
+                
+                # Check if we need to add the maintained progress columns to the challenge_participant table
+                if 'challenge_participant' in tables:
+                    participant_columns = [c['name'] for c in inspector.get_columns('challenge_participant')]
+                    if 'current_value' not in participant_columns:
+                        db.session.execute(text('ALTER TABLE challenge_participant ADD COLUMN current_value FLOAT DEFAULT 0'))
+                        db.session.execute(text('ALTER TABLE challenge_participant ADD COLUMN workout_count INTEGER DEFAULT 0'))
+                        db.session.commit()
+                        app.logger.info("Added progress columns to ChallengeParticipant table; run 'flask rebuild-challenge-progress'")
         except Exception as e:
             app.logger.error(f"Error creating tables: {e}")
     
@@ -105,7 +173,7 @@ def create_app(test_config=None):
             return "Internal Server Error", 500
     
     # Register blueprints
-    from app.routes import auth, main, workout, profile, friends, challenges
+    from app.routes import auth, main, workout, profile, friends, challenges, leaderboard
     app.register_blueprint(auth.bp)
     app.register_blueprint(main.bp)
     app.register_blueprint(workout.bp)
@@ -113,5 +181,10 @@ def create_app(test_config=None):
     # app.register_blueprint(strava.bp)  # Temporarily disabled
     app.register_blueprint(friends.bp)
     app.register_blueprint(challenges.bp)
+    app.register_blueprint(leaderboard.bp)
+    
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
     
     return app
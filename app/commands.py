@@ -0,0 +1,155 @@
+import click
+
+
+def _echo_xp_report(report, show):
+    for change in report['changes'][:show]:
+        click.echo(
+            f"{change['username']}: XP {change['old_xp']} -> {change['new_xp']}, "
+            f"level {change['old_level']} -> {change['new_level']}"
+        )
+    if len(report['changes']) > show:
+        click.echo(f"... and {len(report['changes']) - show} more")
+    click.echo(
+        f"Scanned {report['scanned']} users, {'would update' if report['dry_run'] else 'updated'} "
+        f"{report['updated']} (XP {report['xp_delta']:+d}) in {report['elapsed']:.2f}s"
+    )
+    if 'error' in report:
+        raise click.ClickException(report['error'])
+
+
+def register_commands(app):
+    """Register the app's Flask CLI commands."""
+
+    @app.cli.command('apply-xp-decay')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Users per UPDATE batch.')
+    def apply_xp_decay_command(chunk_size):
+        """Apply the nightly XP decay to all inactive users."""
+        from app.tasks import apply_xp_decay_to_all_users
+
+        report = apply_xp_decay_to_all_users(chunk_size=chunk_size)
+        click.echo(
+            f"Scanned {report['scanned']} users in {report['chunks']} chunks, "
+            f"decayed {report['decayed']} users by {report['xp_removed']} XP "
+            f"in {report['elapsed']:.2f}s"
+        )
+        if 'error' in report:
+            raise click.ClickException(report['error'])
+
+    @app.cli.command('reconcile-user-stats')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Users per UPDATE batch.')
+    def reconcile_user_stats_command(chunk_size):
+        """Recompute every user's workout stat counters from their workouts."""
+        from app.services.user_stats import reconcile_user_stats
+
+        report = reconcile_user_stats(chunk_size=chunk_size)
+        click.echo(
+            f"Scanned {report['scanned']} users, updated {report['updated']} "
+            f"in {report['elapsed']:.2f}s"
+        )
+        if 'error' in report:
+            raise click.ClickException(report['error'])
+
+    @app.cli.command('reconcile-xp')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Users per UPDATE batch.')
+    @click.option('--dry-run', is_flag=True, help='Report the changes without writing them.')
+    @click.option('--show', default=20, show_default=True, help='Changed users to list.')
+    def reconcile_xp_command(chunk_size, dry_run, show):
+        """Recompute every user's XP and level from their workouts."""
+        from app.services.xp_reconcile import reconcile_all_xp
+
+        _echo_xp_report(reconcile_all_xp(chunk_size=chunk_size, dry_run=dry_run), show)
+
+    @app.cli.command('relevel-users')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Users per UPDATE batch.')
+    @click.option('--dry-run', is_flag=True, help='Report the changes without writing them.')
+    @click.option('--show', default=20, show_default=True, help='Changed users to list.')
+    def relevel_users_command(chunk_size, dry_run, show):
+        """Recompute every user's level from their current XP."""
+        from app.services.xp_reconcile import relevel_all
+
+        _echo_xp_report(relevel_all(chunk_size=chunk_size, dry_run=dry_run), show)
+
+    @app.cli.command('rebuild-challenge-progress')
+    def rebuild_challenge_progress_command():
+        """Recompute every challenge participant's stored progress from workouts."""
+        from app.services.challenge_progress import rebuild_all
+
+        report = rebuild_all()
+        click.echo(
+            f"Rebuilt {report['participants']} participants in "
+            f"{report['challenges']} challenges in {report['elapsed']:.2f}s"
+        )
+        if 'error' in report:
+            raise click.ClickException(report['error'])
+
+    @app.cli.command('rebuild-personal-records')
+    def rebuild_personal_records_command():
+        """Rebuild every user's personal records from their exercise sets."""
+        from app.services.personal_records import rebuild_all
+
+        report = rebuild_all()
+        click.echo(f"Rebuilt personal records for {report['users']} users in {report['elapsed']:.2f}s")
+        if 'error' in report:
+            raise click.ClickException(report['error'])
+
+    @app.cli.command('backfill-activity-rollup')
+    @click.option('--chunk-size', default=500, show_default=True, help='User ids per INSERT ... SELECT.')
+    def backfill_activity_rollup_command(chunk_size):
+        """Rebuild the daily activity rollup from every user's workouts."""
+        from app.services.activity_rollup import rebuild_all
+
+        report = rebuild_all(chunk_size=chunk_size)
+        click.echo(
+            f"Rebuilt {report['rows']} rollup rows for {report['users']} users "
+            f"in {report['chunks']} chunks in {report['elapsed']:.2f}s"
+        )
+        if 'error' in report:
+            raise click.ClickException(report['error'])
+
+    @app.cli.command('strava-backfill')
+    @click.argument('username')
+    @click.option('--budget', type=int, default=None, help='Max Strava API requests for this run.')
+    @click.option('--page-size', default=100, show_default=True, help='Activities per request.')
+    @click.option('--fake', type=int, default=None, help='Use a local fake client with N synthetic activities.')
+    def strava_backfill_command(username, budget, page_size, fake):
+        """Import a user's whole Strava history, resuming from the last checkpoint."""
+        from flask import current_app
+        from app.models.user import User
+        from app.services.strava import StravaService, RateBudget
+
+        user = User.query.filter_by(username=username).first()
+        if not user:
+            raise click.ClickException(f"User {username} not found")
+
+        client = None
+        if fake:
+            from app.services.strava_fake import FakeStravaClient
+            client = FakeStravaClient(activity_count=fake)
+            user.strava_access_token = user.strava_access_token or 'fake-access-token'
+
+        service = StravaService(
+            client_id=current_app.config.get('STRAVA_CLIENT_ID'),
+            client_secret=current_app.config.get('STRAVA_CLIENT_SECRET'),
+            client=client
+        )
+        rate_budget = RateBudget(
+            max_requests=budget if budget is not None else current_app.config.get('STRAVA_RATE_BUDGET', 90),
+            min_interval=current_app.config.get('STRAVA_REQUEST_INTERVAL', 0)
+        )
+        report = service.backfill_activities(user, page_size=page_size, rate_budget=rate_budget)
+        click.echo(
+            f"{report['pages']} pages, {report['fetched']} activities fetched, "
+            f"{report['imported']} imported, "
+            + ("history complete" if report['complete'] else "stopped early; run again to resume")
+        )
+
+    @app.cli.command('jobs-worker')
+    @click.option('--burst', is_flag=True, help='Exit once no job is due instead of polling.')
+    @click.option('--max-jobs', type=int, default=None, help='Stop after running this many jobs.')
+    @click.option('--sleep', 'idle_sleep', default=2.0, show_default=True, help='Seconds between polls when idle.')
+    def jobs_worker_command(burst, max_jobs, idle_sleep):
+        """Run queued background jobs such as Strava syncs."""
+        from app.services.jobs import work
+
+        processed = work(max_jobs=max_jobs, idle_sleep=idle_sleep, burst=burst)
+        click.echo(f"Ran {processed} jobs")
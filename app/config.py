@@ -18,4 +18,7 @@ class Config:
     # Strava API Configuration
     STRAVA_CLIENT_ID = os.environ.get('STRAVA_CLIENT_ID')
     STRAVA_CLIENT_SECRET = os.environ.get('STRAVA_CLIENT_SECRET') 
+    # Max Strava API requests per sync/backfill run and minimum seconds between them
+    STRAVA_RATE_BUDGET = int(os.environ.get('STRAVA_RATE_BUDGET', 90))
+    STRAVA_REQUEST_INTERVAL = float(os.environ.get('STRAVA_REQUEST_INTERVAL', 0))
     BASE_URL = os.environ.get("BASE_URL", "http://localhost:5000")
\ No newline at end of file
@@ -0,0 +1,44 @@
+from app import db
+from datetime import datetime
+import json
+
+class BackgroundJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)  # e.g. 'strava_sync'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    payload = db.Column(db.Text)  # JSON arguments for the handler
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Not picked up before this time
+    locked_at = db.Column(db.DateTime)  # When a worker claimed the job
+    last_error = db.Column(db.Text)
+    result = db.Column(db.Text)  # JSON result of the last successful run
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_background_job_status_run_at', 'status', 'run_at'),
+        db.Index('ix_background_job_user_type', 'user_id', 'job_type'),
+    )
+
+    def __repr__(self):
+        return f'<BackgroundJob {self.id}: {self.job_type} {self.status}>'
+
+    def get_payload(self):
+        return json.loads(self.payload) if self.payload else {}
+
+    def to_dict(self):
+        """Status fields exposed to the status endpoint."""
+        return {
+            'id': self.id,
+            'type': self.job_type,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
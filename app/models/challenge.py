@@ -24,57 +24,70 @@ class Challenge(db.Model):
     def get_participant(self, user_id):
         return self.participants.filter_by(user_id=user_id).first()
 
-    def calculate_progress(self, user_id):
-        """Calculate a user's progress towards the challenge goal."""
-        participant = self.get_participant(user_id)
-        if not participant:
-            return {'progress': 0, 'current_value': 0}
-
-        # Get relevant workouts within the challenge timeframe
-        workouts = Workout.query.filter(
-            Workout.user_id == user_id,
+    def workout_filters(self):
+        """SQL conditions selecting the workouts that count towards this challenge."""
+        # Only workouts within the challenge timeframe
+        filters = [
             Workout.created_at >= self.start_date,
             Workout.created_at <= self.end_date
-        )
+        ]
 
         if self.workout_type:
             if self.workout_type == 'strength':
                 # For strength challenges, include all strength workout types
-                workouts = workouts.filter(Workout.type == 'strength')
+                filters.append(Workout.type == 'strength')
             elif self.workout_type.startswith('strength_'):
                 # For specific strength workout types (e.g., strength_upper, strength_push)
-                workouts = workouts.filter(
-                    Workout.type == 'strength',
-                    Workout.subtype == self.workout_type
-                )
+                filters.append(Workout.type == 'strength')
+                filters.append(Workout.subtype == self.workout_type)
             else:
-                workouts = workouts.filter_by(type=self.workout_type)
-
-        total = 0
-        for workout in workouts:
-            if self.goal_type == 'distance':
-                # Convert distance based on goal unit
-                if workout.distance:
-                    if self.goal_unit == 'miles':
-                        # Workout distance is in km, convert to miles
-                        total += workout.distance * 0.621371
-                    else:
-                        # Keep as kilometers
-                        total += workout.distance
-            elif self.goal_type == 'workouts':
-                total += 1
-            # Add more goal types as needed
-
-        progress = (total / self.goal_value) * 100 if self.goal_value > 0 else 0
-        
-        # Update completion status
-        if progress >= 100 and not participant.completed:
-            participant.completed = True
-            participant.completed_at = datetime.utcnow()
-            db.session.commit()
-        
+                filters.append(Workout.type == self.workout_type)
+
+        return filters
+
+    def matches_workout(self, workout):
+        """Check a workout against the same rules as workout_filters."""
+        if not workout.created_at or not (self.start_date <= workout.created_at <= self.end_date):
+            return False
+
+        if self.workout_type:
+            if self.workout_type == 'strength':
+                return workout.type == 'strength'
+            elif self.workout_type.startswith('strength_'):
+                return workout.type == 'strength' and workout.subtype == self.workout_type
+            else:
+                return workout.type == self.workout_type
+
+        return True
+
+    def goal_value_for(self, workout_count, total_distance):
+        """Convert workout count and distance (km) into the challenge's goal unit."""
+        if self.goal_type == 'distance':
+            # Convert distance based on goal unit
+            if self.goal_unit == 'miles':
+                # Workout distance is in km, convert to miles
+                return (total_distance or 0) * 0.621371
+            # Keep as kilometers
+            return total_distance or 0
+        elif self.goal_type == 'workouts':
+            return workout_count
+        # Add more goal types as needed
+        return 0
+
+    def progress_for(self, current_value):
+        """Percentage of the goal reached for a goal-unit value."""
+        return (current_value / self.goal_value) * 100 if self.goal_value > 0 else 0
+
+    def calculate_progress(self, user_id):
+        """Get a user's progress towards the challenge goal."""
+        participant = self.get_participant(user_id)
+        if not participant:
+            return {'progress': 0, 'current_value': 0}
+
+        # current_value is maintained on workout writes (see services.challenge_progress)
+        total = participant.current_value or 0
         return {
-            'progress': progress,
+            'progress': self.progress_for(total),
             'current_value': total
         }
 
@@ -85,10 +98,13 @@ class ChallengeParticipant(db.Model):
     joined_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     completed = db.Column(db.Boolean, default=False)
     completed_at = db.Column(db.DateTime)
+    current_value = db.Column(db.Float, default=0.0)  # Progress in the challenge's goal unit
+    workout_count = db.Column(db.Integer, default=0)  # Matching workouts in the challenge window
 
     # Relationships
     user = db.relationship('User', backref='challenge_participations')
 
     __table_args__ = (
         db.UniqueConstraint('challenge_id', 'user_id', name='unique_challenge_participant'),
+        db.Index('ix_challenge_participant_user', 'user_id'),
     ) 
\ No newline at end of file
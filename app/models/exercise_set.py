@@ -2,10 +2,13 @@ from app import db
 
 class ExerciseSet(db.Model):
     __tablename__ = 'exercise_set'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        db.Index('ix_exercise_set_exercise_number', 'exercise_id', 'set_number'),
+        {'extend_existing': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    exercise_id = db.Column(db.Integer, db.ForeignKey('exercise.id'), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercise.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     set_number = db.Column(db.Integer, nullable=False)
     reps = db.Column(db.Integer)
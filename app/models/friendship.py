@@ -12,4 +12,10 @@ class Friendship(db.Model):
     # Ensure unique friendships
     __table_args__ = (
         db.UniqueConstraint('user_id', 'friend_id', name='unique_friendship'),
-    ) 
\ No newline at end of file
+        # Reverse lookups; unique_friendship already covers user_id
+        db.Index('ix_friendship_friend_status', 'friend_id', 'status'),
+        # Incoming requests stay a small index however many friendships are accepted
+        db.Index('ix_friendship_pending', 'friend_id', 'created_at',
+                 postgresql_where=db.text("status = 'pending'"),
+                 sqlite_where=db.text("status = 'pending'")),
+    )
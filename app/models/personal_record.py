@@ -0,0 +1,18 @@
+from app import db
+from datetime import datetime
+
+class PersonalRecord(db.Model):
+    __tablename__ = 'personal_record'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'exercise_name', 'metric', name='uq_personal_record_user_exercise_metric'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    exercise_name = db.Column(db.String(100), nullable=False)
+    metric = db.Column(db.String(20), nullable=False)  # 'max_weight', 'max_reps' or 'max_volume'
+    value = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<PersonalRecord {self.exercise_name} {self.metric}={self.value}>'
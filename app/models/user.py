@@ -3,6 +3,7 @@ from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from app.models.friendship import Friendship
+from app.services import dashboard, friend_graph, friend_leaderboard, leveling, xp_decay
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -15,6 +16,7 @@ class User(UserMixin, db.Model):
     last_workout_date = db.Column(db.DateTime, nullable=True)
     xp_decay_rate = db.Column(db.Float, default=0.05)  # 5% decay per day after grace period
     xp_decay_grace_days = db.Column(db.Integer, default=3)  # Days before decay starts
+    last_decay_applied_at = db.Column(db.DateTime, nullable=True)  # Last time decay was written to xp
     distance_unit = db.Column(db.String(20), default='kilometers')  # Add distance unit preference
     
     # Stats fields
@@ -33,6 +35,11 @@ class User(UserMixin, db.Model):
     strava_refresh_token = db.Column(db.String(100))
     strava_token_expires_at = db.Column(db.DateTime)
     strava_last_sync = db.Column(db.DateTime)
+    strava_sync_cursor = db.Column(db.DateTime)  # Start time of the newest imported activity (backfill checkpoint)
+    
+    __table_args__ = (
+        db.Index('ix_user_xp_id', xp.desc(), id),  # Leaderboard pages and rank counts
+    )
     
     # Relationships
     workouts = db.relationship('Workout', backref='user', lazy='dynamic')
@@ -55,22 +62,37 @@ class User(UserMixin, db.Model):
     @property
     def computed_total_workouts(self):
         """Calculate total number of workouts."""
-        return self.workouts.count()
+        return self._stats()['total_workouts']
 
     @property
     def computed_total_distance(self):
         """Calculate total distance in kilometers."""
-        return sum(workout.distance or 0 for workout in self.workouts)
+        return self._stats()['total_distance']
 
     @property
     def computed_total_duration(self):
         """Calculate total duration in minutes."""
-        return sum(workout.duration or 0 for workout in self.workouts)
+        return self._stats()['total_duration']
 
     @property
     def computed_total_calories(self):
         """Calculate total calories burned."""
-        return sum(workout.calories or 0 for workout in self.workouts)
+        return self._stats()['total_calories']
+    
+    def compute_stats(self):
+        """Calculate all stats from workouts in one aggregate query.
+
+        The result is kept on the instance, so the computed_total_*
+        properties share one query; calling this again refreshes it.
+        """
+        from app.services.user_stats import compute_user_totals
+        self._computed_stats = compute_user_totals(self.id)
+        return self._computed_stats
+
+    def _stats(self):
+        """Stats from the last compute_stats() call, computing them on first use."""
+        stats = getattr(self, '_computed_stats', None)
+        return stats if stats is not None else self.compute_stats()
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -98,99 +120,52 @@ class User(UserMixin, db.Model):
     
     def calculate_level(self):
         """Calculate the user's level based on their XP."""
-        remaining_xp = self.xp
-        level = 1
-        threshold = 300  # Base XP needed for level 2
-        increase = 400   # Initial increase
-
-        while remaining_xp >= threshold:
-            remaining_xp -= threshold
-            level += 1
-            threshold = increase
-            increase += 100
-
-        return level
+        return leveling.level_for_xp(self.xp)
     
     def add_xp(self, amount):
         """Add XP and update level if necessary."""
         old_level = self.level
         self.xp += amount
+        dashboard.invalidate(self.id)
         new_level = self.calculate_level()
         if new_level > self.level:
             self.level = new_level
             return True
         return False
     
+    def adjust_xp(self, delta):
+        """Add or remove XP (never below 0) and recompute the level either way."""
+        self.xp = max(0, (self.xp or 0) + delta)
+        self.level = self.calculate_level()
+        dashboard.invalidate(self.id)
+    
     def update_level(self):
         """Update the user's level based on current XP."""
         self.level = self.calculate_level()
         db.session.commit()
         
+    @property
+    def effective_xp(self):
+        """XP after projecting decay that has not been written yet."""
+        xp_to_lose, _ = self.calculate_xp_decay()
+        return max(0, (self.xp or 0) - xp_to_lose)
+    
+    @property
+    def effective_level(self):
+        """Level for the decay-adjusted XP."""
+        return leveling.level_for_xp(self.effective_xp)
+        
     def get_next_level_xp(self):
         """Calculate XP needed for next level."""
-        # First ensure level is up to date
-        current_level = self.calculate_level()
-        if current_level != self.level:
-            self.level = current_level
-            db.session.commit()
-            
-        # Calculate XP needed for next level
-        total_for_next_level = 0
-        threshold = 300
-        increase = 400
-        
-        # Calculate total XP needed up to next level
-        for level in range(1, self.level + 1):
-            total_for_next_level += threshold
-            threshold = increase
-            increase += 100
-            
-        return total_for_next_level - self.xp
+        return leveling.xp_to_next(self.effective_xp)
     
     def get_level_progress(self):
         """Calculate progress towards next level (0-100)."""
-        if self.level == 1:
-            return min(100, (self.xp / 300) * 100)
-
-        current_level_start = 0
-        threshold = 300
-        increase = 400
-
-        # Calculate XP at start of current level
-        for _ in range(1, self.level):
-            current_level_start += threshold
-            threshold = increase
-            increase += 100
-
-        # Calculate progress within current level
-        xp_in_level = self.xp - current_level_start
-        return min(100, (xp_in_level / threshold) * 100)
+        return leveling.progress_pct(self.effective_xp)
     
     def get_rank(self):
         """Get the user's rank based on total XP."""
-        xp = self.xp
-        if xp < 2000:
-            return "Bronze"
-        elif xp < 5000:
-            return "Silver"
-        elif xp < 10000:
-            return "Gold"
-        elif xp < 20000:
-            return "Platinum"
-        elif xp < 35000:
-            return "Diamond"
-        elif xp < 55000:
-            return "Master"
-        elif xp < 80000:
-            return "Grandmaster"
-        elif xp < 110000:
-            return "Elite"
-        elif xp < 150000:
-            return "Legend"
-        elif xp < 200000:
-            return "Mythic"
-        else:
-            return "GOAT"
+        return leveling.rank_for_xp(self.effective_xp)
     
     def send_friend_request(self, friend):
         """Send a friend request to another user."""
@@ -222,6 +197,8 @@ class User(UserMixin, db.Model):
             
         friendship.status = 'accepted'
         db.session.commit()
+        friend_graph.invalidate(friendship.user_id, friendship.friend_id)
+        friend_leaderboard.invalidate(friendship.user_id, friendship.friend_id)
         return True, "Friend request accepted!"
         
     def reject_friend_request(self, friendship_id):
@@ -232,6 +209,8 @@ class User(UserMixin, db.Model):
             
         friendship.status = 'rejected'
         db.session.commit()
+        friend_graph.invalidate(friendship.user_id, friendship.friend_id)
+        friend_leaderboard.invalidate(friendship.user_id, friendship.friend_id)
         return True, "Friend request rejected."
         
     def remove_friend(self, friend_id):
@@ -244,25 +223,14 @@ class User(UserMixin, db.Model):
         if friendship:
             db.session.delete(friendship)
             db.session.commit()
+            friend_graph.invalidate(self.id, friend_id)
+            friend_leaderboard.invalidate(self.id, friend_id)
             return True, "Friend removed successfully."
         return False, "Friendship not found."
         
     def get_friends(self):
         """Get all accepted friends."""
-        sent_friendships = Friendship.query.filter_by(
-            user_id=self.id, status='accepted'
-        ).all()
-        received_friendships = Friendship.query.filter_by(
-            friend_id=self.id, status='accepted'
-        ).all()
-        
-        friends = []
-        for friendship in sent_friendships:
-            friends.append(User.query.get(friendship.friend_id))
-        for friendship in received_friendships:
-            friends.append(User.query.get(friendship.user_id))
-        
-        return friends
+        return friend_graph.get_friends(self.id)
         
     def get_pending_friend_requests(self):
         """Get pending friend requests received by the user."""
@@ -273,44 +241,51 @@ class User(UserMixin, db.Model):
         if not self.last_workout_date:
             return 0, None
             
-        days_since_workout = (datetime.utcnow() - self.last_workout_date).days
+        now = datetime.utcnow()
+        days_since_workout = (now - self.last_workout_date).days
         if days_since_workout <= self.xp_decay_grace_days:
             return 0, self.xp_decay_grace_days - days_since_workout
             
-        days_in_decay = days_since_workout - self.xp_decay_grace_days
-        decay_multiplier = 1 - pow(1 - self.xp_decay_rate, days_in_decay)
-        xp_to_lose = int(self.xp * decay_multiplier)
+        days = xp_decay.pending_decay_days(
+            self.last_workout_date, self.last_decay_applied_at, self.xp_decay_grace_days, now
+        )
+        xp_to_lose = xp_decay.xp_lost(self.xp, self.xp_decay_rate, days)
         
         return xp_to_lose, self.xp_decay_grace_days - days_since_workout
     
-    def apply_xp_decay(self):
-        """Apply XP decay if necessary."""
+    def settle_xp_decay(self):
+        """Write pending XP decay to xp and level without committing."""
         xp_to_lose, _ = self.calculate_xp_decay()
         if xp_to_lose > 0:
             self.xp = max(0, self.xp - xp_to_lose)
-            self.update_level()
-            return xp_to_lose
-        return 0
+            self.level = self.calculate_level()
+            self.last_decay_applied_at = datetime.utcnow()
+            dashboard.invalidate(self.id)
+        return xp_to_lose
+    
+    def apply_xp_decay(self):
+        """Apply XP decay if necessary."""
+        xp_to_lose = self.settle_xp_decay()
+        if xp_to_lose > 0:
+            db.session.commit()
+        return xp_to_lose
     
     def update_stats(self):
         """Update stored stats from computed values."""
-        self.total_workouts = self.computed_total_workouts
-        self.total_distance = self.computed_total_distance
-        self.total_duration = self.computed_total_duration
-        self.total_calories = self.computed_total_calories
+        for name, value in self.compute_stats().items():
+            setattr(self, name, value)
         db.session.commit()
 
     def update_last_workout(self):
-        """Update the last workout timestamp."""
-        try:
-            self.last_workout_date = datetime.utcnow()
-            self.update_stats()  # Update stats when workout is added
-            db.session.commit()
-        except Exception as e:
-            # If the column doesn't exist, silently fail
-            db.session.rollback()
-            print(f"Warning: Could not update last_workout_date: {e}")
-            pass
+        """Update the last workout timestamp (no commit)."""
+        # Write decay from the inactivity streak that is ending
+        self.settle_xp_decay()
+        self.last_workout_date = datetime.utcnow()
+
+@db.event.listens_for(User, 'expire')
+def _forget_computed_stats(user, attrs):
+    # Commits and refreshes expire the instance; recompute stats after them
+    user.__dict__.pop('_computed_stats', None)
 
 @login_manager.user_loader
 def load_user(id):
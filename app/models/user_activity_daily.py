@@ -0,0 +1,21 @@
+from app import db
+
+class UserActivityDaily(db.Model):
+    __tablename__ = 'user_activity_daily'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', 'type', 'subtype', name='uq_user_activity_daily_bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)  # UTC day of the workouts' created_at
+    type = db.Column(db.String(50), nullable=False)
+    subtype = db.Column(db.String(50), nullable=False, default='')  # '' when the workouts have no subtype
+    workouts = db.Column(db.Integer, nullable=False, default=0)
+    distance = db.Column(db.Float, nullable=False, default=0.0)
+    duration = db.Column(db.Integer, nullable=False, default=0)
+    calories = db.Column(db.Integer, nullable=False, default=0)
+    xp = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<UserActivityDaily {self.user_id} {self.day} {self.type}/{self.subtype}: {self.workouts}>'
@@ -14,15 +14,27 @@ class Workout(db.Model):
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     xp_earned = db.Column(db.Integer)
+    strava_id = db.Column(db.String(50), unique=True, index=True)  # Strava activity ID for imported workouts
     
     # Relationships
-    exercises = db.relationship('Exercise', back_populates='workout', lazy='dynamic', cascade="all, delete-orphan")
+    exercises = db.relationship('Exercise', back_populates='workout', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Keyset pagination of a user's workouts, optionally filtered by type or subtype
+        db.Index('ix_workout_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_workout_user_type_created', 'user_id', 'type', 'created_at', 'id'),
+        db.Index('ix_workout_user_subtype_created', 'user_id', 'subtype', 'created_at', 'id'),
+    )
 
     def __repr__(self):
         return f'<Workout {self.id}: {self.type}>'
     
-    def calculate_xp(self):
-        """Calculate XP earned for this workout."""
+    def calculate_xp(self, exercise_count=None):
+        """Calculate XP earned for this workout.
+
+        Pass exercise_count when the exercises are known in memory to skip
+        counting them in the database.
+        """
         base_xp = 50  # Base XP for completing any workout
         
         # Duration bonus (every 10 minutes = +5 XP)
@@ -37,7 +49,9 @@ class Workout(db.Model):
         # Exercise bonus for strength (+10 XP per exercise)
         exercise_bonus = 0
         if self.type == 'strength':
-            exercise_bonus = self.exercises.count() * 10
+            if exercise_count is None:
+                exercise_count = self.exercises.count()
+            exercise_bonus = exercise_count * 10
         
         total_xp = base_xp + duration_bonus + intensity_bonus + distance_bonus + exercise_bonus
         self.xp_earned = total_xp
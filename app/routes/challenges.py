@@ -4,6 +4,7 @@ from flask_login import login_required, current_user
 from app import db
 from app.models.challenge import Challenge, ChallengeParticipant
 from app.models.user import User
+from app.services import challenge_leaderboard, challenge_progress
 from sqlalchemy import text
 
 bp = Blueprint('challenges', __name__)
@@ -49,6 +50,10 @@ def new():
             challenge.participants.append(participant)
             
             db.session.add(challenge)
+            db.session.flush()
+            
+            # Count the creator's existing workouts in the challenge window
+            challenge_progress.rebuild_challenge(challenge)
             db.session.commit()
             
             flash('Challenge created successfully!', 'success')
@@ -63,56 +68,15 @@ def new():
 @login_required
 def view(challenge_id):
     challenge = Challenge.query.get_or_404(challenge_id)
-    participants = challenge.participants.all()
-    
-    # Calculate progress for each participant
-    participant_progress = []
-    for participant in participants:
-        progress_data = challenge.calculate_progress(participant.user_id)
-        
-        # Get workout count for this participant in the challenge period
-        # Handle different workout type mappings
-        workout_type_filter = ""
-        workout_params = {
-            'user_id': participant.user_id,
-            'start_date': challenge.start_date,
-            'end_date': challenge.end_date
-        }
-        
-        if challenge.workout_type == 'cardio':
-            workout_type_filter = "type = 'cardio'"
-        elif challenge.workout_type == 'strength':
-            # For strength challenges, include all strength workout types
-            workout_type_filter = "type = 'strength'"
-        elif challenge.workout_type.startswith('strength_'):
-            # For specific strength workout types (e.g., strength_upper, strength_push)
-            workout_type_filter = "(type = 'strength' AND subtype = :subtype)"
-            workout_params['subtype'] = challenge.workout_type
-        
-        query = text(f"""
-            SELECT COUNT(*) 
-            FROM workout 
-            WHERE user_id = :user_id 
-            AND {workout_type_filter}
-            AND created_at BETWEEN :start_date AND :end_date
-        """)
-        
-        workout_count = db.session.execute(query, workout_params).scalar()
-        
-        participant_progress.append({
-            'user': participant.user,
-            'progress': progress_data['progress'],
-            'current_value': progress_data['current_value'],
-            'completed': participant.completed,
-            'workout_count': workout_count
-        })
+    page = request.args.get('page', 1, type=int)
     
-    # Sort by progress descending
-    participant_progress.sort(key=lambda x: x['progress'], reverse=True)
+    # Progress, workout counts and ranks for all participants in one aggregate query
+    leaderboard = challenge_leaderboard.build_leaderboard(challenge, page=page)
     
     return render_template('challenges/view.html',
                          challenge=challenge,
-                         participant_progress=participant_progress)
+                         leaderboard=leaderboard,
+                         participant_progress=leaderboard['entries'])
 
 @bp.route('/challenges/<int:challenge_id>/join', methods=['POST'])
 @login_required
@@ -125,7 +89,10 @@ def join(challenge_id):
     
     participant = ChallengeParticipant(user_id=current_user.id)
     challenge.participants.append(participant)
+    db.session.flush()
     
+    # Count the user's existing workouts in the challenge window
+    challenge_progress.rebuild_challenge(challenge, user_id=current_user.id)
     db.session.commit()
     flash('You have joined the challenge!', 'success')
     return redirect(url_for('challenges.view', challenge_id=challenge_id))
@@ -169,6 +136,8 @@ def edit(challenge_id):
             challenge.workout_type = request.form['workout_type']
             challenge.is_public = bool(request.form.get('is_public', True))
             
+            # Dates, goal or workout type may have changed
+            challenge_progress.rebuild_challenge(challenge)
             db.session.commit()
             flash('Challenge updated successfully!', 'success')
             return redirect(url_for('challenges.view', challenge_id=challenge.id))
@@ -4,6 +4,7 @@ from app import db
 from app.models.user import User
 from app.models.friendship import Friendship
 from app.models.workout import Workout
+from app.services import friend_graph, friend_leaderboard, user_stats
 
 bp = Blueprint('friends', __name__)
 
@@ -12,7 +13,18 @@ bp = Blueprint('friends', __name__)
 def index():
     friends = current_user.get_friends()
     pending_requests = current_user.get_pending_friend_requests()
-    return render_template('friends/index.html', friends=friends, pending_requests=pending_requests)
+    board = friend_leaderboard.get_board(current_user.id)
+    return render_template('friends/index.html', friends=friends, pending_requests=pending_requests, board=board)
+
+@bp.route('/api/friends/leaderboard')
+@login_required
+def leaderboard():
+    """Weekly and monthly XP standings of the current user and their friends."""
+    return jsonify(friend_leaderboard.get_board(current_user.id))
+
+def _can_view(user):
+    """Users can view their own profile and their accepted friends' profiles."""
+    return user.id == current_user.id or friend_graph.are_friends(current_user.id, user.id)
 
 @bp.route('/friends/profile/<username>')
 @login_required
@@ -20,36 +32,34 @@ def view_profile(username):
     user = User.query.filter_by(username=username).first_or_404()
     
     # Check if the current user is friends with this user
-    if user.id != current_user.id:
-        friendship = Friendship.query.filter(
-            ((Friendship.user_id == current_user.id) & (Friendship.friend_id == user.id)) |
-            ((Friendship.user_id == user.id) & (Friendship.friend_id == current_user.id))
-        ).first()
-        
-        if not friendship or friendship.status != 'accepted':
-            flash('You must be friends with this user to view their profile.', 'error')
-            return redirect(url_for('friends.index'))
+    if not _can_view(user):
+        flash('You must be friends with this user to view their profile.', 'error')
+        return redirect(url_for('friends.index'))
     
     # Get user's recent workouts
     recent_workouts = user.workouts.order_by(Workout.created_at.desc()).limit(5).all()
     
-    # Calculate some stats
-    total_workouts = user.workouts.count()
-    total_distance = sum(w.distance or 0 for w in user.workouts.all())
-    total_duration = sum(w.duration or 0 for w in user.workouts.all())
-    
-    # Get workout type distribution
-    workout_types = {}
-    for workout in user.workouts.all():
-        workout_types[workout.type] = workout_types.get(workout.type, 0) + 1
+    # Totals and workout type distribution in one aggregate query
+    stats = user_stats.compute_profile_stats(user.id)
     
     return render_template('friends/profile.html', 
                          user=user,
                          recent_workouts=recent_workouts,
-                         total_workouts=total_workouts,
-                         total_distance=total_distance,
-                         total_duration=total_duration,
-                         workout_types=workout_types)
+                         total_workouts=stats['total_workouts'],
+                         total_distance=stats['total_distance'],
+                         total_duration=stats['total_duration'],
+                         workout_types=stats['workout_types'])
+
+@bp.route('/api/friends/profile/<username>/stats')
+@login_required
+def profile_stats(username):
+    """Totals and workout type distribution of a friend's profile."""
+    user = User.query.filter_by(username=username).first_or_404()
+    if not _can_view(user):
+        return jsonify({'error': 'You must be friends with this user to view their stats.'}), 403
+    stats = user_stats.compute_profile_stats(user.id)
+    stats['username'] = user.username
+    return jsonify(stats)
 
 @bp.route('/friends/add', methods=['POST'])
 @login_required
@@ -105,6 +115,6 @@ def search():
         'id': user.id,
         'username': user.username,
         'avatar_url': user.get_avatar_url(),
-        'level': user.level,
+        'level': user.effective_level,
         'rank': user.get_rank()
     } for user in users]) 
\ No newline at end of file
@@ -0,0 +1,60 @@
+from flask import Blueprint, render_template, request, jsonify, abort
+from flask_login import login_required, current_user
+from app.models.user import User
+from app.services import leaderboard, leveling
+
+bp = Blueprint('leaderboard', __name__)
+
+SCOPES = ('global', 'friends', 'tier')
+
+
+def _view_args():
+    """Scope, tier, page and the matching get_page/get_rank filters from the query string."""
+    scope = request.args.get('scope', 'global')
+    if scope not in SCOPES:
+        abort(400)
+    tier = None
+    user_ids = None
+    if scope == 'tier':
+        tier = request.args.get('tier') or leveling.rank_for_xp(current_user.effective_xp)
+        try:
+            leaderboard.tier_bounds(tier)
+        except ValueError:
+            abort(400)
+    elif scope == 'friends':
+        user_ids = leaderboard.friend_scope(current_user)
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', leaderboard.DEFAULT_PAGE_SIZE, type=int), 100)
+    return scope, tier, page, per_page, {'user_ids': user_ids, 'tier': tier}
+
+
+@bp.route('/leaderboard')
+@login_required
+def index():
+    scope, tier, page, per_page, filters = _view_args()
+    board = leaderboard.get_page(page=page, per_page=per_page, **filters)
+    me = leaderboard.get_rank(current_user, xp=current_user.effective_xp, **filters)
+    return render_template('leaderboard/index.html',
+                         board=board,
+                         me=me,
+                         scope=scope,
+                         tier=tier,
+                         tiers=[name for _, name in leveling.RANK_TIERS])
+
+
+@bp.route('/api/leaderboard')
+@login_required
+def api_index():
+    scope, tier, page, per_page, filters = _view_args()
+    board = leaderboard.get_page(page=page, per_page=per_page, **filters)
+    board['scope'] = scope
+    board['tier'] = tier
+    board['me'] = leaderboard.get_rank(current_user, xp=current_user.effective_xp, **filters)
+    return jsonify(board)
+
+
+@bp.route('/api/leaderboard/rank/<int:user_id>')
+@login_required
+def api_rank(user_id):
+    user = User.query.get_or_404(user_id)
+    return jsonify({'user_id': user.id, 'username': user.username, **leaderboard.get_rank(user)})
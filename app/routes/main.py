@@ -7,6 +7,8 @@ from sqlalchemy import inspect
 from flask import current_app
 from app.models.exercise import Exercise
 from app.models.exercise_set import ExerciseSet
+from app.services import workout_repository, dashboard
+from app.services.workout_detail import load_workout_detail
 import json
 from sqlalchemy import text
 
@@ -17,34 +19,15 @@ def index():
     if not current_user.is_authenticated:
         return render_template('main/landing.html')
     
-    # Check and apply XP decay
-    xp_to_lose, days_until_decay = current_user.calculate_xp_decay()
-    if xp_to_lose > 0:
-        xp_lost = current_user.apply_xp_decay()
-        if xp_lost > 0:
-            flash(f'You lost {xp_lost} XP due to inactivity! Work out to stop losing XP.', 'error')
-            db.session.commit()
-    
-    # Get recent workouts
-    recent_workouts = Workout.query.filter_by(user_id=current_user.id)\
-        .order_by(Workout.created_at.desc())\
-        .limit(5)\
-        .all()
-    
-    # Get weekly stats
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    weekly_workouts = Workout.query.filter(
-        Workout.user_id == current_user.id,
-        Workout.created_at >= week_ago
-    ).all()
-    
-    total_xp_this_week = sum(workout.xp_earned for workout in weekly_workouts)
-    workout_count_this_week = len(weekly_workouts)
+    # Level, decay status, weekly totals and recent workouts, usually from cache
+    snapshot = dashboard.get_snapshot(current_user)
     
     return render_template('main/dashboard.html',
-                         recent_workouts=recent_workouts,
-                         total_xp_this_week=total_xp_this_week,
-                         workout_count_this_week=workout_count_this_week)
+                         snapshot=snapshot,
+                         recent_workouts=snapshot['recent_workouts'],
+                         xp_decay=snapshot['xp_decay'],
+                         total_xp_this_week=snapshot['weekly_xp'],
+                         workout_count_this_week=snapshot['weekly_count'])
 
 @bp.route('/debug')
 def debug():
@@ -192,53 +175,15 @@ def debug_exercise():
 @login_required
 def debug_workout(workout_id):
     """Debug route to check workout data"""
-    from app.models.workout import Workout
-    from app.models.exercise import Exercise, ExerciseSet
-    from flask import jsonify
-    
-    workout = Workout.query.get_or_404(workout_id)
+    workout = load_workout_detail(workout_id)
+    if workout is None:
+        return jsonify({"error": "Workout not found"}), 404
     
     # Ensure the user owns this workout
     if workout.user_id != current_user.id:
         return jsonify({"error": "Not authorized"}), 403
     
-    # Collect workout data
-    workout_data = {
-        "id": workout.id,
-        "name": workout.name,
-        "type": workout.type,
-        "subtype": workout.subtype,
-        "duration": workout.duration,
-        "intensity": workout.intensity,
-        "xp_earned": workout.xp_earned,
-        "created_at": workout.created_at.isoformat(),
-        "notes": workout.notes,
-        "exercises_count": workout.exercises.count(),
-        "exercises": []
-    }
-    
-    # Get exercises
-    for exercise in workout.exercises:
-        exercise_data = {
-            "id": exercise.id,
-            "name": exercise.name,
-            "sets_count": exercise.sets.count(),
-            "sets": []
-        }
-        
-        # Get sets for each exercise
-        for set_data in exercise.sets:
-            exercise_data["sets"].append({
-                "id": set_data.id,
-                "set_number": set_data.set_number,
-                "reps": set_data.reps,
-                "weight": set_data.weight,
-                "notes": set_data.notes
-            })
-        
-        workout_data["exercises"].append(exercise_data)
-    
-    return jsonify(workout_data) 
+    return jsonify(workout.to_dict())
 
 @bp.route('/debug/workout-exercises/<int:workout_id>')
 @login_required
@@ -330,7 +275,7 @@ def debug_workout_exercises(workout_id):
 def workout_history():
     # Get all workouts for the user
     workouts = Workout.query.filter_by(user_id=current_user.id)\
-        .order_by(Workout.date.desc())\
+        .order_by(Workout.created_at.desc())\
         .all()
     
     return render_template('workout_history.html', workouts=workouts)
@@ -339,38 +284,14 @@ def workout_history():
 @login_required
 def exercise_history(exercise_name):
     try:
-        # Get all exercises with this name for the user
-        exercises = db.session.execute(text("""
-            SELECT e.id, e.workout_id, e.name, w.date
-            FROM exercise e
-            JOIN workout w ON e.workout_id = w.id
-            WHERE e.name = :exercise_name
-            AND w.user_id = :user_id
-            ORDER BY w.date DESC
-            LIMIT 5
-        """), {'exercise_name': exercise_name, 'user_id': current_user.id}).fetchall()
+        # Latest entries for this exercise with their sets in one query
+        history = workout_repository.exercise_histories(current_user.id, [exercise_name]).get(exercise_name)
         
-        if not exercises:
+        if not history:
             return jsonify({'error': 'No history found for this exercise'}), 404
         
-        history = []
-        for ex in exercises:
-            sets = db.session.execute(text("""
-                SELECT set_number, reps, weight, notes
-                FROM exercise_set
-                WHERE exercise_id = :exercise_id
-                ORDER BY set_number
-            """), {'exercise_id': ex[0]}).fetchall()
-            
-            history.append({
-                'date': ex[3].strftime('%Y-%m-%d'),
-                'sets': [{
-                    'set_number': s[0],
-                    'reps': s[1],
-                    'weight': s[2],
-                    'notes': s[3]
-                } for s in sets]
-            })
+        for entry in history:
+            entry['date'] = entry['date'].strftime('%Y-%m-%d')
         
         return jsonify(history)
     except Exception as e:
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from app import db
+from app.services import workout_feed, workout_removal
 from app.models.workout import Workout
 from werkzeug.security import generate_password_hash
 
@@ -9,7 +10,9 @@ bp = Blueprint('profile', __name__)
 @bp.route('/profile')
 @login_required
 def index():
-    return render_template('profile/index.html', Workout=Workout, user=current_user._get_current_object())
+    recent_workouts = workout_feed.page_workouts(current_user.id, page_size=5)['workouts']
+    return render_template('profile/index.html', Workout=Workout, user=current_user._get_current_object(),
+                           recent_workouts=recent_workouts)
 
 @bp.route('/profile/edit', methods=['GET', 'POST'])
 @login_required
@@ -74,13 +77,8 @@ def delete_workout(workout_id):
         flash('You do not have permission to delete this workout.', 'error')
         return redirect(url_for('profile.index'))
     
-    # Subtract XP from user
-    current_user.xp -= workout.xp_earned
-    # Recalculate level
-    current_user.level = current_user.calculate_level()
-    
-    # Delete the workout
-    db.session.delete(workout)
+    # Delete the workout with its exercises and sets, and subtract its XP
+    workout_removal.delete_workout(workout, current_user)
     db.session.commit()
     
     flash('Workout deleted successfully!', 'success')
@@ -89,12 +87,9 @@ def delete_workout(workout_id):
 @bp.route('/profile/workouts/clear', methods=['POST'])
 @login_required
 def clear_workouts():
-    # Delete all workouts for the current user
-    Workout.query.filter_by(user_id=current_user.id).delete()
-    
-    # Reset user's XP and level
-    current_user.xp = 0
-    current_user.level = 1
+    # Delete all workouts for the current user with their exercises and sets,
+    # and take their XP and stats back off the user
+    workout_removal.clear_workouts(current_user)
     
     db.session.commit()
     flash('All workouts have been cleared!', 'success')
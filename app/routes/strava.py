@@ -1,12 +1,20 @@
-from flask import Blueprint, redirect, url_for, flash, current_app, request, render_template
+from flask import Blueprint, redirect, url_for, flash, current_app, request, render_template, jsonify
 from flask_login import login_required, current_user
 from app.services.strava import StravaService
+from app.services import jobs
 from app import db
 from datetime import datetime
 import urllib.parse
 
 bp = Blueprint('strava', __name__, url_prefix='/strava')
 
+def _queue_sync():
+    """Queue a background Strava sync for the current user (commits)."""
+    job = jobs.enqueue('strava_sync', user_id=current_user.id)
+    db.session.commit()
+    current_app.logger.info(f"Queued Strava sync job {job.id} for user {current_user.id}")
+    return job
+
 @bp.route('/connect')
 @login_required
 def connect():
@@ -40,6 +48,7 @@ def disconnect():
     current_user.strava_refresh_token = None
     current_user.strava_token_expires_at = None
     current_user.strava_last_sync = None
+    current_user.strava_sync_cursor = None
     db.session.commit()
     flash('Successfully disconnected from Strava.', 'success')
     return redirect(url_for('profile.index'))
@@ -79,11 +88,10 @@ def callback():
         current_user.strava_token_expires_at = expires_at
         db.session.commit()
         
-        print("Starting activity sync...")
-        # Sync activities immediately
-        imported_workouts = strava_service.sync_activities(current_user)
+        # Import runs in the background worker so the request returns immediately
+        _queue_sync()
         
-        flash(f'Successfully connected to Strava! Imported {len(imported_workouts)} workouts.', 'success')
+        flash('Successfully connected to Strava! Your workouts are being imported.', 'success')
     except Exception as e:
         print(f"Strava connection error: {str(e)}")
         import traceback
@@ -100,18 +108,22 @@ def sync():
         flash('Please connect your Strava account first.', 'error')
         return redirect(url_for('profile.index'))
     
-    strava_service = StravaService(
-        client_id=current_app.config['STRAVA_CLIENT_ID'],
-        client_secret=current_app.config['STRAVA_CLIENT_SECRET']
-    )
-    
     try:
-        imported_workouts = strava_service.sync_activities(current_user)
-        flash(f'Successfully imported {len(imported_workouts)} workouts from Strava!', 'success')
+        _queue_sync()
+        flash('Strava sync started. New workouts will appear shortly.', 'success')
     except Exception as e:
-        print(f"Error syncing activities: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
-        flash('Failed to sync activities from Strava. Please try again.', 'error')
+        print(f"Error queueing Strava sync: {str(e)}")
+        db.session.rollback()
+        flash('Failed to start Strava sync. Please try again.', 'error')
     
-    return redirect(url_for('profile.index')) 
\ No newline at end of file
+    return redirect(url_for('profile.index'))
+
+@bp.route('/sync/status')
+@login_required
+def sync_status():
+    """Status of the current user's latest Strava sync job."""
+    job = jobs.latest_job('strava_sync', current_user.id)
+    return jsonify({
+        'job': job.to_dict() if job else None,
+        'last_sync': current_user.strava_last_sync.isoformat() if current_user.strava_last_sync else None
+    }) 
\ No newline at end of file
@@ -1,19 +1,59 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, abort, current_app
 from flask_login import login_required, current_user
 from app.models.workout import Workout
 from app.models.exercise import Exercise
 from app.models.exercise_set import ExerciseSet
 from app import db
+from app.services import workout_events, workout_history, workout_repository, personal_records, workout_detail, workout_feed, exercise_log, workout_removal, xp_reconcile
+from datetime import datetime, timedelta
 import json
-from sqlalchemy import text
 
 bp = Blueprint('workout', __name__)
 
+def _feed_args():
+    """Cursor, page size and filters for the workout list from the query string."""
+    def parse_date(value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d') if value else None
+        except ValueError:
+            return None
+
+    end = parse_date(request.args.get('end'))
+    return {
+        'cursor': request.args.get('cursor') or None,
+        'page_size': request.args.get('limit', current_app.config.get('WORKOUTS_PAGE_SIZE', workout_feed.DEFAULT_PAGE_SIZE), type=int),
+        'workout_type': request.args.get('type') or None,
+        'subtype': request.args.get('subtype') or None,
+        'start': parse_date(request.args.get('start')),
+        # The end date is inclusive in the UI
+        'end': end + timedelta(days=1) if end else None
+    }
+
 @bp.route('/workouts')
 @login_required
 def index():
-    workouts = Workout.query.filter_by(user_id=current_user.id).order_by(Workout.created_at.desc()).all()
-    return render_template('workout/index.html', workouts=workouts)
+    try:
+        page = workout_feed.page_workouts(current_user.id, **_feed_args())
+    except ValueError:
+        flash('That page of workouts is no longer available.', 'error')
+        return redirect(url_for('workout.index'))
+    filters = {key: request.args.get(key) for key in ('type', 'subtype', 'start', 'end') if request.args.get(key)}
+    return render_template('workout/index.html', workouts=page['workouts'], next_cursor=page['next_cursor'],
+                           filters=filters, is_first_page=not request.args.get('cursor'))
+
+@bp.route('/api/workouts')
+@login_required
+def api_workouts():
+    """Get a page of the current user's workouts as JSON, newest first."""
+    try:
+        page = workout_feed.page_workouts(current_user.id, **_feed_args())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'workouts': [workout_feed.workout_to_dict(w) for w in page['workouts']],
+        'next_cursor': page['next_cursor'],
+        'has_more': page['has_more']
+    })
 
 @bp.route('/workouts/new', methods=['GET', 'POST'])
 @login_required
@@ -72,6 +112,7 @@ def new_cardio():
             
             # Save workout
             db.session.add(workout)
+            current_user.update_last_workout()
             
             # Calculate XP and update user
             try:
@@ -84,6 +125,7 @@ def new_cardio():
                 print(f"DEBUG CARDIO: XP calculation/assignment error: {e}")
                 xp_earned = 50  # Fallback
             
+            workout_events.workout_added(workout)
             db.session.commit()
             print(f"DEBUG CARDIO: Successfully committed workout")
             
@@ -97,191 +139,43 @@ def new_cardio():
             flash(f'Error logging workout: {str(e)}', 'error')
             return render_template('workout/new_cardio.html')
     else:  # GET request
-        # Get workout history for all cardio workout types
-        workout_history = {}
-        for workout_type in ['cardio_running', 'cardio_cycling', 'cardio_swimming', 'cardio_hiit', 'cardio_other']:
-            history = get_workout_history(workout_type, current_user.id)
-            if history:
-                workout_history[workout_type] = history
+        # Latest workout for every cardio workout type in two queries
+        history = workout_history.latest_by_subtype(current_user.id, workout_history.CARDIO_SUBTYPES)
         
         # Render template with user's distance unit preference
         return render_template(
             'workout/new_cardio.html',
-            workout_history=workout_history,
+            workout_history=history,
             distance_unit=current_user.distance_unit
         )
 
-def get_exercise_history(exercise_name, user_id):
-    """Get previous workout data and PRs for a specific exercise."""
+def get_exercise_histories(exercise_names, user_id):
+    """Get previous workout data and all-time PRs for several exercises."""
     try:
-        # Get all exercises with this name for the user
-        exercises = db.session.execute("""
-            SELECT e.id, e.workout_id, e.name, w.date
-            FROM exercise e
-            JOIN workout w ON e.workout_id = w.id
-            WHERE e.name = :exercise_name AND w.user_id = :user_id
-            ORDER BY w.date DESC
-            LIMIT 5
-        """, {'exercise_name': exercise_name, 'user_id': user_id}).fetchall()
-        
-        if not exercises:
-            return None
-            
-        # Get sets for each exercise
-        history = []
-        for ex in exercises:
-            sets = db.session.execute("""
-                SELECT set_number, reps, weight, notes
-                FROM exercise_set
-                WHERE exercise_id = :exercise_id
-                ORDER BY set_number
-            """, {'exercise_id': ex[0]}).fetchall()
-            
-            history.append({
-                'date': ex[3],
-                'sets': [{
-                    'set_number': s[0],
-                    'reps': s[1],
-                    'weight': s[2],
-                    'notes': s[3]
-                } for s in sets]
-            })
-            
-        # Calculate PRs
-        prs = {
-            'max_weight': 0,
-            'max_reps': 0,
-            'max_volume': 0  # weight * reps
-        }
-        
-        for workout in history:
-            for set_data in workout['sets']:
-                if set_data['weight'] and set_data['reps']:
-                    # Update max weight
-                    if set_data['weight'] > prs['max_weight']:
-                        prs['max_weight'] = set_data['weight']
-                    
-                    # Update max reps
-                    if set_data['reps'] > prs['max_reps']:
-                        prs['max_reps'] = set_data['reps']
-                    
-                    # Update max volume
-                    volume = set_data['weight'] * set_data['reps']
-                    if volume > prs['max_volume']:
-                        prs['max_volume'] = volume
-        
+        histories = workout_repository.exercise_histories(user_id, exercise_names)
+        # PRs come from the maintained personal_record table
+        prs = personal_records.get_records(user_id, histories.keys())
         return {
-            'history': history,
-            'prs': prs,
-            'last_workout': history[0]['date'] if history else None
+            name: {
+                'history': history,
+                'prs': prs[name],
+                'last_workout': history[0]['date'] if history else None
+            }
+            for name, history in histories.items()
         }
     except Exception as e:
         print(f"Error getting exercise history: {e}")
-        return None
+        db.session.rollback()
+        return {}
+
+def get_exercise_history(exercise_name, user_id):
+    """Get previous workout data and PRs for a specific exercise."""
+    return get_exercise_histories([exercise_name], user_id).get(exercise_name)
 
 def get_workout_history(workout_type, user_id):
-    """Get previous workout data and PRs for a specific workout type."""
+    """Get the previous workout of a specific workout type."""
     try:
-        print(f"\nDEBUG: Getting workout history for type: {workout_type}")
-        
-        # First, let's see what workouts exist with their exact types/subtypes
-        all_workouts = db.session.execute(text("""
-            SELECT id, name, type, subtype, created_at
-            FROM workout 
-            WHERE user_id = :user_id
-            AND (
-                type = 'strength' 
-                OR subtype LIKE '%push%'
-                OR subtype LIKE '%pull%'
-                OR subtype LIKE '%legs%'
-                OR name LIKE '%push%'
-                OR name LIKE '%pull%'
-                OR name LIKE '%legs%'
-            )
-            ORDER BY created_at DESC
-        """), {'user_id': user_id}).fetchall()
-        
-        print("\nDEBUG: Recent strength/split workouts in system:")
-        for w in all_workouts:
-            print(f"ID: {w[0]}, Name: {w[1]}, Type: {w[2]}, Subtype: {w[3]}, Date: {w[4]}")
-        
-        # Now get the matching workouts with expanded matching criteria
-        workouts = db.session.execute(text("""
-            SELECT id, name, duration, intensity, created_at, notes, type, subtype
-            FROM workout
-            WHERE user_id = :user_id 
-            AND (
-                subtype = :workout_type 
-                OR subtype LIKE :like_pattern
-                OR (subtype IS NULL AND type = 'strength' AND (
-                    name ILIKE :name_pattern
-                    OR name ILIKE :alt_pattern
-                ))
-            )
-            ORDER BY created_at DESC
-            LIMIT 5
-        """), {
-            'workout_type': workout_type,
-            'user_id': user_id,
-            'like_pattern': f'%{workout_type.replace("strength_", "")}%',
-            'name_pattern': f'%{workout_type.replace("strength_", "").replace("_", " ")}%',
-            'alt_pattern': f'%{workout_type.replace("strength_", "").replace("_", "")}%'
-        }).fetchall()
-        
-        print(f"\nDEBUG: Found {len(workouts) if workouts else 0} matching workouts")
-        for w in (workouts or []):
-            print(f"Matching workout - ID: {w[0]}, Name: {w[1]}, Date: {w[4]}, Type: {w[6]}, Subtype: {w[7]}")
-        
-        if not workouts:
-            print("DEBUG: No matching workouts found")
-            return None
-            
-        # Process the most recent workout
-        last_workout = workouts[0]
-        workout_id = last_workout[0]
-        
-        # Get exercises and their sets for this workout
-        exercises = db.session.execute(text("""
-            SELECT 
-                e.id, 
-                e.name,
-                array_agg(s.set_number ORDER BY s.set_number) as set_numbers,
-                array_agg(s.reps ORDER BY s.set_number) as reps,
-                array_agg(s.weight ORDER BY s.set_number) as weights,
-                array_agg(s.notes ORDER BY s.set_number) as notes
-            FROM exercise e
-            LEFT JOIN exercise_set s ON e.id = s.exercise_id
-            WHERE e.workout_id = :workout_id
-            GROUP BY e.id, e.name
-            ORDER BY e.id
-        """), {'workout_id': workout_id}).fetchall()
-        
-        print(f"\nDEBUG: Found {len(exercises)} exercises")
-        for ex in exercises:
-            print(f"Exercise: {ex[1]}")
-            for i in range(len(ex[2])):
-                print(f"  Set {ex[2][i]}: {ex[3][i]} reps at {ex[4][i]}kg")
-        
-        # Format the response
-        return {
-            'last_workout': {
-                'id': last_workout[0],
-                'name': last_workout[1],
-                'duration': last_workout[2],
-                'intensity': last_workout[3],
-                'date': last_workout[4],
-                'notes': last_workout[5],
-                'exercises': [{
-                    'name': ex[1],
-                    'sets': [{
-                        'set_number': set_num,
-                        'reps': reps,
-                        'weight': weight,
-                        'notes': note
-                    } for set_num, reps, weight, note in zip(ex[2], ex[3], ex[4], ex[5])]
-                } for ex in exercises]
-            }
-        }
+        return workout_history.latest_by_subtype(user_id, [workout_type]).get(workout_type)
     except Exception as e:
         print(f"Error in get_workout_history: {str(e)}")
         db.session.rollback()  # Add rollback to handle transaction errors
@@ -299,12 +193,6 @@ def new_strength():
                 except (ValueError, TypeError):
                     return default
 
-            def safe_float(value, default=0.0):
-                try:
-                    return float(value) if value else default
-                except (ValueError, TypeError):
-                    return default
-
             # Get the subtype
             subtype = request.form.get('subtype', 'strength_full')
             print(f"DEBUG STRENGTH: Using subtype: {subtype}")
@@ -340,55 +228,24 @@ def new_strength():
                 print(f"DEBUG STRENGTH: JSON decode error: {e}")
                 exercises_data = []
             
+            exercises = exercise_log.parse_exercises(exercises_data)
+            
             # Save workout to get an ID
             db.session.add(workout)
             db.session.flush()
             print(f"DEBUG STRENGTH: Created workout with ID: {workout.id}")
             
-            # Process and add exercises
-            for i, exercise_data in enumerate(exercises_data):
-                try:
-                    exercise_name = exercise_data.get('name', '').strip()
-                    if not exercise_name:
-                        print(f"DEBUG STRENGTH: Skipping exercise {i+1} - no name")
-                        continue
-                        
-                    # Create the exercise
-                    exercise = Exercise(
-                        workout_id=workout.id,
-                        name=exercise_name,
-                        type='strength',
-                        user_id=current_user.id
-                    )
-                    db.session.add(exercise)
-                    db.session.flush()
-                    print(f"DEBUG STRENGTH: Added exercise: {exercise_name} with ID: {exercise.id}")
-                    
-                    # Add sets for this exercise
-                    sets_data = exercise_data.get('sets', [])
-                    print(f"DEBUG STRENGTH: Processing {len(sets_data)} sets for exercise '{exercise_name}'")
-
-                    for set_data in sets_data:
-                        exercise_set = ExerciseSet(
-                            exercise_id=exercise.id,
-                            user_id=current_user.id,  # Add the user_id
-                            set_number=set_data['set_number'],
-                            weight=safe_float(set_data.get('weight')),
-                            reps=safe_int(set_data.get('reps')),
-                            notes=set_data.get('notes', '')
-                        )
-                        db.session.add(exercise_set)
-                        print(f"DEBUG STRENGTH: Added set {exercise_set.set_number} with {safe_int(set_data.get('reps'))} reps at {safe_float(set_data.get('weight'))} kg")
-
-                except Exception as e:
-                    print(f"DEBUG STRENGTH: Error adding exercise {i+1}: {e}")
-                    db.session.rollback()
-                    flash('Error adding exercise. Please try again.', 'error')
-                    return redirect(url_for('workout.new_strength'))
-
+            # Exercises and sets go in with one bulk INSERT each
+            exercise_log.insert_exercises(workout.id, current_user.id, exercises)
+            print(f"DEBUG STRENGTH: Added {len(exercises)} exercises with {sum(len(e['sets']) for e in exercises)} sets")
+            
+            # New sets can only raise personal records
+            personal_records.record_sets(current_user.id, exercise_log.sets_by_exercise(exercises))
+            
             # Calculate XP and update user
+            current_user.update_last_workout()
             try:
-                xp_earned = workout.calculate_xp()
+                xp_earned = workout.calculate_xp(exercise_count=len(exercises))
                 print(f"DEBUG STRENGTH: Calculated XP: {xp_earned}")
                 
                 current_user.add_xp(xp_earned)
@@ -397,9 +254,10 @@ def new_strength():
                 print(f"DEBUG STRENGTH: XP calculation/assignment error: {e}")
                 xp_earned = 50  # Fallback
             
+            workout_events.workout_added(workout)
             try:
                 db.session.commit()
-                print(f"DEBUG STRENGTH: Successfully committed workout with {len(exercises_data)} exercises")
+                print(f"DEBUG STRENGTH: Successfully committed workout with {len(exercises)} exercises")
             except Exception as e:
                 db.session.rollback()
                 print(f"DEBUG STRENGTH: Commit error: {e}")
@@ -416,18 +274,14 @@ def new_strength():
             flash(f'Error logging workout: {str(e)}', 'error')
             return render_template('workout/new_strength.html', exercise_options=get_exercise_options())
     else:  # GET request
-        # Get workout history for all strength workout types
-        workout_history = {}
-        for workout_type in ['strength_upper', 'strength_lower', 'strength_push', 'strength_pull', 'strength_full', 'strength_other']:
-            history = get_workout_history(workout_type, current_user.id)
-            if history:
-                workout_history[workout_type] = history
+        # Latest workout for every strength workout type in two queries
+        history = workout_history.latest_by_subtype(current_user.id, workout_history.STRENGTH_SUBTYPES)
         
         # Get exercise options and render template
         return render_template(
             'workout/new_strength.html',
             exercise_options=get_exercise_options(),
-            workout_history=workout_history
+            workout_history=history
         )
 
 # Helper function to get exercise options
@@ -462,9 +316,12 @@ def get_exercise_options():
 @bp.route('/workouts/<int:workout_id>')
 @login_required
 def view(workout_id):
-    # Get the workout
+    # Workout, exercises and ordered sets in two queries
+    workout = workout_detail.load_workout_detail(workout_id)
+    if workout is None:
+        abort(404)
+    
     try:
-        workout = Workout.query.get_or_404(workout_id)
         print(f"\nDEBUG: Loading workout {workout_id}")
         print(f"DEBUG: Workout type: {workout.type}")
         print(f"DEBUG: Workout name: {workout.name}")
@@ -475,93 +332,9 @@ def view(workout_id):
             flash('You do not have permission to view this workout', 'error')
             return redirect(url_for('workout.index'))
         
-        # Variable to store all exercises and their sets
-        exercises = []
-        
-        # Only get exercises for strength workouts
-        if workout.type == 'strength':
-            print(f"DEBUG: Processing strength workout")
-            try:
-                # First check if there are any exercises using SQLAlchemy
-                exercise_count = Exercise.query.filter_by(workout_id=workout_id).count()
-                print(f"DEBUG: Found {exercise_count} exercises using SQLAlchemy")
-                
-                # Get all exercises using parameterized query
-                exercise_sql = text("""
-                    SELECT id, workout_id, name 
-                    FROM exercise 
-                    WHERE workout_id = :workout_id
-                    ORDER BY id
-                """)
-                exercises_result = db.session.execute(exercise_sql, {"workout_id": workout_id})
-                exercise_rows = exercises_result.fetchall()
-                
-                print(f"DEBUG: Found {len(exercise_rows)} exercises")
-                print("DEBUG: Exercise rows:", exercise_rows)
-                
-                # Process each exercise
-                for ex_row in exercise_rows:
-                    ex_id = ex_row[0]
-                    ex_name = ex_row[2]
-                    
-                    print(f"\nDEBUG: Processing exercise {ex_id}: {ex_name}")
-                    
-                    # Get all sets for this exercise using parameterized query
-                    sets_sql = text("""
-                        SELECT es.id, es.exercise_id, es.set_number, es.reps, es.weight, es.notes
-                        FROM exercise_set es
-                        WHERE es.exercise_id = :exercise_id
-                        ORDER BY es.set_number ASC
-                    """)
-                    sets_result = db.session.execute(sets_sql, {"exercise_id": ex_id})
-                    set_rows = sets_result.fetchall()
-                    
-                    print(f"DEBUG: Found {len(set_rows)} sets")
-                    print("DEBUG: Set rows:", set_rows)
-                    
-                    # Create exercise object
-                    exercise = {
-                        'model': {
-                            'id': ex_id,
-                            'name': ex_name
-                        },
-                        'ordered_sets': []
-                    }
-                    
-                    # Add all sets to this exercise
-                    for set_row in set_rows:
-                        set_number = set_row[2]  # Get the set number from the database
-                        exercise_set = {
-                            'id': set_row[0],
-                            'set_number': set_number,
-                            'reps': set_row[3],
-                            'weight': set_row[4],
-                            'notes': set_row[5] if set_row[5] else ''
-                        }
-                        print(f"DEBUG: Processing set {set_number}: {exercise_set['reps']} reps at {exercise_set['weight']}kg")
-                        exercise['ordered_sets'].append(exercise_set)
-                    
-                    # Sort sets by set number to ensure correct order
-                    exercise['ordered_sets'].sort(key=lambda x: x['set_number'])
-                    
-                    # Add this exercise to our list
-                    exercises.append(exercise)
-                    print(f"DEBUG: Added exercise {ex_name} with {len(exercise['ordered_sets'])} sets")
-                    print("DEBUG: Set numbers:", [s['set_number'] for s in exercise['ordered_sets']])
-            
-            except Exception as e:
-                import traceback
-                print(f"ERROR fetching exercises: {e}")
-                print(traceback.format_exc())
-                # Don't fail completely - continue with empty exercises list
-        
-        # Render the template with all our data
-        print("\nDEBUG: Final data:")
-        print(f"Workout: {workout.name}")
-        print(f"Total exercises: {len(exercises)}")
-        for ex in exercises:
-            print(f"Exercise {ex['model']['name']}: {len(ex['ordered_sets'])} sets")
-            print("Exercise sets:", ex['ordered_sets'])
+        # Only show exercises for strength workouts
+        exercises = workout.exercises if workout.type == 'strength' else ()
+        print(f"DEBUG: Total exercises: {len(exercises)}")
         
         return render_template('workout/view.html', workout=workout, exercises=exercises)
     
@@ -572,63 +345,25 @@ def view(workout_id):
         flash('Error loading workout details. Please try again.', 'error')
         return redirect(url_for('workout.index'))
 
+@bp.route('/api/workouts/<int:workout_id>')
+@login_required
+def api_workout(workout_id):
+    """Get a workout with its exercises and sets as JSON."""
+    workout = workout_detail.load_workout_detail(workout_id)
+    if workout is None:
+        return jsonify({'error': 'Workout not found'}), 404
+    if workout.user_id != current_user.id:
+        return jsonify({'error': 'Not authorized'}), 403
+    return jsonify(workout.to_dict())
+
 @bp.route('/api/workouts/last/<workout_type>')
 @login_required
 def get_last_workout(workout_type):
     """Get the last workout of a specific type."""
     try:
         print(f"DEBUG API: Getting last workout for type: {workout_type}")
-        # Get the last workout of this type, handling both old and new format
-        workout = db.session.execute("""
-            SELECT id, name, duration, intensity, date, notes
-            FROM workout
-            WHERE user_id = :user_id 
-            AND (
-                subtype = :workout_type 
-                OR (subtype IS NULL AND type = 'strength' AND name ILIKE :name_pattern)
-            )
-            ORDER BY date DESC
-            LIMIT 1
-        """, {
-            'workout_type': workout_type, 
-            'user_id': current_user.id,
-            'name_pattern': '%' + workout_type.replace('strength_', '').replace('_', ' ') + '%'
-        }).fetchone()
-        
-        print(f"DEBUG API: Found workout: {workout is not None}")
-        
-        if not workout:
-            return jsonify({'last_workout': None})
-            
-        # Get exercises for this workout
-        exercises = db.session.execute("""
-            SELECT e.id, e.name, 
-                   COUNT(DISTINCT es.id) as total_sets,
-                   MAX(es.weight) as max_weight,
-                   MAX(es.reps) as max_reps,
-                   SUM(es.weight * es.reps) as total_volume
-            FROM exercise e
-            LEFT JOIN exercise_set es ON e.id = es.exercise_id
-            WHERE e.workout_id = :workout_id
-            GROUP BY e.id, e.name
-        """, {'workout_id': workout[0]}).fetchall()
-        
-        workout_data = {
-            'id': workout[0],
-            'name': workout[1],
-            'duration': workout[2],
-            'intensity': workout[3],
-            'date': workout[4].isoformat() if workout[4] else None,
-            'notes': workout[5],
-            'exercises': [{
-                'name': ex[1],
-                'total_sets': ex[2],
-                'max_weight': ex[3],
-                'max_reps': ex[4],
-                'total_volume': ex[5]
-            } for ex in exercises]
-        }
-        
+        workout_data = workout_repository.last_workout(current_user.id, workout_type)
+        print(f"DEBUG API: Found workout: {workout_data is not None}")
         return jsonify({'last_workout': workout_data})
     except Exception as e:
         print(f"Error getting last workout: {e}")
@@ -649,13 +384,8 @@ def edit(id):
                 except (ValueError, TypeError):
                     return default
 
-            def safe_float(value, default=0.0):
-                try:
-                    return float(value) if value else default
-                except (ValueError, TypeError):
-                    return default
-
             # Update workout details
+            before = workout_events.snapshot(workout)
             workout.name = request.form.get('name', workout.name)
             workout.duration = safe_int(request.form.get('duration'), workout.duration)
             workout.intensity = safe_int(request.form.get('intensity'), workout.intensity)
@@ -664,36 +394,21 @@ def edit(id):
             
             # Process exercises data from form
             try:
-                exercises_data = json.loads(request.form.get('exercises_data', '[]'))
+                exercises = exercise_log.parse_exercises(json.loads(request.form.get('exercises_data', '[]')))
                 
-                # Delete existing exercises and their sets
-                for exercise in workout.exercises:
-                    for set_ in exercise.sets:
-                        db.session.delete(set_)
-                    db.session.delete(exercise)
+                # Write only the exercises and sets that changed
+                diff = exercise_log.save_exercise_diff(workout.id, current_user.id, exercises)
                 
-                # Create new exercises and sets
-                for exercise_data in exercises_data:
-                    exercise = Exercise(
-                        workout_id=workout.id,
-                        name=exercise_data['name'],
-                        type='strength',  # Explicitly set type
-                        user_id=current_user.id
-                    )
-                    db.session.add(exercise)
-                    db.session.flush()  # Get the exercise ID
-                    
-                    # Add sets for this exercise
-                    for set_data in exercise_data['sets']:
-                        set_ = ExerciseSet(
-                            exercise_id=exercise.id,
-                            user_id=current_user.id,  # Add the user_id
-                            set_number=set_data['set_number'],
-                            weight=safe_float(set_data.get('weight')),
-                            reps=safe_int(set_data.get('reps')),
-                            notes=set_data.get('notes', '')
-                        )
-                        db.session.add(set_)
+                # Move the user's XP by the difference the edit makes
+                old_xp = workout.xp_earned or 0
+                new_xp = workout.calculate_xp(exercise_count=diff['exercises_after'])
+                if new_xp != old_xp:
+                    current_user.adjust_xp(new_xp - old_xp)
+                workout_events.workout_changed(workout, before)
+                
+                # Only exercises whose sets changed can move a record
+                if diff['changed_names']:
+                    personal_records.recompute(current_user.id, diff['changed_names'])
                 
                 db.session.commit()
                 flash('Workout updated successfully!', 'success')
@@ -711,40 +426,24 @@ def edit(id):
     
     # GET request - show edit form
     # Get exercises and their sets
-    exercises = []
-    for exercise in workout.exercises:
-        sets = []
-        for set_ in sorted(exercise.sets, key=lambda x: x.set_number):
-            sets.append({
-                'set_number': set_.set_number,
-                'weight': set_.weight,
-                'reps': set_.reps,
-                'notes': set_.notes
-            })
-        exercises.append({
-            'name': exercise.name,
-            'sets': sets
-        })
+    detail = workout_detail.load_workout_detail(workout.id)
+    exercises = detail.form_exercises()
     
     # Convert exercises to JSON for the form
     exercises_json = json.dumps(exercises)
     
     # Get exercise history for this user
-    exercise_history = {}
-    for exercise in workout.exercises:
-        history = get_exercise_history(exercise.name, current_user.id)
-        if history:
-            exercise_history[exercise.name] = history
+    exercise_history = get_exercise_histories([exercise['name'] for exercise in exercises], current_user.id)
     
     # Get workout history for this user
-    workout_history = get_workout_history(workout.subtype or 'strength_full', current_user.id)
+    history = get_workout_history(workout.subtype or 'strength_full', current_user.id)
     
     return render_template('workout/new_strength.html', 
                          workout=workout,
                          exercise_options=get_exercise_options(),
                          initial_exercises=exercises_json,
                          exercise_history=exercise_history,
-                         workout_history=workout_history)
+                         workout_history=history)
 
 @bp.route('/workouts/<int:id>/delete', methods=['POST'])
 @login_required
@@ -752,22 +451,10 @@ def delete(id):
     workout = Workout.query.filter_by(id=id, user_id=current_user.id).first_or_404()
     
     try:
-        # Store the XP that needs to be subtracted
-        xp_to_subtract = workout.xp_earned or 0
-        
-        # Delete associated exercise sets first
-        for exercise in workout.exercises:
-            for set_ in exercise.sets:
-                db.session.delete(set_)
-            # Then delete the exercises
-            db.session.delete(exercise)
-        
-        # Delete the workout
-        db.session.delete(workout)
+        # Delete the workout with its exercises and sets, and subtract its XP
+        xp_to_subtract = workout_removal.delete_workout(workout, current_user)
         
-        # Subtract XP from user
         if xp_to_subtract > 0:
-            current_user.xp = max(0, current_user.xp - xp_to_subtract)  # Ensure XP doesn't go below 0
             flash(f'Workout deleted and {xp_to_subtract} XP subtracted', 'success')
         else:
             flash('Workout deleted successfully', 'success')
@@ -784,17 +471,11 @@ def delete(id):
 @login_required
 def recalculate_xp():
     try:
-        # Get all workouts for the current user
-        workouts = Workout.query.filter_by(user_id=current_user.id).all()
-        
-        # Calculate total XP from workouts
-        total_xp = sum(workout.xp_earned or 0 for workout in workouts)
-        
-        # Update user's XP
-        current_user.xp = total_xp
+        # Sum the XP of the user's workouts in the database and relevel
+        change = xp_reconcile.reconcile_user_xp(current_user)
         db.session.commit()
         
-        flash(f'XP recalculated successfully. Your new XP total is {total_xp}', 'success')
+        flash(f"XP recalculated successfully. Your new XP total is {change['new_xp']}", 'success')
     except Exception as e:
         db.session.rollback()
         flash(f'Error recalculating XP: {str(e)}', 'error')
@@ -0,0 +1,219 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models.workout import Workout
+from app.models.user_activity_daily import UserActivityDaily
+from sqlalchemy import select, update, insert, delete, func, and_, bindparam, Date
+from sqlalchemy.dialects import postgresql, sqlite
+import logging
+import time
+
+# user_activity_daily holds each user's workout totals per UTC day, type and
+# subtype, kept in sync with workout writes here. A range stat sums at most
+# one row per day and subtype instead of scanning the user's workouts.
+# Helpers only add statements to the current transaction; callers commit.
+
+FIELDS = ('workouts', 'distance', 'duration', 'calories', 'xp')
+BUCKET = ('user_id', 'day', 'type', 'subtype')
+ROLLUP_CHUNK_SIZE = 500  # User ids per rebuild statement
+
+_statements = {}
+
+
+def _upsert():
+    """INSERT ... ON CONFLICT that adds to an existing bucket, cached per dialect; None if unsupported."""
+    dialect = db.engine.dialect.name
+    if dialect not in _statements:
+        if dialect == 'postgresql':
+            stmt = postgresql.insert(UserActivityDaily)
+        elif dialect == 'sqlite':
+            stmt = sqlite.insert(UserActivityDaily)
+        else:
+            stmt = None
+        if stmt is not None:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(BUCKET),
+                set_={field: getattr(UserActivityDaily, field) + getattr(stmt.excluded, field) for field in FIELDS}
+            )
+        _statements[dialect] = stmt
+    return _statements[dialect]
+
+
+def _add_to_buckets(rows):
+    """Add rows to their buckets without ON CONFLICT: UPDATE each, then INSERT the missing ones."""
+    table = UserActivityDaily.__table__
+    add = update(table).where(
+        *(table.c[key] == bindparam('b_' + key) for key in BUCKET)
+    ).values(**{field: table.c[field] + bindparam('d_' + field) for field in FIELDS})
+    missing = []
+    for row in rows:
+        params = {'b_' + key: row[key] for key in BUCKET}
+        params.update({'d_' + field: row[field] for field in FIELDS})
+        if db.session.execute(add, params).rowcount == 0:
+            missing.append(row)
+    if missing:
+        db.session.execute(insert(UserActivityDaily), missing)
+
+
+def _row(workout, sign=1):
+    """Bucket and signed totals of one workout (or snapshot), or None if it has no date."""
+    if not workout.created_at:
+        return None
+    return {
+        'user_id': workout.user_id,
+        'day': workout.created_at.date(),
+        'type': workout.type,
+        'subtype': workout.subtype or '',
+        'workouts': sign,
+        'distance': sign * (workout.distance or 0.0),
+        'duration': sign * (workout.duration or 0),
+        'calories': sign * (workout.calories or 0),
+        'xp': sign * (workout.xp_earned or 0),
+    }
+
+
+def _apply(rows):
+    """Add rows to their buckets with one executemany upsert, merging rows of the same bucket."""
+    merged = {}
+    for row in rows:
+        if row is None:
+            continue
+        key = tuple(row[k] for k in BUCKET)
+        if key in merged:
+            for field in FIELDS:
+                merged[key][field] += row[field]
+        else:
+            merged[key] = dict(row)
+    rows = [row for row in merged.values() if any(row[field] for field in FIELDS)]
+    if not rows:
+        return
+    upsert = _upsert()
+    if upsert is not None:
+        db.session.execute(upsert, rows)
+    else:
+        _add_to_buckets(rows)
+    if any(row['workouts'] < 0 for row in rows):
+        # Drop buckets whose last workout went away
+        db.session.execute(
+            delete(UserActivityDaily).where(
+                UserActivityDaily.user_id.in_({row['user_id'] for row in rows}),
+                UserActivityDaily.day.in_({row['day'] for row in rows}),
+                UserActivityDaily.workouts <= 0,
+            )
+        )
+
+
+def record_workout_added(workout):
+    """Count a new workout in its day's bucket."""
+    if workout.created_at is None:
+        db.session.flush()  # Populate the created_at default
+    _apply([_row(workout)])
+
+
+def record_workout_removed(workout):
+    """Take a deleted workout (or a snapshot of it) out of its day's bucket."""
+    _apply([_row(workout, -1)])
+
+
+def record_workout_changed(workout, before):
+    """Move an edited workout's totals from its `before` snapshot to its current state."""
+    _apply([_row(before, -1), _row(workout)])
+
+
+def record_workouts_imported(workouts):
+    """Count a batch of new workouts with one upsert."""
+    _apply([_row(workout) for workout in workouts])
+
+
+def reset_user(user_id):
+    """Drop a user's rollup rows, e.g. after clearing their workouts."""
+    db.session.execute(delete(UserActivityDaily).where(UserActivityDaily.user_id == user_id))
+
+
+def _rebuild_range(first_id, last_id):
+    """Rebuild the rollup rows of users first_id..last_id with one INSERT ... SELECT."""
+    day = func.date(Workout.created_at, type_=Date)
+    subtype = func.coalesce(Workout.subtype, '')
+    db.session.execute(
+        delete(UserActivityDaily).where(UserActivityDaily.user_id.between(first_id, last_id))
+    )
+    db.session.execute(
+        UserActivityDaily.__table__.insert().from_select(
+            list(BUCKET) + list(FIELDS),
+            select(
+                Workout.user_id,
+                day,
+                Workout.type,
+                subtype,
+                func.count(Workout.id),
+                func.coalesce(func.sum(Workout.distance), 0.0),
+                func.coalesce(func.sum(Workout.duration), 0),
+                func.coalesce(func.sum(Workout.calories), 0),
+                func.coalesce(func.sum(Workout.xp_earned), 0),
+            )
+            .where(Workout.user_id.between(first_id, last_id), Workout.created_at.is_not(None))
+            .group_by(Workout.user_id, day, Workout.type, subtype)
+        )
+    )
+
+
+def rebuild_user(user_id):
+    """Rebuild one user's rollup rows from their workouts (no commit)."""
+    _rebuild_range(user_id, user_id)
+
+
+def rebuild_all(chunk_size=ROLLUP_CHUNK_SIZE):
+    """Rebuild every user's rollup rows from their workouts, one commit per range of user ids."""
+    started = time.perf_counter()
+    report = {'users': 0, 'rows': 0, 'chunks': 0, 'elapsed': 0.0}
+
+    try:
+        # Walk user id ranges up to the largest id with workouts or stale rollup rows
+        max_id = max(
+            db.session.scalar(select(func.max(Workout.user_id))) or 0,
+            db.session.scalar(select(func.max(UserActivityDaily.user_id))) or 0,
+        )
+        for first_id in range(1, max_id + 1, chunk_size):
+            _rebuild_range(first_id, min(first_id + chunk_size - 1, max_id))
+            db.session.commit()
+            report['chunks'] += 1
+        report['users'] = db.session.scalar(select(func.count(func.distinct(UserActivityDaily.user_id))))
+        report['rows'] = db.session.scalar(select(func.count(UserActivityDaily.id)))
+    except Exception as e:
+        logging.error(f"Error rebuilding activity rollup: {str(e)}")
+        db.session.rollback()
+        report['error'] = str(e)
+
+    report['elapsed'] = time.perf_counter() - started
+    logging.info(
+        f"Activity rollup: rebuilt {report['users']} users ({report['rows']} rows) in {report['elapsed']:.2f}s"
+    )
+    return report
+
+
+def range_totals(user_id, start_day, end_day, workout_type=None, subtype=None):
+    """Sum a user's totals over the days [start_day, end_day).
+
+    Returns {'workouts', 'distance', 'duration', 'calories', 'xp'}.
+    """
+    conditions = [
+        UserActivityDaily.user_id == user_id,
+        UserActivityDaily.day >= start_day,
+        UserActivityDaily.day < end_day,
+    ]
+    if workout_type:
+        conditions.append(UserActivityDaily.type == workout_type)
+    if subtype:
+        conditions.append(UserActivityDaily.subtype == subtype)
+    row = db.session.execute(
+        select(*(func.coalesce(func.sum(getattr(UserActivityDaily, field)), 0) for field in FIELDS))
+        .where(and_(*conditions))
+    ).one()
+    totals = dict(zip(FIELDS, row))
+    totals['distance'] = float(totals['distance'])
+    return totals
+
+
+def recent_totals(user_id, days=7, today=None):
+    """Totals over the last `days` UTC days, today included."""
+    today = today or datetime.utcnow().date()
+    return range_totals(user_id, today - timedelta(days=days - 1), today + timedelta(days=1))
@@ -0,0 +1,55 @@
+from app import db
+from app.models.challenge import ChallengeParticipant
+from app.models.user import User
+from sqlalchemy import select, func
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def build_leaderboard(challenge, page=1, per_page=DEFAULT_PAGE_SIZE):
+    """Rank a challenge's participants and return one page of the result.
+
+    Progress is read from the values maintained on ChallengeParticipant
+    (see services.challenge_progress), so this is one COUNT plus one
+    ordered, paginated query joined to the users on the page.
+    """
+    total = db.session.execute(
+        select(func.count(ChallengeParticipant.id))
+        .where(ChallengeParticipant.challenge_id == challenge.id)
+    ).scalar()
+
+    per_page = max(1, per_page)
+    pages = max(1, (total + per_page - 1) // per_page)
+    page = min(max(1, page), pages)
+    offset = (page - 1) * per_page
+
+    rows = db.session.execute(
+        select(ChallengeParticipant, User)
+        .join(User, User.id == ChallengeParticipant.user_id)
+        .where(ChallengeParticipant.challenge_id == challenge.id)
+        # Sort by progress descending
+        .order_by(func.coalesce(ChallengeParticipant.current_value, 0.0).desc(), ChallengeParticipant.user_id)
+        .offset(offset)
+        .limit(per_page)
+    ).all()
+
+    entries = []
+    for rank, (participant, user) in enumerate(rows, start=offset + 1):
+        current_value = participant.current_value or 0
+        entries.append({
+            'rank': rank,
+            'user': user,
+            'user_id': user.id,
+            'progress': challenge.progress_for(current_value),
+            'current_value': current_value,
+            'completed': bool(participant.completed),
+            'workout_count': participant.workout_count or 0,
+        })
+
+    return {
+        'entries': entries,
+        'total': total,
+        'page': page,
+        'pages': pages,
+        'per_page': per_page,
+    }
@@ -0,0 +1,165 @@
+from datetime import datetime
+from app import db
+from app.models.challenge import Challenge, ChallengeParticipant
+from app.models.workout import Workout
+from sqlalchemy import select, update, func, and_, case
+import logging
+import time
+
+# ChallengeParticipant.current_value and workout_count are kept in sync with
+# workout writes here, so challenge pages never rescan raw workouts. Every
+# helper only adds statements to the current transaction; callers commit.
+
+
+def _participations(workout):
+    """Challenges the workout's owner takes part in whose window covers the workout."""
+    if not workout.created_at:
+        return []
+    return db.session.execute(
+        select(ChallengeParticipant.id, Challenge)
+        .join(Challenge, Challenge.id == ChallengeParticipant.challenge_id)
+        .where(
+            ChallengeParticipant.user_id == workout.user_id,
+            Challenge.start_date <= workout.created_at,
+            Challenge.end_date >= workout.created_at,
+        )
+    ).all()
+
+
+def _apply(workout, sign):
+    now = datetime.utcnow()
+    for participant_id, challenge in _participations(workout):
+        if not challenge.matches_workout(workout):
+            continue
+        delta = sign * challenge.goal_value_for(1, workout.distance)
+        new_value = func.coalesce(ChallengeParticipant.current_value, 0.0) + delta
+        values = {
+            'current_value': new_value,
+            'workout_count': func.coalesce(ChallengeParticipant.workout_count, 0) + sign,
+        }
+        if challenge.goal_value > 0:
+            # Flag completion in the same statement once the goal is reached
+            reached = new_value >= challenge.goal_value
+            values['completed'] = case((reached, True), else_=ChallengeParticipant.completed)
+            values['completed_at'] = case(
+                (and_(reached, ChallengeParticipant.completed_at.is_(None)), now),
+                else_=ChallengeParticipant.completed_at,
+            )
+        db.session.execute(
+            update(ChallengeParticipant)
+            .where(ChallengeParticipant.id == participant_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def record_workout_added(workout):
+    """Add a new workout to every challenge it counts towards."""
+    if workout.created_at is None:
+        db.session.flush()  # Populate the created_at default
+    _apply(workout, 1)
+
+
+def record_workout_removed(workout):
+    """Remove a deleted workout (or a snapshot of it) from its challenges."""
+    _apply(workout, -1)
+
+
+def record_workout_changed(workout, before):
+    """Move an edited workout's contribution from its `before` snapshot to its current state."""
+    _apply(before, -1)
+    _apply(workout, 1)
+
+
+def reset_user(user_id):
+    """Zero a user's progress in every challenge, e.g. after clearing their workouts."""
+    db.session.execute(
+        update(ChallengeParticipant)
+        .where(ChallengeParticipant.user_id == user_id)
+        .values(current_value=0.0, workout_count=0)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def participant_totals(challenge, user_id=None):
+    """Aggregate matching workouts per participant with one grouped query.
+
+    Returns (participant id, workout_count, total_distance) rows; the outer
+    join gives participants without matching workouts zeros.
+    """
+    query = (
+        select(
+            ChallengeParticipant.id,
+            func.count(Workout.id),
+            func.coalesce(func.sum(Workout.distance), 0.0),
+        )
+        .outerjoin(
+            Workout,
+            and_(Workout.user_id == ChallengeParticipant.user_id, *challenge.workout_filters()),
+        )
+        .where(ChallengeParticipant.challenge_id == challenge.id)
+        .group_by(ChallengeParticipant.id)
+    )
+    if user_id is not None:
+        query = query.where(ChallengeParticipant.user_id == user_id)
+    return db.session.execute(query).all()
+
+
+def rebuild_challenge(challenge, user_id=None):
+    """Recompute stored progress for a challenge's participants (no commit)."""
+    updates = []
+    completed_ids = []
+    for participant_id, workout_count, total_distance in participant_totals(challenge, user_id):
+        current_value = challenge.goal_value_for(workout_count, total_distance)
+        updates.append({
+            'id': participant_id,
+            'current_value': current_value,
+            'workout_count': workout_count,
+        })
+        if challenge.goal_value > 0 and challenge.progress_for(current_value) >= 100:
+            completed_ids.append(participant_id)
+
+    if updates:
+        db.session.execute(update(ChallengeParticipant), updates)
+    if completed_ids:
+        db.session.execute(
+            update(ChallengeParticipant)
+            .where(ChallengeParticipant.id.in_(completed_ids))
+            .values(
+                completed=True,
+                completed_at=func.coalesce(ChallengeParticipant.completed_at, datetime.utcnow()),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    return len(updates)
+
+
+def rebuild_user(user_id):
+    """Recompute one user's stored progress in every challenge they joined (no commit)."""
+    challenges = Challenge.query.join(ChallengeParticipant).filter(
+        ChallengeParticipant.user_id == user_id
+    ).all()
+    for challenge in challenges:
+        rebuild_challenge(challenge, user_id=user_id)
+
+
+def rebuild_all():
+    """Recompute stored progress for every challenge, one commit per challenge."""
+    started = time.perf_counter()
+    report = {'challenges': 0, 'participants': 0, 'elapsed': 0.0}
+    try:
+        for challenge in Challenge.query.order_by(Challenge.id).all():
+            report['participants'] += rebuild_challenge(challenge)
+            report['challenges'] += 1
+            db.session.commit()
+    except Exception as e:
+        logging.error(f"Error rebuilding challenge progress: {str(e)}")
+        db.session.rollback()
+        report['error'] = str(e)
+
+    report['elapsed'] = time.perf_counter() - started
+    logging.info(
+        f"Challenge progress: rebuilt {report['participants']} participants "
+        f"in {report['challenges']} challenges in {report['elapsed']:.2f}s"
+    )
+    return report
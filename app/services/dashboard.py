@@ -0,0 +1,203 @@
+from collections import OrderedDict
+from app import db
+from app.models.workout import Workout
+from app.services import activity_rollup, leveling
+from flask import current_app
+from sqlalchemy import select, event
+from sqlalchemy.orm import Session
+import json
+import threading
+import time
+
+# Per-user dashboard snapshot: level, rank, progress, decay status, weekly
+# totals (from the daily activity rollup) and recent workouts, built with
+# two queries and cached. Workout
+# writes and XP changes drop the user's snapshot, once right away and again
+# after the transaction commits, so a snapshot built from uncommitted data
+# never outlives the commit. The TTL bounds how stale the time-dependent
+# parts (decay countdown, 7-day window) can get.
+#
+# The backend is an in-process LRU by default; other worker processes only
+# see an invalidation once their own entry expires. Set DASHBOARD_CACHE_URL
+# to a redis:// URL to share snapshots (and invalidations) between workers
+# (needs the redis package), or call set_backend() with a stand-in.
+
+DEFAULT_TTL = 300
+DEFAULT_MAX_ENTRIES = 4096
+RECENT_WORKOUTS = 5
+
+_PENDING_KEY = 'dashboard_invalidate'
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class LRUCache:
+    """Thread-safe in-process cache with a size bound and per-entry expiry."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Cache on a Redis-protocol server; values are stored as JSON.
+
+    `client` is anything with Redis' get/setex/delete/scan_iter, e.g.
+    redis.Redis or a local stand-in.
+    """
+
+    def __init__(self, client, prefix='fl:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("DASHBOARD_CACHE_URL needs the 'redis' package") from e
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.setex(self.prefix + key, int(ttl), json.dumps(value))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self, batch_size=500):
+        """Delete every key under this cache's prefix, in SCAN batches."""
+        batch = []
+        for key in self.client.scan_iter(match=self.prefix + '*', count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                self.client.delete(*batch)
+                batch = []
+        if batch:
+            self.client.delete(*batch)
+
+
+def get_backend():
+    """Return the configured cache backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                url = current_app.config.get('DASHBOARD_CACHE_URL')
+                if url:
+                    _backend = RedisCache.from_url(url)
+                else:
+                    _backend = LRUCache(current_app.config.get('DASHBOARD_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+    return _backend
+
+
+def set_backend(backend):
+    """Replace the cache backend, e.g. with a Redis stand-in."""
+    global _backend
+    _backend = backend
+
+
+def _key(user_id):
+    return f'dashboard:{user_id}'
+
+
+def invalidate(*user_ids):
+    """Drop the users' snapshots now and again when the current transaction commits."""
+    if not user_ids:
+        return
+    if _backend is not None:
+        _backend.delete(*(_key(user_id) for user_id in user_ids))
+    db.session.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    if user_ids and _backend is not None:
+        _backend.delete(*(_key(user_id) for user_id in user_ids))
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_pending(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def build_snapshot(user):
+    """Build a user's dashboard snapshot: one rollup sum for the last 7 days, one query for recent workouts."""
+    xp_to_lose, days_until_decay = user.calculate_xp_decay()
+    effective_xp = max(0, (user.xp or 0) - xp_to_lose)
+    summary = leveling.level_summary(effective_xp)
+
+    week = activity_rollup.recent_totals(user.id, days=7)
+
+    recent = db.session.execute(
+        select(Workout.id, Workout.name, Workout.type, Workout.duration, Workout.xp_earned, Workout.created_at)
+        .where(Workout.user_id == user.id)
+        .order_by(Workout.created_at.desc(), Workout.id.desc())
+        .limit(RECENT_WORKOUTS)
+    ).all()
+
+    return {
+        'xp': effective_xp,
+        'level': summary['level'],
+        'rank': summary['rank'],
+        'xp_to_next': summary['xp_to_next'],
+        'progress': summary['progress'],
+        'xp_decay': [xp_to_lose, days_until_decay],
+        'weekly_xp': int(week['xp']),
+        'weekly_count': week['workouts'],
+        'recent_workouts': [{
+            'id': w.id,
+            'name': w.name,
+            'type': w.type,
+            'duration': w.duration,
+            'xp_earned': w.xp_earned,
+            'date': w.created_at.strftime('%Y-%m-%d') if w.created_at else ''
+        } for w in recent],
+    }
+
+
+def get_snapshot(user):
+    """Return the user's dashboard snapshot, from the cache when possible."""
+    backend = get_backend()
+    key = _key(user.id)
+    snapshot = backend.get(key)
+    if snapshot is None:
+        snapshot = build_snapshot(user)
+        backend.set(key, snapshot, current_app.config.get('DASHBOARD_CACHE_TTL', DEFAULT_TTL))
+    return snapshot
@@ -0,0 +1,216 @@
+from app import db
+from app.models.exercise import Exercise
+from app.models.exercise_set import ExerciseSet
+from sqlalchemy import select, insert, update, delete
+
+# Writes a strength workout's exercises and sets with bulk statements: one
+# executemany INSERT each for the exercises and the sets of a new workout,
+# and for edits only the INSERT/UPDATE/DELETE statements the diff needs,
+# however many exercises the workout has.
+
+
+def _int(value, default=0):
+    try:
+        return int(value) if value else default
+    except (ValueError, TypeError):
+        return default
+
+
+def _float(value, default=0.0):
+    try:
+        return float(value) if value else default
+    except (ValueError, TypeError):
+        return default
+
+
+def parse_exercises(exercises_data):
+    """Normalize the form's exercises_data into [{'id', 'name', 'sets'}], skipping unnamed exercises.
+
+    'id' is the stored row id the edit form sends back, or None for new rows.
+    """
+    exercises = []
+    for exercise_data in exercises_data:
+        name = (exercise_data.get('name') or '').strip()
+        if not name:
+            continue
+        sets = []
+        for position, set_data in enumerate(exercise_data.get('sets', []), start=1):
+            sets.append({
+                'id': _int(set_data.get('id'), None),
+                'set_number': _int(set_data.get('set_number'), position),
+                'weight': _float(set_data.get('weight')),
+                'reps': _int(set_data.get('reps')),
+                'notes': set_data.get('notes', '') or ''
+            })
+        exercises.append({'id': _int(exercise_data.get('id'), None), 'name': name, 'sets': sets})
+    return exercises
+
+
+def _set_row(exercise_id, user_id, set_data):
+    return {
+        'exercise_id': exercise_id,
+        'user_id': user_id,
+        'set_number': set_data['set_number'],
+        'weight': set_data['weight'],
+        'reps': set_data['reps'],
+        'notes': set_data['notes']
+    }
+
+
+def sets_by_exercise(exercises):
+    """(weight, reps) pairs per exercise name, as personal_records.record_sets takes them."""
+    pairs = {}
+    for exercise in exercises:
+        pairs.setdefault(exercise['name'], []).extend((s['weight'], s['reps']) for s in exercise['sets'])
+    return pairs
+
+
+def insert_exercises(workout_id, user_id, exercises):
+    """Insert parsed exercises and their sets for a new workout (no commit).
+
+    Returns the new exercise ids in input order.
+    """
+    if not exercises:
+        return []
+    db.session.execute(
+        insert(Exercise),
+        [{'workout_id': workout_id, 'user_id': user_id, 'name': e['name'], 'type': 'strength'} for e in exercises]
+    )
+    # Ids of one executemany ascend in row order, and the workout is new, so
+    # reading them back costs one statement on every dialect (SQLite cannot
+    # batch INSERT ... RETURNING while keeping the parameter order)
+    exercise_ids = db.session.scalars(
+        select(Exercise.id).where(Exercise.workout_id == workout_id).order_by(Exercise.id)
+    ).all()
+
+    set_rows = [
+        _set_row(exercise_id, user_id, set_data)
+        for exercise_id, exercise in zip(exercise_ids, exercises)
+        for set_data in exercise['sets']
+    ]
+    if set_rows:
+        db.session.execute(insert(ExerciseSet), set_rows)
+    return exercise_ids
+
+
+def _match(submitted, stored, key):
+    """Pair submitted items with stored rows: by id first, then by `key` in order.
+
+    Returns (pairs of (submitted, stored or None), unmatched stored rows).
+    """
+    by_id = {row['id']: row for row in stored}
+    pairs, used = [], set()
+    for item in submitted:
+        row = by_id.get(item['id'])
+        if row is not None and row['id'] not in used:
+            used.add(row['id'])
+            pairs.append([item, row])
+        else:
+            pairs.append([item, None])
+    # Clients that send no ids still match rows with the same name / set number
+    for pair in pairs:
+        if pair[1] is None:
+            row = next((r for r in stored if r['id'] not in used and r[key] == pair[0][key]), None)
+            if row is not None:
+                used.add(row['id'])
+                pair[1] = row
+    return pairs, [row for row in stored if row['id'] not in used]
+
+
+def save_exercise_diff(workout_id, user_id, exercises):
+    """Bring a workout's stored exercises and sets in line with parsed `exercises` (no commit).
+
+    Submitted rows are matched to stored ones by id, and only the differences
+    are written, as bulk INSERT, UPDATE and DELETE statements. Returns a
+    summary with the row counts, the exercise count before and after, and
+    the exercise names whose sets changed.
+    """
+    stored = {}
+    rows = db.session.execute(
+        select(Exercise.id, Exercise.name, ExerciseSet.id, ExerciseSet.set_number,
+               ExerciseSet.weight, ExerciseSet.reps, ExerciseSet.notes)
+        .outerjoin(ExerciseSet, ExerciseSet.exercise_id == Exercise.id)
+        .where(Exercise.workout_id == workout_id)
+        .order_by(Exercise.id, ExerciseSet.set_number, ExerciseSet.id)
+    )
+    for exercise_id, name, set_id, set_number, weight, reps, notes in rows:
+        exercise = stored.setdefault(exercise_id, {'id': exercise_id, 'name': name, 'sets': []})
+        if set_id is not None:
+            exercise['sets'].append({'id': set_id, 'set_number': set_number, 'weight': weight,
+                                     'reps': reps, 'notes': notes or ''})
+
+    summary = {
+        'exercises_before': len(stored), 'exercises_after': len(exercises),
+        'exercises_inserted': 0, 'exercises_updated': 0, 'exercises_deleted': 0,
+        'sets_inserted': 0, 'sets_updated': 0, 'sets_deleted': 0,
+        'changed_names': set()
+    }
+    exercise_pairs, removed = _match(exercises, list(stored.values()), 'name')
+
+    exercise_updates, set_inserts, set_updates, deleted_set_ids = [], [], [], []
+    new_exercises = []
+    for exercise, row in exercise_pairs:
+        if row is None:
+            new_exercises.append(exercise)
+            continue
+        if exercise['name'] != row['name']:
+            exercise_updates.append({'id': row['id'], 'name': exercise['name']})
+            summary['changed_names'].update([row['name'], exercise['name']])
+
+        set_pairs, removed_sets = _match(exercise['sets'], row['sets'], 'set_number')
+        for set_data, set_row in set_pairs:
+            if set_row is None:
+                set_inserts.append(_set_row(row['id'], user_id, set_data))
+            elif any(set_data[f] != set_row[f] for f in ('set_number', 'weight', 'reps', 'notes')):
+                set_updates.append({'id': set_row['id'], 'set_number': set_data['set_number'],
+                                    'weight': set_data['weight'], 'reps': set_data['reps'],
+                                    'notes': set_data['notes']})
+            else:
+                continue
+            summary['changed_names'].add(exercise['name'])
+        if removed_sets:
+            deleted_set_ids.extend(s['id'] for s in removed_sets)
+            summary['changed_names'].update([row['name'], exercise['name']])
+
+    removed_ids = [row['id'] for row in removed]
+    for row in removed:
+        deleted_set_ids.extend(s['id'] for s in row['sets'])
+        summary['changed_names'].add(row['name'])
+
+    if deleted_set_ids:
+        db.session.execute(delete(ExerciseSet).where(ExerciseSet.id.in_(deleted_set_ids)))
+    if removed_ids:
+        db.session.execute(delete(Exercise).where(Exercise.id.in_(removed_ids)))
+    if exercise_updates:
+        db.session.execute(update(Exercise), exercise_updates)
+    if set_updates:
+        db.session.execute(update(ExerciseSet), set_updates)
+    if set_inserts:
+        db.session.execute(insert(ExerciseSet), set_inserts)
+    if new_exercises:
+        db.session.execute(
+            insert(Exercise),
+            [{'workout_id': workout_id, 'user_id': user_id, 'name': e['name'], 'type': 'strength'} for e in new_exercises]
+        )
+        # The new rows are the ones with ids above every stored exercise of this workout
+        new_ids = db.session.scalars(
+            select(Exercise.id).where(Exercise.workout_id == workout_id, Exercise.id.not_in(list(stored)))
+            .order_by(Exercise.id)
+        ).all()
+        new_set_rows = [
+            _set_row(exercise_id, user_id, set_data)
+            for exercise_id, exercise in zip(new_ids, new_exercises)
+            for set_data in exercise['sets']
+        ]
+        if new_set_rows:
+            db.session.execute(insert(ExerciseSet), new_set_rows)
+        summary['sets_inserted'] += len(new_set_rows)
+        summary['changed_names'].update(e['name'] for e in new_exercises)
+
+    summary['exercises_inserted'] = len(new_exercises)
+    summary['exercises_updated'] = len(exercise_updates)
+    summary['exercises_deleted'] = len(removed_ids)
+    summary['sets_inserted'] += len(set_inserts)
+    summary['sets_updated'] = len(set_updates)
+    summary['sets_deleted'] = len(deleted_set_ids)
+    return summary
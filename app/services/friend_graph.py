@@ -0,0 +1,109 @@
+import time
+from app import db
+from app.models.friendship import Friendship
+from sqlalchemy import select, or_, and_
+
+# Per-process adjacency cache: user_id -> (expires_at, frozenset of friend ids).
+# Entries are dropped on accept/reject/remove; the TTL bounds staleness across
+# worker processes that did not see the change. Because of that the cache
+# only serves listings; access checks (are_friends) query the database.
+ADJACENCY_TTL = 300
+
+_adjacency = {}
+
+
+def invalidate(*user_ids):
+    """Drop cached friend sets for the given users."""
+    for user_id in user_ids:
+        _adjacency.pop(user_id, None)
+
+
+def clear_cache():
+    """Drop every cached friend set."""
+    _adjacency.clear()
+
+
+def _load_adjacency(user_ids):
+    """Load accepted friend ids for several users with one query."""
+    user_ids = set(user_ids)
+    rows = db.session.execute(
+        select(Friendship.user_id, Friendship.friend_id).where(
+            Friendship.status == 'accepted',
+            or_(Friendship.user_id.in_(user_ids), Friendship.friend_id.in_(user_ids)),
+        )
+    ).all()
+
+    friends = {user_id: set() for user_id in user_ids}
+    for user_id, friend_id in rows:
+        if user_id in friends:
+            friends[user_id].add(friend_id)
+        if friend_id in friends:
+            friends[friend_id].add(user_id)
+    return friends
+
+
+def friends_of(user_ids):
+    """Return {user_id: frozenset(friend ids)} for several users."""
+    now = time.monotonic()
+    result = {}
+    missing = []
+    for user_id in user_ids:
+        cached = _adjacency.get(user_id)
+        if cached and cached[0] > now:
+            result[user_id] = cached[1]
+        else:
+            missing.append(user_id)
+
+    if missing:
+        expires_at = now + ADJACENCY_TTL
+        for user_id, friends in _load_adjacency(missing).items():
+            friends = frozenset(friends)
+            _adjacency[user_id] = (expires_at, friends)
+            result[user_id] = friends
+    return result
+
+
+def friend_ids(user_id):
+    """Return the accepted friend ids of a user."""
+    return friends_of([user_id])[user_id]
+
+
+def are_friends(user_a, user_b):
+    """Check whether two users are accepted friends.
+
+    Used for authorization, so it skips the adjacency cache: a friendship
+    removed in another worker process must stop granting access at once.
+    Each direction is a lookup on the unique (user_id, friend_id) index.
+    """
+    return db.session.execute(
+        select(Friendship.id).where(
+            Friendship.status == 'accepted',
+            or_(
+                and_(Friendship.user_id == user_a, Friendship.friend_id == user_b),
+                and_(Friendship.user_id == user_b, Friendship.friend_id == user_a),
+            ),
+        ).limit(1)
+    ).first() is not None
+
+
+def mutual_friends(user_a, user_b):
+    """Return the ids of friends two users have in common."""
+    friends = friends_of([user_a, user_b])
+    return friends[user_a] & friends[user_b]
+
+
+def get_friends(user_id):
+    """Load a user's accepted friends as User objects with one joined query."""
+    from app.models.user import User
+
+    friends = User.query.join(
+        Friendship,
+        or_(
+            and_(Friendship.user_id == user_id, Friendship.friend_id == User.id),
+            and_(Friendship.friend_id == user_id, Friendship.user_id == User.id),
+        ),
+    ).filter(Friendship.status == 'accepted').order_by(User.username).all()
+
+    # The same rows give us the adjacency set for free
+    _adjacency[user_id] = (time.monotonic() + ADJACENCY_TTL, frozenset(f.id for f in friends))
+    return friends
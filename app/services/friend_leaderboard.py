@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models.friendship import Friendship
+from app.models.user_activity_daily import UserActivityDaily
+from app.services import leveling, xp_decay
+from app.services.dashboard import LRUCache
+from flask import current_app
+from sqlalchemy import select, func, case, literal, and_, union
+
+# Weekly and monthly XP standings of a user and their accepted friends, read
+# with one grouped query: the friend ids come from a union over friendship,
+# and each member's window totals from the daily activity rollup. Weeks start
+# on Monday and both windows use UTC days, like the rollup. Levels are
+# shown from the decay-projected XP, like the dashboard and profile.
+#
+# Boards are cached per viewer for FRIEND_LEADERBOARD_TTL seconds. A user's
+# own board is dropped when they log a workout or their friendships change;
+# friends' boards pick up the new totals when their entry expires.
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 4096
+
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = LRUCache(current_app.config.get('FRIEND_LEADERBOARD_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+    return _cache
+
+
+def invalidate(*user_ids):
+    """Drop the cached boards of the given viewers."""
+    if _cache is not None:
+        _cache.delete(*user_ids)
+
+
+def windows(today=None):
+    """Return (week_start, month_start, end) UTC days for the current week and month."""
+    today = today or datetime.utcnow().date()
+    return today - timedelta(days=today.weekday()), today.replace(day=1), today + timedelta(days=1)
+
+
+def _members(user_id):
+    """Ids of the user and their accepted friends, as a subquery."""
+    accepted = Friendship.status == 'accepted'
+    return union(
+        select(literal(user_id).label('id')),
+        select(Friendship.friend_id).where(Friendship.user_id == user_id, accepted),
+        select(Friendship.user_id).where(Friendship.friend_id == user_id, accepted),
+    ).subquery()
+
+
+def _ranked(rows, key):
+    """Rows ordered by one window's XP, numbered from 1."""
+    ordered = sorted(rows, key=lambda row: (-row[key + '_xp'], row['username'].lower()))
+    return [dict(row, rank=rank) for rank, row in enumerate(ordered, start=1)]
+
+
+def build_board(user_id, today=None):
+    """Compute the weekly and monthly standings of a user's friend circle with one query."""
+    from app.models.user import User
+
+    week_start, month_start, end = windows(today)
+    members = _members(user_id)
+    rollup = UserActivityDaily
+    in_week = rollup.day >= week_start
+
+    def window_sum(column, condition):
+        return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+    rows = db.session.execute(
+        select(
+            User.id,
+            User.username,
+            User.xp,
+            User.xp_decay_rate,
+            User.last_workout_date,
+            User.last_decay_applied_at,
+            User.xp_decay_grace_days,
+            window_sum(rollup.xp, in_week).label('week_xp'),
+            window_sum(rollup.workouts, in_week).label('week_workouts'),
+            window_sum(rollup.xp, rollup.day >= month_start).label('month_xp'),
+            window_sum(rollup.workouts, rollup.day >= month_start).label('month_workouts'),
+        )
+        .join(members, members.c.id == User.id)
+        .outerjoin(rollup, and_(
+            rollup.user_id == User.id,
+            rollup.day >= min(week_start, month_start),
+            rollup.day < end,
+        ))
+        .group_by(
+            User.id, User.username, User.xp, User.xp_decay_rate,
+            User.last_workout_date, User.last_decay_applied_at, User.xp_decay_grace_days,
+        )
+    ).all()
+
+    members = [{
+        'user_id': row.id,
+        'username': row.username,
+        'level': leveling.level_for_xp(xp_decay.effective_xp(
+            row.xp, row.xp_decay_rate, row.last_workout_date, row.last_decay_applied_at, row.xp_decay_grace_days
+        )),
+        'week_xp': int(row.week_xp),
+        'week_workouts': int(row.week_workouts),
+        'month_xp': int(row.month_xp),
+        'month_workouts': int(row.month_workouts),
+    } for row in rows]
+
+    return {
+        'week_start': week_start.isoformat(),
+        'month_start': month_start.isoformat(),
+        'week': _ranked(members, 'week'),
+        'month': _ranked(members, 'month'),
+    }
+
+
+def get_board(user_id):
+    """Return a user's friend leaderboard, from the cache when possible."""
+    cache = _get_cache()
+    board = cache.get(user_id)
+    if board is None:
+        board = build_board(user_id)
+        cache.set(user_id, board, current_app.config.get('FRIEND_LEADERBOARD_TTL', DEFAULT_TTL))
+    return board
@@ -0,0 +1,32 @@
+from flask import current_app
+from app import db
+from app.models.user import User
+from app.services.jobs import handler
+from app.services.strava import StravaService, RateBudget
+
+
+@handler('strava_sync')
+def strava_sync(job):
+    """Import new Strava activities for a user."""
+    user = db.session.get(User, job.user_id)
+    if not user or not user.strava_access_token:
+        return {'imported': 0, 'skipped': 'not connected to Strava'}
+
+    service = StravaService(
+        client_id=current_app.config.get('STRAVA_CLIENT_ID'),
+        client_secret=current_app.config.get('STRAVA_CLIENT_SECRET')
+    )
+    rate_budget = RateBudget(
+        max_requests=current_app.config.get('STRAVA_RATE_BUDGET', 90),
+        min_interval=current_app.config.get('STRAVA_REQUEST_INTERVAL', 0)
+    )
+    # Exceptions propagate so the queue schedules a retry
+    report = service.backfill_activities(
+        user, full_history=job.get_payload().get('full_history', False), rate_budget=rate_budget
+    )
+    return {
+        'imported': report['imported'],
+        'fetched': report['fetched'],
+        'pages': report['pages'],
+        'complete': report['complete']
+    }
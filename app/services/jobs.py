@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models.background_job import BackgroundJob
+from sqlalchemy import update
+import json
+import logging
+import time
+
+# Database-backed job queue. Web requests enqueue jobs; `flask jobs-worker`
+# claims and runs them outside the request cycle, retrying failures with
+# exponential backoff.
+
+BACKOFF_BASE = 30  # seconds before the first retry
+BACKOFF_MAX = 3600
+LOCK_TIMEOUT = timedelta(minutes=15)  # Running jobs older than this are assumed dead
+CLAIM_CANDIDATES = 10  # Due jobs tried per claim before giving up to other workers
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+HANDLERS = {}
+
+
+def handler(job_type):
+    """Register a function as the handler for a job type."""
+    def decorator(func):
+        HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+def enqueue(job_type, user_id=None, payload=None, max_attempts=5, unique=True):
+    """Queue a job (no commit).
+
+    With unique=True an already queued or running job of the same type for
+    the same user is returned instead of queueing a duplicate.
+    """
+    if unique:
+        existing = BackgroundJob.query.filter(
+            BackgroundJob.job_type == job_type,
+            BackgroundJob.user_id == user_id,
+            BackgroundJob.status.in_(ACTIVE_STATUSES)
+        ).first()
+        if existing:
+            return existing
+
+    job = BackgroundJob(
+        job_type=job_type,
+        user_id=user_id,
+        payload=json.dumps(payload or {}),
+        max_attempts=max_attempts,
+        run_at=datetime.utcnow()
+    )
+    db.session.add(job)
+    return job
+
+
+def latest_job(job_type, user_id):
+    """Most recent job of a type for a user, for status polling."""
+    return BackgroundJob.query.filter_by(job_type=job_type, user_id=user_id)\
+        .order_by(BackgroundJob.id.desc())\
+        .first()
+
+
+def backoff_delay(attempts):
+    """Seconds to wait before retrying after the given number of attempts."""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(0, attempts - 1))
+
+
+def requeue_stale(now=None):
+    """Put jobs whose worker died back on the queue."""
+    now = now or datetime.utcnow()
+    count = BackgroundJob.query.filter(
+        BackgroundJob.status == 'running',
+        BackgroundJob.locked_at < now - LOCK_TIMEOUT
+    ).update({'status': 'queued', 'locked_at': None}, synchronize_session=False)
+    db.session.commit()
+    return count
+
+
+def claim_next(now=None):
+    """Claim the next due job and mark it running (commits).
+
+    The claim is a conditional UPDATE that only succeeds while the job is
+    still queued, so two workers can never both claim the same job; a
+    worker that loses the race moves on to the next due job.
+    """
+    now = now or datetime.utcnow()
+    query = db.session.query(BackgroundJob.id).filter(
+        BackgroundJob.status == 'queued',
+        BackgroundJob.run_at <= now
+    ).order_by(BackgroundJob.run_at, BackgroundJob.id).limit(CLAIM_CANDIDATES)
+
+    if db.engine.dialect.name == 'postgresql':
+        # Let concurrent workers skip rows another worker has locked
+        query = query.with_for_update(skip_locked=True)
+
+    for job_id, in query.all():
+        claimed = db.session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, BackgroundJob.status == 'queued')
+            .values(status='running', locked_at=now, attempts=BackgroundJob.attempts + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if claimed:
+            db.session.commit()
+            return db.session.get(BackgroundJob, job_id, populate_existing=True)
+
+    db.session.rollback()
+    return None
+
+
+def run_job(job):
+    """Run a claimed job and record success, a scheduled retry or failure."""
+    func = HANDLERS.get(job.job_type)
+    try:
+        if func is None:
+            raise LookupError(f"No handler registered for job type {job.job_type}")
+        result = func(job)
+        job.status = 'succeeded'
+        job.result = json.dumps(result) if result is not None else None
+        job.last_error = None
+        job.locked_at = None
+        db.session.commit()
+        logging.info(f"Job {job.id} ({job.job_type}) succeeded")
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(BackgroundJob, job.id)
+        job.last_error = str(e)
+        job.locked_at = None
+        if job.attempts < job.max_attempts:
+            job.status = 'queued'
+            job.run_at = datetime.utcnow() + timedelta(seconds=backoff_delay(job.attempts))
+            logging.warning(f"Job {job.id} ({job.job_type}) failed, retrying at {job.run_at}: {e}")
+        else:
+            job.status = 'failed'
+            logging.error(f"Job {job.id} ({job.job_type}) failed permanently: {e}")
+        db.session.commit()
+    return job
+
+
+def work(max_jobs=None, idle_sleep=2.0, burst=False):
+    """Worker loop: claim and run due jobs.
+
+    With burst=True the loop exits once no job is due; otherwise it polls
+    every idle_sleep seconds. Returns the number of jobs run.
+    """
+    import app.services.job_handlers  # noqa: F401  Registers the handlers
+
+    processed = 0
+    requeue_stale()
+    while max_jobs is None or processed < max_jobs:
+        job = claim_next()
+        if job is None:
+            if burst:
+                break
+            time.sleep(idle_sleep)
+            requeue_stale()
+            continue
+        run_job(job)
+        processed += 1
+    return processed
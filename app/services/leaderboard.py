@@ -0,0 +1,235 @@
+from array import array
+from bisect import bisect_left
+from app import db
+from app.models.user import User
+from app.services import friend_graph, leveling
+from flask import current_app
+from sqlalchemy import select, func
+import threading
+import time
+
+# Global XP leaderboard. Users are ordered by (xp DESC, id), which the
+# ix_user_xp_id index serves directly: a page is an index range read and a
+# user's rank is 1 + the number of users ordered before them, counted on the
+# same index. Views can be narrowed to a user's friends or to one rank tier.
+#
+# The board ranks and labels users by stored xp, not the decay-projected
+# effective_xp the dashboard shows. The viewer's own rank can be taken at
+# their effective_xp (see get_rank) without writing anything; other users'
+# decay is written by the daily decay job, so their place can lag their
+# dashboard by up to a day.
+#
+# A COUNT still walks every index entry ahead of the user, so with
+# LEADERBOARD_MEMORY_INDEX set, global and tier ranks come from RankIndex
+# instead: the sorted keys of all users, loaded from the index and refreshed
+# every LEADERBOARD_INDEX_TTL seconds, answered by binary search.
+
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_INDEX_TTL = 60
+
+_ID_BITS = 32  # Ids must stay below 2**32 to fit beside the XP in one key
+
+_rank_index = None
+_rank_index_lock = threading.Lock()
+
+
+def tier_bounds(tier):
+    """Return the [min, max) XP range of a rank tier; max is None for the top tier."""
+    names = [name for _, name in leveling.RANK_TIERS]
+    if tier not in names:
+        raise ValueError(f"Unknown rank tier: {tier}")
+    position = names.index(tier)
+    low = leveling.RANK_TIERS[position][0]
+    high = leveling.RANK_TIERS[position + 1][0] if position + 1 < len(names) else None
+    return low, high
+
+
+def _scope(user_ids=None, tier=None):
+    conditions = [User.xp.is_not(None)]
+    if user_ids is not None:
+        conditions.append(User.id.in_(user_ids))
+    if tier:
+        low, high = tier_bounds(tier)
+        conditions.append(User.xp >= low)
+        if high is not None:
+            conditions.append(User.xp < high)
+    return conditions
+
+
+def friend_scope(user):
+    """Ids of the user and their accepted friends."""
+    return set(friend_graph.friend_ids(user.id)) | {user.id}
+
+
+def _in_tier(xp, tier):
+    if not tier:
+        return True
+    low, high = tier_bounds(tier)
+    return xp >= low and (high is None or xp < high)
+
+
+def _percentile(rank, total):
+    """Share of the ranked users placed below `rank`, 0-100."""
+    return round(100.0 * (total - rank) / total, 2) if total else 0.0
+
+
+def get_page(page=1, per_page=DEFAULT_PAGE_SIZE, user_ids=None, tier=None):
+    """Return one page of the leaderboard, optionally limited to user_ids or a rank tier.
+
+    Costs one COUNT and one ordered, paginated read of the xp index; the
+    COUNT comes from the RankIndex for global and tier views when enabled.
+    """
+    conditions = _scope(user_ids, tier)
+    if user_ids is None and _memory_index_enabled():
+        total = get_rank_index().count(tier=tier)
+    else:
+        total = db.session.scalar(select(func.count(User.id)).where(*conditions))
+
+    per_page = max(1, per_page)
+    pages = max(1, (total + per_page - 1) // per_page)
+    page = min(max(1, page), pages)
+    offset = (page - 1) * per_page
+
+    rows = db.session.execute(
+        select(User.id, User.username, User.xp, User.level)
+        .where(*conditions)
+        .order_by(User.xp.desc(), User.id)
+        .offset(offset)
+        .limit(per_page)
+    ).all()
+
+    return {
+        'entries': [{
+            'rank': rank,
+            'user_id': row.id,
+            'username': row.username,
+            'xp': row.xp,
+            'level': row.level,
+            'rank_name': leveling.rank_for_xp(row.xp),
+        } for rank, row in enumerate(rows, start=offset + 1)],
+        'total': total,
+        'page': page,
+        'pages': pages,
+        'per_page': per_page,
+    }
+
+
+def get_rank(user, user_ids=None, tier=None, xp=None):
+    """Return {'rank', 'total', 'percentile'} of a user within the leaderboard or a view of it.
+
+    `xp` places the user at another XP than the stored one, e.g. their
+    effective_xp; their own stored row is then not counted against them.
+    Global and tier views use the in-memory RankIndex when it is enabled;
+    otherwise the rank is two index range COUNTs: users with more XP, and
+    users with the same XP and a smaller id.
+    """
+    stored_xp = user.xp or 0
+    xp = stored_xp if xp is None else xp
+    if user_ids is None and _memory_index_enabled():
+        return get_rank_index().rank(xp, user.id, tier=tier, stored_xp=stored_xp)
+
+    conditions = _scope(user_ids, tier)
+    others = User.id != user.id
+    ahead_more_xp = select(func.count(User.id)).where(*conditions, others, User.xp > xp).scalar_subquery()
+    ahead_same_xp = select(func.count(User.id)).where(*conditions, others, User.xp == xp, User.id < user.id).scalar_subquery()
+    total = select(func.count(User.id)).where(*conditions, others).scalar_subquery()
+    ahead, total = db.session.execute(select(ahead_more_xp + ahead_same_xp, total)).one()
+
+    rank = ahead + 1
+    if (user_ids is None or user.id in user_ids) and _in_tier(xp, tier):
+        total += 1
+    # A user outside the view (e.g. in another tier) is ranked where they would be
+    total = max(total, rank)
+    return {'rank': rank, 'total': total, 'percentile': _percentile(rank, total)}
+
+
+class RankIndex:
+    """Sorted (xp DESC, id) keys of all ranked users, for O(log n) rank and percentile.
+
+    Each user is one signed 64-bit key, -(xp << 32) + id, so ascending keys
+    follow the leaderboard order and the whole index takes 8 bytes per user.
+    """
+
+    def __init__(self, keys, built_at=None):
+        self.keys = keys
+        self.built_at = built_at if built_at is not None else time.monotonic()
+
+    @staticmethod
+    def key(xp, user_id):
+        return -((xp or 0) << _ID_BITS) + user_id
+
+    @classmethod
+    def load(cls, batch_size=10000):
+        """Read every ranked user from the xp index, already in leaderboard order."""
+        keys = array('q')
+        result = db.session.execute(
+            select(User.xp, User.id).where(User.xp.is_not(None)).order_by(User.xp.desc(), User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        key = cls.key
+        for xp, user_id in result:
+            keys.append(key(xp, user_id))
+        return cls(keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _position(self, key):
+        """Number of keys below `key`."""
+        return bisect_left(self.keys, key)
+
+    def count_at_least(self, xp):
+        """Number of users with at least `xp` XP."""
+        return self._position(self.key(xp - 1, 0)) if xp > 0 else len(self.keys)
+
+    def _bounds(self, tier):
+        """Positions [start, end) of a tier's users, or of everyone."""
+        if not tier:
+            return 0, len(self.keys)
+        low, high = tier_bounds(tier)
+        return (self.count_at_least(high) if high is not None else 0), self.count_at_least(low)
+
+    def count(self, tier=None):
+        """Number of users, in total or in one tier."""
+        start, end = self._bounds(tier)
+        return end - start
+
+    def rank(self, xp, user_id, tier=None, stored_xp=None):
+        """Return {'rank', 'total', 'percentile'} like get_rank, in O(log n).
+
+        With stored_xp, the user's own key at that XP is taken out and the
+        user counted at `xp` instead.
+        """
+        position = self._position(self.key(xp, user_id))
+        start, end = self._bounds(tier)
+        total = end - start
+        if stored_xp is not None and stored_xp != xp:
+            own = self.key(stored_xp, user_id)
+            own_position = self._position(own)
+            if own_position < len(self.keys) and self.keys[own_position] == own:
+                # Positions as if the stored key were not there
+                position, start, end = (p - 1 if own_position < p else p for p in (position, start, end))
+            total = end - start + (1 if _in_tier(xp, tier) else 0)
+        # Users outside the tier are placed at its edge, as the COUNT query does;
+        # users whose XP changed since the load are ranked where they would be now
+        rank = min(max(position, start), end) - start + 1
+        total = max(total, rank)
+        return {'rank': rank, 'total': total, 'percentile': _percentile(rank, total)}
+
+
+def _memory_index_enabled():
+    return bool(current_app.config.get('LEADERBOARD_MEMORY_INDEX'))
+
+
+def get_rank_index(max_age=None):
+    """Return the in-memory RankIndex, reloading it once it is older than max_age seconds."""
+    global _rank_index
+    if max_age is None:
+        max_age = current_app.config.get('LEADERBOARD_INDEX_TTL', DEFAULT_INDEX_TTL)
+    index = _rank_index
+    if index is None or time.monotonic() - index.built_at > max_age:
+        with _rank_index_lock:
+            if _rank_index is None or time.monotonic() - _rank_index.built_at > max_age:
+                _rank_index = RankIndex.load()
+            index = _rank_index
+    return index
@@ -0,0 +1,103 @@
+from bisect import bisect_right
+from math import isqrt
+
+# Level curve: 300 XP to reach level 2, then each level costs 100 XP more
+# than the previous one (400, 500, 600, ...). The XP needed to go from
+# level L to L + 1 is therefore 200 + 100 * L, and the cumulative XP needed
+# to reach level L is 50 * (L - 1) * (L + 4).
+
+# Rank tiers as (minimum XP, rank name), ordered by XP
+RANK_TIERS = [
+    (0, 'Bronze'),
+    (2000, 'Silver'),
+    (5000, 'Gold'),
+    (10000, 'Platinum'),
+    (20000, 'Diamond'),
+    (35000, 'Master'),
+    (55000, 'Grandmaster'),
+    (80000, 'Elite'),
+    (110000, 'Legend'),
+    (150000, 'Mythic'),
+    (200000, 'GOAT'),
+]
+
+_RANK_THRESHOLDS = [threshold for threshold, _ in RANK_TIERS]
+_RANK_NAMES = [name for _, name in RANK_TIERS]
+
+
+def _clean_xp(xp):
+    return max(0, int(xp or 0))
+
+
+def level_start_xp(level):
+    """Total XP needed to reach the given level."""
+    level = max(1, level)
+    return 50 * (level - 1) * (level + 4)
+
+
+def level_cost(level):
+    """XP needed to go from the given level to the next one."""
+    return 200 + 100 * max(1, level)
+
+
+def level_for_xp(xp):
+    """Return the level for a total XP amount."""
+    # Largest L with (L - 1) * (L + 4) <= xp // 50, solved exactly with isqrt
+    return (isqrt(25 + 4 * (_clean_xp(xp) // 50)) - 3) // 2
+
+
+def xp_to_next(xp):
+    """Return the XP still needed to reach the next level."""
+    xp = _clean_xp(xp)
+    return level_start_xp(level_for_xp(xp) + 1) - xp
+
+
+def progress_pct(xp):
+    """Return progress towards the next level (0-100)."""
+    xp = _clean_xp(xp)
+    level = level_for_xp(xp)
+    return min(100, (xp - level_start_xp(level)) / level_cost(level) * 100)
+
+
+def rank_for_xp(xp):
+    """Return the rank name for a total XP amount."""
+    return _RANK_NAMES[bisect_right(_RANK_THRESHOLDS, _clean_xp(xp)) - 1]
+
+
+# Batch helpers for whole user lists (relevel jobs, leaderboards). They apply
+# the scalar functions per value: each is already O(1) (isqrt) or a bisect
+# over a short table, and sorting the input to merge it with the thresholds
+# measured slower in pure Python.
+
+def batch_level_for_xp(xp_values):
+    """Return levels for a sequence of XP amounts, one closed-form lookup each."""
+    return [level_for_xp(xp) for xp in xp_values]
+
+
+def batch_xp_to_next(xp_values):
+    """Return XP-to-next-level for a sequence of XP amounts."""
+    return [xp_to_next(xp) for xp in xp_values]
+
+
+def batch_progress_pct(xp_values):
+    """Return level progress percentages for a sequence of XP amounts."""
+    return [progress_pct(xp) for xp in xp_values]
+
+
+def batch_rank_for_xp(xp_values):
+    """Return rank names for a sequence of XP amounts, one bisect each."""
+    return [rank_for_xp(xp) for xp in xp_values]
+
+
+def level_summary(xp):
+    """Return level, rank, XP to next level and progress in one pass."""
+    xp = _clean_xp(xp)
+    level = level_for_xp(xp)
+    start = level_start_xp(level)
+    cost = level_cost(level)
+    return {
+        'level': level,
+        'rank': rank_for_xp(xp),
+        'xp_to_next': start + cost - xp,
+        'progress': min(100, (xp - start) / cost * 100),
+    }
@@ -0,0 +1,164 @@
+from app import db
+from app.models.personal_record import PersonalRecord
+from app.models.exercise import Exercise
+from app.models.exercise_set import ExerciseSet
+from app.models.workout import Workout
+from sqlalchemy import select, insert, update, delete, func
+from datetime import datetime
+import logging
+import time
+
+# PersonalRecord rows hold each user's best set per exercise and metric over
+# their whole history. New sets can only raise a record, so inserts update it
+# incrementally; deleting or editing sets recomputes just the affected
+# exercises. Writes are bulk statements; helpers only add them to the
+# current transaction.
+
+METRICS = ('max_weight', 'max_reps', 'max_volume')
+
+
+def empty_records():
+    return {metric: 0 for metric in METRICS}
+
+
+def set_metrics(weight, reps):
+    """Metric values of one set; sets without both weight and reps don't count."""
+    if not weight or not reps:
+        return None
+    return {'max_weight': weight, 'max_reps': reps, 'max_volume': weight * reps}
+
+
+def _load(user_id, exercise_names):
+    """Existing records for the exercises as {(name, metric): (id, value)}."""
+    rows = db.session.execute(
+        select(PersonalRecord.id, PersonalRecord.exercise_name, PersonalRecord.metric, PersonalRecord.value).where(
+            PersonalRecord.user_id == user_id,
+            PersonalRecord.exercise_name.in_(exercise_names)
+        )
+    )
+    return {(name, metric): (record_id, value) for record_id, name, metric, value in rows}
+
+
+def _store(user_id, best, existing, lower=False):
+    """Write best {(name, metric): value} with one bulk INSERT and one bulk UPDATE.
+
+    Existing values that are higher are kept unless lower=True.
+    """
+    now = datetime.utcnow()
+    inserts, updates = [], []
+    for (name, metric), value in best.items():
+        current = existing.get((name, metric))
+        if current is None:
+            inserts.append({'user_id': user_id, 'exercise_name': name, 'metric': metric,
+                            'value': value, 'updated_at': now})
+        elif value > current[1] or (lower and value != current[1]):
+            updates.append({'id': current[0], 'value': value, 'updated_at': now})
+    if inserts:
+        db.session.execute(insert(PersonalRecord), inserts)
+    if updates:
+        db.session.execute(update(PersonalRecord), updates)
+
+
+def record_sets(user_id, sets_by_exercise):
+    """Raise records with newly written sets.
+
+    sets_by_exercise maps exercise name to (weight, reps) pairs. Costs one
+    lookup of the current records plus the changed rows.
+    """
+    best = {}
+    for name, sets in sets_by_exercise.items():
+        for weight, reps in sets:
+            values = set_metrics(weight, reps)
+            if not values:
+                continue
+            for metric, value in values.items():
+                if value > best.get((name, metric), 0):
+                    best[(name, metric)] = value
+    if best:
+        _store(user_id, best, _load(user_id, {name for name, _ in best}))
+
+
+def recompute(user_id, exercise_names, exclude_workout_id=None):
+    """Recompute records for the given exercises from all remaining sets.
+
+    Pass exclude_workout_id when the workout is about to be deleted in the
+    same transaction.
+    """
+    exercise_names = set(exercise_names)
+    if not exercise_names:
+        return
+    valid = ExerciseSet.weight.is_not(None) & (ExerciseSet.weight > 0) & \
+        ExerciseSet.reps.is_not(None) & (ExerciseSet.reps > 0)
+    query = (
+        select(
+            Exercise.name,
+            func.max(ExerciseSet.weight),
+            func.max(ExerciseSet.reps),
+            func.max(ExerciseSet.weight * ExerciseSet.reps)
+        )
+        .join(ExerciseSet, ExerciseSet.exercise_id == Exercise.id)
+        .join(Workout, Workout.id == Exercise.workout_id)
+        .where(Exercise.user_id == user_id, Exercise.name.in_(exercise_names), valid)
+        .group_by(Exercise.name)
+    )
+    if exclude_workout_id is not None:
+        query = query.where(Exercise.workout_id != exclude_workout_id)
+
+    best = {}
+    for name, max_weight, max_reps, max_volume in db.session.execute(query):
+        best.update({(name, 'max_weight'): max_weight, (name, 'max_reps'): max_reps, (name, 'max_volume'): max_volume})
+
+    existing = _load(user_id, exercise_names)
+    stale = [record_id for key, (record_id, _) in existing.items() if key not in best]
+    if stale:
+        db.session.execute(delete(PersonalRecord).where(PersonalRecord.id.in_(stale)))
+    _store(user_id, best, existing, lower=True)
+
+
+def exercise_names_for(workout_id):
+    """Names of the exercises logged in a workout."""
+    return set(db.session.scalars(select(Exercise.name).where(Exercise.workout_id == workout_id)))
+
+
+def reset_user(user_id):
+    """Drop all of a user's records, e.g. after clearing their workouts."""
+    db.session.execute(delete(PersonalRecord).where(PersonalRecord.user_id == user_id))
+
+
+def get_records(user_id, exercise_names):
+    """Return {name: {metric: value}} for the exercises with one indexed lookup."""
+    exercise_names = set(exercise_names)
+    records = {name: empty_records() for name in exercise_names}
+    if not exercise_names:
+        return records
+    rows = db.session.execute(
+        select(PersonalRecord.exercise_name, PersonalRecord.metric, PersonalRecord.value).where(
+            PersonalRecord.user_id == user_id,
+            PersonalRecord.exercise_name.in_(exercise_names)
+        )
+    )
+    for name, metric, value in rows:
+        records[name][metric] = value
+    return records
+
+
+def rebuild_all():
+    """Rebuild every user's records from their sets, one commit per user."""
+    started = time.perf_counter()
+    report = {'users': 0, 'elapsed': 0.0}
+    try:
+        user_ids = db.session.scalars(select(Exercise.user_id).distinct().order_by(Exercise.user_id)).all()
+        for user_id in user_ids:
+            names = db.session.scalars(select(Exercise.name).where(Exercise.user_id == user_id).distinct()).all()
+            reset_user(user_id)
+            recompute(user_id, names)
+            db.session.commit()
+            report['users'] += 1
+    except Exception as e:
+        logging.error(f"Error rebuilding personal records: {str(e)}")
+        db.session.rollback()
+        report['error'] = str(e)
+
+    report['elapsed'] = time.perf_counter() - started
+    logging.info(f"Personal records: rebuilt {report['users']} users in {report['elapsed']:.2f}s")
+    return report
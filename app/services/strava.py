@@ -1,10 +1,45 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import time
 from app import db
+from sqlalchemy import select, insert
 from app.models.workout import Workout
 from app.models.user import User
+from app.services import workout_events
+
+class RateBudget:
+    """Caps the Strava API requests one sync or backfill run may make."""
+
+    def __init__(self, max_requests=90, min_interval=0.0):
+        self.max_requests = max_requests
+        self.min_interval = min_interval
+        self.used = 0
+        self._last_request = None
+
+    def acquire(self):
+        """Reserve one request; returns False once the budget is spent."""
+        if self.max_requests is not None and self.used >= self.max_requests:
+            return False
+        if self.min_interval and self._last_request is not None:
+            wait = self.min_interval - (time.monotonic() - self._last_request)
+            if wait > 0:
+                time.sleep(wait)
+        self._last_request = time.monotonic()
+        self.used += 1
+        return True
+
 
 class StravaService:
-    def __init__(self, client_id, client_secret):
+    # Activities requested per page while paging through history
+    PAGE_SIZE = 100
+
+    def __init__(self, client_id, client_secret, client=None):
+        if client is not None:
+            # Injected client, e.g. services.strava_fake.FakeStravaClient
+            self.client = client
+            self.client_id = client_id
+            self.client_secret = client_secret
+            self._strava_available = True
+            return
         try:
             from stravalib import Client
             self.client = Client()
@@ -53,147 +88,216 @@ class StravaService:
             print(traceback.format_exc())
             raise
 
-    def get_athlete_activities(self, access_token, after_date=None):
-        """Fetch athlete activities from Strava."""
+    def get_athlete_activities(self, access_token, after_date=None, before_date=None, limit=30):
+        """Fetch one page of athlete activities from Strava.
+
+        With after_date, Strava returns the oldest activities after that
+        time first, which is what makes cursor paging possible.
+        """
         self._check_availability()
         try:
-            print(f"Fetching activities with token: {access_token[:10]}... after date: {after_date}")
-            self.client = self.client.__class__(access_token)  # Create new client instance with token
-            activities = list(self.client.get_activities(limit=30))  # Get last 30 activities
+            print(f"Fetching activities with token: {access_token[:10]}... after: {after_date} before: {before_date}")
+            self.client.access_token = access_token
+            activities = list(self.client.get_activities(after=after_date, before=before_date, limit=limit))
             print(f"Found {len(activities)} activities")
             return activities
         except Exception as e:
             print(f"Error fetching activities: {str(e)}")
             import traceback
             print(traceback.format_exc())
-            return []
+            raise
 
-    def import_activity(self, activity, user):
-        """Import a Strava activity as a workout."""
-        self._check_availability()
-        try:
-            print(f"Importing activity: {activity.name} ({activity.type})")
-            
-            # Check if activity already exists
-            existing_workout = Workout.query.filter_by(strava_id=str(activity.id)).first()
-            if existing_workout:
-                print(f"Activity {activity.name} already exists, skipping...")
-                return None
-            
-            # Convert Strava activity type to our workout type
-            activity_type = activity.type.root.lower() if hasattr(activity.type, 'root') else str(activity.type).lower()
-            print(f"Activity type: {activity_type}")
-            
-            if activity_type in ['run', 'walk', 'hike']:
-                workout_type = 'cardio'
-            elif activity_type in ['ride', 'virtualride', 'cycling']:
-                workout_type = 'cardio'
-            elif activity_type in ['swim']:
-                workout_type = 'cardio'
-            elif activity_type in ['weighttraining', 'workout', 'strength']:
-                workout_type = 'strength'
-            else:
-                workout_type = 'other'
+    def activity_to_workout_fields(self, activity, user):
+        """Map a Strava activity to Workout column values."""
+        # Convert Strava activity type to our workout type
+        activity_type = activity.type.root.lower() if hasattr(activity.type, 'root') else str(activity.type).lower()
+        
+        if activity_type in ['run', 'walk', 'hike']:
+            workout_type = 'cardio'
+        elif activity_type in ['ride', 'virtualride', 'cycling']:
+            workout_type = 'cardio'
+        elif activity_type in ['swim']:
+            workout_type = 'cardio'
+        elif activity_type in ['weighttraining', 'workout', 'strength']:
+            workout_type = 'strength'
+        else:
+            workout_type = 'other'
 
-            print(f"Mapped to workout type: {workout_type}")
+        # Calculate duration in minutes - handle Duration object
+        if hasattr(activity.elapsed_time, 'seconds'):
+            duration = int(activity.elapsed_time.seconds / 60)
+        else:
+            duration = int(float(str(activity.elapsed_time)) / 60)
 
-            # Calculate duration in minutes - handle Duration object
-            if hasattr(activity.elapsed_time, 'seconds'):
-                duration = int(activity.elapsed_time.seconds / 60)
+        # Get distance if available
+        distance = None
+        if hasattr(activity, 'distance'):
+            if hasattr(activity.distance, 'num'):
+                distance = float(activity.distance.num) / 1000  # Convert to km
             else:
-                duration = int(float(str(activity.elapsed_time)) / 60)
-            print(f"Duration: {duration} minutes")
-
-            # Get distance if available
-            distance = None
-            if hasattr(activity, 'distance'):
-                if hasattr(activity.distance, 'num'):
-                    distance = float(activity.distance.num) / 1000  # Convert to km
-                else:
-                    distance = float(str(activity.distance)) / 1000  # Convert to km
-                print(f"Distance: {distance} km")
-
-            # Calculate intensity based on distance for runs
-            intensity = 5  # Default intensity
-            if activity_type == 'run' and distance is not None:
-                # Convert km to miles
-                miles = distance * 0.621371
-                # Set intensity based on miles (1-10 scale)
-                intensity = min(10, max(1, int(miles)))
-                print(f"Run distance: {miles:.2f} miles -> Intensity: {intensity}")
-            elif hasattr(activity, 'suffer_score') and activity.suffer_score:
-                intensity = min(10, max(1, int(activity.suffer_score / 10)))
-            print(f"Final intensity: {intensity}")
-
-            # Create workout
-            workout = Workout(
-                user_id=user.id,
-                name=str(activity.name),
-                type=workout_type,
-                duration=duration,
-                intensity=intensity,
-                distance=distance,
-                notes=f"Imported from Strava: {activity.description if hasattr(activity, 'description') else ''}",
-                created_at=activity.start_date_local,
-                strava_id=str(activity.id)  # Store Strava ID to prevent duplicates
-            )
+                distance = float(str(activity.distance)) / 1000  # Convert to km
+
+        # Calculate intensity based on distance for runs
+        intensity = 5  # Default intensity
+        if activity_type == 'run' and distance is not None:
+            # Convert km to miles
+            miles = distance * 0.621371
+            # Set intensity based on miles (1-10 scale)
+            intensity = min(10, max(1, int(miles)))
+        elif hasattr(activity, 'suffer_score') and activity.suffer_score:
+            intensity = min(10, max(1, int(activity.suffer_score / 10)))
+
+        return {
+            'user_id': user.id,
+            'name': str(activity.name),
+            'type': workout_type,
+            'duration': duration,
+            'intensity': intensity,
+            'distance': distance,
+            'notes': f"Imported from Strava: {activity.description if hasattr(activity, 'description') else ''}",
+            'created_at': activity.start_date_local,
+            'strava_id': str(activity.id)  # Store Strava ID to prevent duplicates
+        }
+
+    def import_activities(self, activities, user, commit=True):
+        """Import a batch of Strava activities as workouts.
+
+        Known activities are found with one IN query, new workouts are
+        written with one bulk INSERT, and the XP and derived stats are
+        credited once for the whole batch.
+        """
+        self._check_availability()
+        if not activities:
+            return []
+        try:
+            # Check which activities already exist
+            strava_ids = {str(activity.id) for activity in activities}
+            existing = set(db.session.scalars(
+                select(Workout.strava_id).where(Workout.strava_id.in_(strava_ids))
+            ))
+            print(f"{len(existing)} of {len(strava_ids)} activities already imported")
             
-            print(f"Adding workout to database: {workout.name}")
-            db.session.add(workout)
-            db.session.commit()
+            rows = []
+            seen = set(existing)
+            for activity in activities:
+                strava_id = str(activity.id)
+                if strava_id in seen:
+                    continue
+                seen.add(strava_id)
+                
+                fields = self.activity_to_workout_fields(activity, user)
+                # Imported workouts have no exercises
+                fields['xp_earned'] = Workout(**fields).calculate_xp(exercise_count=0)
+                rows.append(fields)
+            
+            if not rows:
+                return []
             
-            # Calculate XP after commit to ensure we have the workout ID
-            xp = workout.calculate_xp()
-            print(f"Workout base XP calculated: {xp}")
+            print(f"Adding {len(rows)} workouts to database")
+            workouts = db.session.scalars(insert(Workout).returning(Workout), rows).all()
             
-            # Update user's XP using the proper method
-            leveled_up = user.add_xp(xp)
-            print(f"Added {xp} XP to user (new total: {user.xp})")
+            # Credit the XP for the whole batch at once
+            total_xp = sum(row['xp_earned'] for row in rows)
+            leveled_up = user.add_xp(total_xp)
+            workout_events.workouts_imported(user, workouts)
+            print(f"Added {total_xp} XP to user (new total: {user.xp})")
             if leveled_up:
                 print(f"Level up! Now level {user.level}")
             
-            db.session.commit()
+            if commit:
+                db.session.commit()
             
-            return workout
+            return workouts
         except Exception as e:
-            print(f"Error importing activity: {str(e)}")
+            print(f"Error importing activities: {str(e)}")
             import traceback
             print(traceback.format_exc())
+            if not commit:
+                # The caller owns the transaction (and any checkpoint in it)
+                raise
             db.session.rollback()
-            return None
+            return []
+
+    def import_activity(self, activity, user):
+        """Import a Strava activity as a workout."""
+        workouts = self.import_activities([activity], user)
+        return workouts[0] if workouts else None
+
+    @staticmethod
+    def _activity_start(activity):
+        """Activity start time as a naive UTC datetime."""
+        start = getattr(activity, 'start_date', None) or activity.start_date_local
+        if start.tzinfo is not None:
+            start = start.astimezone(timezone.utc).replace(tzinfo=None)
+        return start
 
-    def sync_activities(self, user):
-        """Sync recent activities from Strava."""
+    def backfill_activities(self, user, full_history=True, page_size=None, rate_budget=None):
+        """Page through the athlete's activities from the saved checkpoint.
+
+        Pages are requested oldest-first with the `after` cursor. After each
+        page the imported workouts and the new cursor
+        (user.strava_sync_cursor) are committed together, so an interrupted
+        run resumes from the last finished page. Stops when history is
+        exhausted or the rate budget is spent.
+        """
         self._check_availability()
-        print("\n=== Starting Strava Sync ===")
+        page_size = page_size or self.PAGE_SIZE
+        rate_budget = rate_budget or RateBudget()
+        report = {'pages': 0, 'fetched': 0, 'imported': 0, 'complete': False, 'workouts': []}
+
         if not user.strava_access_token:
             print("No Strava access token found")
-            return []
+            return report
 
-        # Get the last sync time or default to 7 days ago
-        last_sync = user.strava_last_sync or (datetime.utcnow() - timedelta(days=7))
-        print(f"Last sync: {last_sync}")
-        
-        try:
-            print("Fetching activities from Strava...")
-            activities = self.get_athlete_activities(user.strava_access_token, after_date=last_sync)
-            imported_workouts = []
-            
-            print(f"Processing {len(activities)} activities...")
-            for activity in activities:
-                workout = self.import_activity(activity, user)
-                if workout:
-                    imported_workouts.append(workout)
-                    print(f"Successfully imported: {workout.name}")
-            
-            # Update last sync time
-            user.strava_last_sync = datetime.utcnow()
+        cursor = user.strava_sync_cursor
+        if cursor is None:
+            # A fresh backfill starts at the beginning of history; a plain sync looks back 7 days
+            cursor = datetime(1970, 1, 1) if full_history else datetime.utcnow() - timedelta(days=7)
+
+        while rate_budget.acquire():
+            # Overlap by a second so activities sharing the cursor timestamp are not skipped;
+            # the strava_id check drops the ones already imported
+            activities = self.get_athlete_activities(
+                user.strava_access_token, after_date=cursor - timedelta(seconds=1), limit=page_size
+            )
+            report['pages'] += 1
+            report['fetched'] += len(activities)
+
+            if activities:
+                workouts = self.import_activities(activities, user, commit=False)
+                report['imported'] += len(workouts)
+                report['workouts'].extend(workouts)
+
+                newest = max(self._activity_start(activity) for activity in activities)
+                # Always move forward, even if a whole page shares one timestamp
+                cursor = newest if newest > cursor else cursor + timedelta(seconds=1)
+                user.strava_sync_cursor = cursor
+
+            if len(activities) < page_size:
+                report['complete'] = True
+                user.strava_last_sync = datetime.utcnow()
+
+            # Checkpoint: imported workouts and cursor are committed together
             db.session.commit()
-            
-            print(f"=== Sync Complete: Imported {len(imported_workouts)} activities ===\n")
-            return imported_workouts
+
+            if report['complete']:
+                break
+
+        print(f"Backfill: {report['pages']} pages, {report['fetched']} fetched, "
+              f"{report['imported']} imported, complete={report['complete']}")
+        return report
+
+    def sync_activities(self, user, rate_budget=None):
+        """Sync new activities from Strava since the last checkpoint."""
+        self._check_availability()
+        print("\n=== Starting Strava Sync ===")
+        try:
+            report = self.backfill_activities(user, full_history=False, rate_budget=rate_budget)
+            print(f"=== Sync Complete: Imported {report['imported']} activities ===\n")
+            return report['workouts']
         except Exception as e:
             print(f"Error syncing Strava activities: {str(e)}")
             import traceback
             print(traceback.format_exc())
-            return [] 
\ No newline at end of file
+            db.session.rollback()
+            return []
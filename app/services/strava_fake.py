@@ -0,0 +1,58 @@
+import random
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Local stand-in for stravalib.Client serving synthetic activities, for
+# exercising sync and backfill without network access or API quota:
+#
+#     client = FakeStravaClient(activity_count=5000)
+#     StravaService(client_id, client_secret, client=client).backfill_activities(user)
+
+ACTIVITY_TYPES = ['Run', 'Ride', 'Swim', 'Walk', 'Hike', 'WeightTraining', 'Yoga']
+
+
+class FakeStravaClient:
+    def __init__(self, activity_count=1000, start=None, seed=0):
+        rng = random.Random(seed)
+        start = start or datetime.utcnow() - timedelta(days=3 * 365)
+        self.access_token = None
+        self.requests = 0
+
+        when = start
+        self.activities = []
+        for activity_id in range(1, activity_count + 1):
+            when += timedelta(minutes=rng.randint(60, 2 * 24 * 60))
+            activity_type = rng.choice(ACTIVITY_TYPES)
+            self.activities.append(SimpleNamespace(
+                id=1_000_000 + activity_id,
+                name=f"{activity_type} #{activity_id}",
+                type=activity_type,
+                elapsed_time=SimpleNamespace(seconds=rng.randint(15, 150) * 60),
+                distance=float(rng.randint(0, 40000)),
+                start_date=when,
+                start_date_local=when,
+                description='',
+                suffer_score=rng.randint(0, 150),
+            ))
+        self._starts = [activity.start_date for activity in self.activities]
+
+    def authorization_url(self, client_id, redirect_uri, approval_prompt='auto', scope=None):
+        return f"{redirect_uri}?code=fake-code"
+
+    def exchange_code_for_token(self, client_id, client_secret, code):
+        expires_at = int((datetime.utcnow() + timedelta(hours=6)).timestamp())
+        return {'access_token': 'fake-access-token', 'refresh_token': 'fake-refresh-token', 'expires_at': expires_at}
+
+    def get_activities(self, before=None, after=None, limit=None):
+        """Mimic Strava paging: ascending after `after`, otherwise newest first."""
+        self.requests += 1
+        if after is not None:
+            matches = self.activities[bisect_right(self._starts, after):]
+            if before is not None:
+                matches = [a for a in matches if a.start_date < before]
+        else:
+            matches = self.activities[::-1]
+            if before is not None:
+                matches = [a for a in matches if a.start_date < before]
+        return iter(matches[:limit] if limit else matches)
@@ -0,0 +1,174 @@
+from app import db
+from app.models.user import User
+from app.models.workout import Workout
+from sqlalchemy import select, update, func
+import logging
+import time
+
+STATS_CHUNK_SIZE = 1000
+
+
+def workout_totals(workout):
+    """Return the stat contribution of a single workout."""
+    return {
+        'distance': workout.distance or 0.0,
+        'duration': workout.duration or 0,
+        'calories': workout.calories or 0,
+    }
+
+
+def apply_stat_delta(user_id, workouts=0, distance=0.0, duration=0, calories=0):
+    """Atomically add deltas to a user's stat counters (no commit)."""
+    if not (workouts or distance or duration or calories):
+        return
+    db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            total_workouts=func.coalesce(User.total_workouts, 0) + workouts,
+            total_distance=func.coalesce(User.total_distance, 0.0) + distance,
+            total_duration=func.coalesce(User.total_duration, 0) + duration,
+            total_calories=func.coalesce(User.total_calories, 0) + calories,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_workout_added(workout):
+    """Count a newly created workout in its owner's stats."""
+    apply_stat_delta(workout.user_id, workouts=1, **workout_totals(workout))
+
+
+def record_workout_removed(workout):
+    """Remove a deleted workout from its owner's stats."""
+    totals = workout_totals(workout)
+    apply_stat_delta(workout.user_id, workouts=-1, **{k: -v for k, v in totals.items()})
+
+
+def record_workout_changed(workout, before):
+    """Apply the difference between the `before` snapshot and the workout now."""
+    before = workout_totals(before)
+    after = workout_totals(workout)
+    apply_stat_delta(workout.user_id, **{k: after[k] - before[k] for k in after})
+
+
+def reset_user(user):
+    """Zero a user's stat counters, e.g. after clearing their workouts."""
+    user.total_workouts = 0
+    user.total_distance = 0.0
+    user.total_duration = 0
+    user.total_calories = 0
+
+
+def compute_user_totals(user_id):
+    """Compute a user's stats from their workouts with one aggregate query."""
+    row = db.session.execute(
+        select(
+            func.count(Workout.id),
+            func.coalesce(func.sum(Workout.distance), 0.0),
+            func.coalesce(func.sum(Workout.duration), 0),
+            func.coalesce(func.sum(Workout.calories), 0),
+        ).where(Workout.user_id == user_id)
+    ).one()
+    return {
+        'total_workouts': row[0],
+        'total_distance': float(row[1]),
+        'total_duration': int(row[2]),
+        'total_calories': int(row[3]),
+    }
+
+
+def compute_profile_stats(user_id):
+    """Compute a user's totals and workout type distribution with one GROUP BY type query."""
+    rows = db.session.execute(
+        select(
+            Workout.type,
+            func.count(Workout.id),
+            func.coalesce(func.sum(Workout.distance), 0.0),
+            func.coalesce(func.sum(Workout.duration), 0),
+            func.coalesce(func.sum(Workout.calories), 0),
+        )
+        .where(Workout.user_id == user_id)
+        .group_by(Workout.type)
+        .order_by(func.count(Workout.id).desc(), Workout.type)
+    ).all()
+    return {
+        'total_workouts': sum(row[1] for row in rows),
+        'total_distance': float(sum(row[2] for row in rows)),
+        'total_duration': int(sum(row[3] for row in rows)),
+        'total_calories': int(sum(row[4] for row in rows)),
+        'workout_types': {row[0]: row[1] for row in rows},
+    }
+
+
+def reconcile_user_stats(chunk_size=STATS_CHUNK_SIZE):
+    """Recompute all users' stat counters from their workouts.
+
+    Users are walked in primary-key chunks; each chunk costs one grouped
+    aggregate over workout and one bulk UPDATE for the users whose stored
+    counters drifted.
+    """
+    started = time.perf_counter()
+    report = {'scanned': 0, 'updated': 0, 'chunks': 0, 'elapsed': 0.0}
+
+    last_id = 0
+    try:
+        while True:
+            users = db.session.execute(
+                select(
+                    User.id,
+                    User.total_workouts,
+                    User.total_distance,
+                    User.total_duration,
+                    User.total_calories,
+                ).where(User.id > last_id).order_by(User.id).limit(chunk_size)
+            ).all()
+            if not users:
+                break
+            first_id, last_id = users[0].id, users[-1].id
+            report['scanned'] += len(users)
+            report['chunks'] += 1
+
+            totals = {
+                row.user_id: row
+                for row in db.session.execute(
+                    select(
+                        Workout.user_id,
+                        func.count(Workout.id).label('workouts'),
+                        func.coalesce(func.sum(Workout.distance), 0.0).label('distance'),
+                        func.coalesce(func.sum(Workout.duration), 0).label('duration'),
+                        func.coalesce(func.sum(Workout.calories), 0).label('calories'),
+                    )
+                    .where(Workout.user_id.between(first_id, last_id))
+                    .group_by(Workout.user_id)
+                )
+            }
+
+            updates = []
+            for user in users:
+                row = totals.get(user.id)
+                values = {
+                    'total_workouts': row.workouts if row else 0,
+                    'total_distance': float(row.distance) if row else 0.0,
+                    'total_duration': int(row.duration) if row else 0,
+                    'total_calories': int(row.calories) if row else 0,
+                }
+                stored = (user.total_workouts, user.total_distance, user.total_duration, user.total_calories)
+                if stored != tuple(values.values()):
+                    updates.append({'id': user.id, **values})
+
+            if updates:
+                db.session.execute(update(User), updates)
+                report['updated'] += len(updates)
+            db.session.commit()
+    except Exception as e:
+        logging.error(f"Error reconciling user stats: {str(e)}")
+        db.session.rollback()
+        report['error'] = str(e)
+
+    report['elapsed'] = time.perf_counter() - started
+    logging.info(
+        f"User stats: scanned {report['scanned']} users, "
+        f"updated {report['updated']} in {report['elapsed']:.2f}s"
+    )
+    return report
@@ -0,0 +1,133 @@
+from app import db
+from app.models.workout import Workout
+from app.models.exercise import Exercise
+from app.models.exercise_set import ExerciseSet
+from sqlalchemy import select
+
+# Read-only view of a workout with its exercises and ordered sets, shared by
+# the workout page, the edit form and the JSON endpoints. Loading one costs
+# two queries however many exercises the workout has.
+
+
+class _ViewModel:
+    """Immutable record built from keyword arguments."""
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {getattr(self, "id", None)}>'
+
+
+class SetView(_ViewModel):
+    __slots__ = ('id', 'set_number', 'reps', 'weight', 'notes')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'set_number': self.set_number,
+            'reps': self.reps,
+            'weight': self.weight,
+            'notes': self.notes
+        }
+
+
+class ExerciseView(_ViewModel):
+    __slots__ = ('id', 'name', 'sets')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'sets_count': len(self.sets),
+            'sets': [s.to_dict() for s in self.sets]
+        }
+
+
+class WorkoutDetail(_ViewModel):
+    __slots__ = ('id', 'user_id', 'name', 'type', 'subtype', 'duration', 'intensity', 'distance',
+                 'calories', 'notes', 'created_at', 'xp_earned', 'strava_id', 'exercises')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'type': self.type,
+            'subtype': self.subtype,
+            'duration': self.duration,
+            'intensity': self.intensity,
+            'distance': self.distance,
+            'calories': self.calories,
+            'xp_earned': self.xp_earned,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'notes': self.notes,
+            'exercises_count': len(self.exercises),
+            'exercises': [e.to_dict() for e in self.exercises]
+        }
+
+    def form_exercises(self):
+        """Exercises in the shape the strength form's exercises_data uses."""
+        return [{
+            'id': exercise.id,
+            'name': exercise.name,
+            'sets': [{
+                'id': s.id,
+                'set_number': s.set_number,
+                'weight': s.weight,
+                'reps': s.reps,
+                'notes': s.notes
+            } for s in exercise.sets]
+        } for exercise in self.exercises]
+
+
+def load_workout_detail(workout_id):
+    """Load a workout with its exercises and ordered sets, or return None."""
+    workout = db.session.get(Workout, workout_id)
+    if workout is None:
+        return None
+
+    exercises = {}
+    rows = db.session.execute(
+        select(Exercise.id, Exercise.name, ExerciseSet)
+        .outerjoin(ExerciseSet, ExerciseSet.exercise_id == Exercise.id)
+        .where(Exercise.workout_id == workout_id)
+        .order_by(Exercise.id, ExerciseSet.set_number, ExerciseSet.id)
+    )
+    for exercise_id, exercise_name, exercise_set in rows:
+        _, sets = exercises.setdefault(exercise_id, (exercise_name, []))
+        if exercise_set is not None:
+            sets.append(SetView(
+                id=exercise_set.id,
+                set_number=exercise_set.set_number,
+                reps=exercise_set.reps,
+                weight=exercise_set.weight,
+                notes=exercise_set.notes or ''
+            ))
+
+    return WorkoutDetail(
+        id=workout.id,
+        user_id=workout.user_id,
+        name=workout.name,
+        type=workout.type,
+        subtype=workout.subtype,
+        duration=workout.duration,
+        intensity=workout.intensity,
+        distance=workout.distance,
+        calories=workout.calories,
+        notes=workout.notes,
+        created_at=workout.created_at,
+        xp_earned=workout.xp_earned,
+        strava_id=workout.strava_id,
+        exercises=tuple(
+            ExerciseView(id=exercise_id, name=name, sets=tuple(sets))
+            for exercise_id, (name, sets) in exercises.items()
+        )
+    )
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+from app.services import activity_rollup, challenge_progress, dashboard, friend_leaderboard, personal_records, user_stats
+
+# Single place where workout writes fan out to the derived data that is
+# maintained incrementally (user stat counters, daily activity rollup,
+# challenge progress, personal records) or cached (dashboard snapshots,
+# friend leaderboards).
+# Handlers only add statements to the current transaction; callers commit.
+
+
+def snapshot(workout):
+    """Copy the fields derived data depends on, before an edit or delete."""
+    return SimpleNamespace(
+        id=workout.id,
+        user_id=workout.user_id,
+        type=workout.type,
+        subtype=workout.subtype,
+        distance=workout.distance,
+        duration=workout.duration,
+        calories=workout.calories,
+        xp_earned=workout.xp_earned,
+        created_at=workout.created_at,
+    )
+
+
+def workout_added(workout):
+    """Update derived data for a newly created workout."""
+    user_stats.record_workout_added(workout)
+    activity_rollup.record_workout_added(workout)
+    challenge_progress.record_workout_added(workout)
+    dashboard.invalidate(workout.user_id)
+    friend_leaderboard.invalidate(workout.user_id)
+
+
+def workout_changed(workout, before):
+    """Update derived data for an edited workout, given its `before` snapshot."""
+    user_stats.record_workout_changed(workout, before)
+    activity_rollup.record_workout_changed(workout, before)
+    challenge_progress.record_workout_changed(workout, before)
+    dashboard.invalidate(workout.user_id)
+    friend_leaderboard.invalidate(workout.user_id)
+
+
+def workout_removed(workout):
+    """Update derived data for a workout that is about to be deleted."""
+    user_stats.record_workout_removed(workout)
+    activity_rollup.record_workout_removed(workout)
+    challenge_progress.record_workout_removed(workout)
+    personal_records.recompute(
+        workout.user_id, personal_records.exercise_names_for(workout.id), exclude_workout_id=workout.id
+    )
+    dashboard.invalidate(workout.user_id)
+    friend_leaderboard.invalidate(workout.user_id)
+
+
+def workouts_imported(user, workouts):
+    """Update derived data for a batch of workouts inserted for one user."""
+    user_stats.apply_stat_delta(
+        user.id,
+        workouts=len(workouts),
+        distance=sum(w.distance or 0.0 for w in workouts),
+        duration=sum(w.duration or 0 for w in workouts),
+        calories=sum(w.calories or 0 for w in workouts),
+    )
+    activity_rollup.record_workouts_imported(workouts)
+    challenge_progress.rebuild_user(user.id)
+    dashboard.invalidate(user.id)
+    friend_leaderboard.invalidate(user.id)
+
+
+def workouts_cleared(user):
+    """Reset derived data after all of a user's workouts were deleted."""
+    user_stats.reset_user(user)
+    activity_rollup.reset_user(user.id)
+    challenge_progress.reset_user(user.id)
+    personal_records.reset_user(user.id)
+    dashboard.invalidate(user.id)
+    friend_leaderboard.invalidate(user.id)
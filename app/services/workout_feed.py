@@ -0,0 +1,91 @@
+from datetime import datetime
+from app.models.workout import Workout
+from sqlalchemy import tuple_
+import base64
+
+# Keyset pagination over a user's workouts, newest first. Pages are addressed
+# by an opaque cursor holding the (created_at, id) of the last row shown, so
+# every page is an index range scan on (user_id, created_at, id) no matter
+# how deep the user scrolls. Legacy rows without a created_at come after all
+# dated rows, newest id first; their cursors carry only the id, and they are
+# read from the same index with created_at IS NULL.
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(workout):
+    """Cursor pointing just past the given workout."""
+    created_at = workout.created_at.isoformat() if workout.created_at else ''
+    raw = f"{created_at}|{workout.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) from a cursor, created_at None past the dated rows; raises ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, workout_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return (datetime.fromisoformat(created_at) if created_at else None), int(workout_id)
+    except (TypeError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def page_workouts(user_id, cursor=None, page_size=DEFAULT_PAGE_SIZE,
+                  workout_type=None, subtype=None, start=None, end=None):
+    """Return one page of a user's workouts, newest first.
+
+    Filters are optional: workout_type, subtype, and a created_at range
+    [start, end). Returns {'workouts', 'next_cursor', 'has_more', 'page_size'}.
+    """
+    page_size = min(max(1, page_size), MAX_PAGE_SIZE)
+    query = Workout.query.filter(Workout.user_id == user_id)
+    if workout_type:
+        query = query.filter(Workout.type == workout_type)
+    if subtype:
+        query = query.filter(Workout.subtype == subtype)
+    if start:
+        query = query.filter(Workout.created_at >= start)
+    if end:
+        query = query.filter(Workout.created_at < end)
+
+    created_at, workout_id = decode_cursor(cursor) if cursor else (None, None)
+    rows = []
+    # One extra row tells us whether another page exists
+    if not cursor or created_at is not None:
+        dated = query.filter(Workout.created_at.is_not(None))
+        if cursor:
+            dated = dated.filter(tuple_(Workout.created_at, Workout.id) < tuple_(created_at, workout_id))
+        rows = dated.order_by(Workout.created_at.desc(), Workout.id.desc()).limit(page_size + 1).all()
+    if len(rows) <= page_size and not (start or end):
+        # Dated rows ran out on this page: continue with the undated ones
+        undated = query.filter(Workout.created_at.is_(None))
+        if cursor and created_at is None:
+            undated = undated.filter(Workout.id < workout_id)
+        rows += undated.order_by(Workout.id.desc()).limit(page_size + 1 - len(rows)).all()
+
+    has_more = len(rows) > page_size
+    workouts = rows[:page_size]
+    return {
+        'workouts': workouts,
+        'next_cursor': encode_cursor(workouts[-1]) if has_more else None,
+        'has_more': has_more,
+        'page_size': page_size
+    }
+
+
+def workout_to_dict(workout):
+    """List-item fields of a workout for the JSON feed."""
+    return {
+        'id': workout.id,
+        'name': workout.name,
+        'type': workout.type,
+        'subtype': workout.subtype,
+        'duration': workout.duration,
+        'intensity': workout.intensity,
+        'distance': workout.distance,
+        'calories': workout.calories,
+        'xp_earned': workout.xp_earned,
+        'notes': workout.notes,
+        'created_at': workout.created_at.isoformat() if workout.created_at else None
+    }
@@ -0,0 +1,104 @@
+from app import db
+from app.models.workout import Workout
+from app.models.exercise import Exercise
+from app.models.exercise_set import ExerciseSet
+from sqlalchemy import select, func, case, and_
+
+CARDIO_SUBTYPES = ['cardio_running', 'cardio_cycling', 'cardio_swimming', 'cardio_hiit', 'cardio_other']
+STRENGTH_SUBTYPES = ['strength_upper', 'strength_lower', 'strength_push', 'strength_pull', 'strength_full', 'strength_other']
+
+
+def _history_key(subtypes):
+    """SQL expression mapping a workout to the form subtype it prefills.
+
+    Exact subtype matches win, then subtypes containing the short name
+    (e.g. '%push%'), then legacy strength workouts without a subtype whose
+    name mentions it.
+    """
+    whens = [(Workout.subtype == subtype, subtype) for subtype in subtypes]
+    for subtype in subtypes:
+        short = subtype.replace('strength_', '')
+        whens.append((Workout.subtype.like(f'%{short}%'), subtype))
+    for subtype in subtypes:
+        short = subtype.replace('strength_', '')
+        name = func.lower(Workout.name)
+        whens.append((
+            and_(
+                Workout.subtype.is_(None),
+                Workout.type == 'strength',
+                name.like(f"%{short.replace('_', ' ')}%") | name.like(f"%{short.replace('_', '')}%")
+            ),
+            subtype
+        ))
+    return case(*whens, else_=None)
+
+
+def latest_by_subtype(user_id, subtypes):
+    """Return {subtype: {'last_workout': {...}}} for the user's latest workout of each subtype.
+
+    One ROW_NUMBER() OVER (PARTITION BY subtype) query picks the latest
+    workout per subtype and one batched query loads their exercises and
+    sets, however many subtypes the form offers.
+    """
+    key = _history_key(subtypes).label('history_key')
+    ranked = (
+        select(
+            Workout.id,
+            key,
+            func.row_number().over(
+                partition_by=key,
+                order_by=(Workout.created_at.desc(), Workout.id.desc())
+            ).label('rn')
+        )
+        .where(Workout.user_id == user_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(ranked.c.history_key, Workout)
+        .join(Workout, Workout.id == ranked.c.id)
+        .where(ranked.c.rn == 1, ranked.c.history_key.is_not(None))
+    ).all()
+    if not rows:
+        return {}
+
+    exercises = {}
+    for exercise, exercise_set in db.session.execute(
+        select(Exercise, ExerciseSet)
+        .outerjoin(ExerciseSet, ExerciseSet.exercise_id == Exercise.id)
+        .where(Exercise.workout_id.in_([workout.id for _, workout in rows]))
+        .order_by(Exercise.workout_id, Exercise.id, ExerciseSet.set_number)
+    ):
+        entry = exercises.setdefault(exercise.workout_id, {}).setdefault(
+            exercise.id, {'name': exercise.name, 'sets': []}
+        )
+        if exercise_set is not None:
+            entry['sets'].append({
+                'set_number': exercise_set.set_number,
+                'reps': exercise_set.reps,
+                'weight': exercise_set.weight,
+                'notes': exercise_set.notes
+            })
+
+    history = {}
+    for subtype, workout in rows:
+        workout_exercises = list(exercises.get(workout.id, {}).values())
+        for exercise in workout_exercises:
+            weights = [s['weight'] for s in exercise['sets'] if s['weight']]
+            reps = [s['reps'] for s in exercise['sets'] if s['reps']]
+            exercise['total_sets'] = len(exercise['sets'])
+            exercise['max_weight'] = max(weights) if weights else None
+            exercise['max_reps'] = max(reps) if reps else None
+        history[subtype] = {
+            'last_workout': {
+                'id': workout.id,
+                'name': workout.name,
+                'duration': workout.duration,
+                'intensity': workout.intensity,
+                'distance': workout.distance,
+                'date': workout.created_at,
+                'created_at': workout.created_at.isoformat() if workout.created_at else None,
+                'notes': workout.notes,
+                'exercises': workout_exercises
+            }
+        }
+    return history
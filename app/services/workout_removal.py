@@ -0,0 +1,60 @@
+from app import db
+from app.models.workout import Workout
+from app.models.exercise import Exercise
+from app.models.exercise_set import ExerciseSet
+from app.services import workout_events
+from sqlalchemy import select, delete, func
+
+# Set-based workout deletion. Exercises and sets go with their workout through
+# the ON DELETE CASCADE foreign keys; SQLite does not enforce those unless the
+# foreign_keys pragma is on (and older tables were created without them), so
+# there the children are deleted explicitly, still one statement per table.
+# The owner's XP and level move by the removed workouts' XP, read with one
+# aggregate query. Nothing here commits.
+
+
+def _cascades():
+    return db.engine.dialect.name != 'sqlite'
+
+
+def _delete_where(*criteria):
+    """Delete the workouts matching `criteria` together with their exercises and sets."""
+    if not _cascades():
+        workout_ids = select(Workout.id).where(*criteria)
+        exercise_ids = select(Exercise.id).where(Exercise.workout_id.in_(workout_ids))
+        db.session.execute(
+            delete(ExerciseSet).where(ExerciseSet.exercise_id.in_(exercise_ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            delete(Exercise).where(Exercise.workout_id.in_(workout_ids))
+            .execution_options(synchronize_session=False)
+        )
+    return db.session.execute(delete(Workout).where(*criteria)).rowcount
+
+
+def delete_workout(workout, user):
+    """Delete one of `user`'s workouts and take it out of their derived data.
+
+    Returns the XP removed from the user.
+    """
+    xp_removed = workout.xp_earned or 0
+    workout_events.workout_removed(workout)
+    _delete_where(Workout.id == workout.id)
+    user.adjust_xp(-xp_removed)
+    return xp_removed
+
+
+def clear_workouts(user):
+    """Delete all of `user`'s workouts and reset their derived data.
+
+    Returns {'workouts', 'xp'} for what was removed.
+    """
+    workouts, xp = db.session.execute(
+        select(func.count(Workout.id), func.coalesce(func.sum(Workout.xp_earned), 0))
+        .where(Workout.user_id == user.id)
+    ).one()
+    _delete_where(Workout.user_id == user.id)
+    workout_events.workouts_cleared(user)
+    user.adjust_xp(-int(xp))
+    return {'workouts': workouts, 'xp': int(xp)}
@@ -0,0 +1,210 @@
+from app import db
+from app.models.workout import Workout
+from app.models.exercise import Exercise
+from app.models.exercise_set import ExerciseSet
+from sqlalchemy import select, func, bindparam, literal_column, JSON
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+# Hot read paths for workout and exercise history as SQLAlchemy Core
+# statements. Each statement is built once per dialect and cached, and the
+# per-exercise sets are folded into one JSON array with the dialect's own
+# aggregate: json_agg on PostgreSQL, json_group_array on SQLite. Other
+# databases read the sets with a second query instead.
+
+_statements = {}
+
+JSON_AGG_DIALECTS = ('postgresql', 'sqlite')
+
+SET_FIELDS = ('set_number', 'reps', 'weight', 'notes')
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def _statement(name, build):
+    """Return the cached statement `name` for the current dialect."""
+    key = (name, _dialect())
+    stmt = _statements.get(key)
+    if stmt is None:
+        stmt = _statements[key] = build(key[1])
+    return stmt
+
+
+def _sets_agg(dialect):
+    """Aggregate an exercise's sets into a JSON array of objects."""
+    fields = []
+    for field in SET_FIELDS:
+        # Keys are inlined so the JSON builders never see an untyped parameter
+        fields.extend([literal_column(f"'{field}'"), getattr(ExerciseSet, field)])
+
+    if dialect == 'postgresql':
+        agg = func.json_agg(aggregate_order_by(func.json_build_object(*fields), ExerciseSet.set_number), type_=JSON)
+    else:
+        # json_group_array has no ORDER BY; sets are sorted after decoding
+        agg = func.json_group_array(func.json_object(*fields), type_=JSON)
+    # Exercises without sets get NULL instead of [{null...}]
+    return agg.filter(ExerciseSet.id.is_not(None))
+
+
+def _decode_sets(sets):
+    return sorted(sets or [], key=lambda s: s['set_number'] or 0)
+
+
+def _ranked_exercises():
+    """A user's exercises with the given names, numbered newest first per name."""
+    return (
+        select(
+            Exercise.id,
+            Exercise.name,
+            Workout.created_at,
+            func.row_number().over(
+                partition_by=Exercise.name,
+                order_by=(Workout.created_at.desc(), Exercise.id.desc())
+            ).label('rn')
+        )
+        .join(Workout, Workout.id == Exercise.workout_id)
+        .where(
+            Workout.user_id == bindparam('user_id'),
+            Exercise.name.in_(bindparam('names', expanding=True))
+        )
+        .subquery()
+    )
+
+
+def _build_exercise_histories(dialect):
+    """Latest exercises per name for a user, with their sets, in one query.
+
+    Without a JSON aggregate the sets column is left out; see _build_sets_for.
+    """
+    ranked = _ranked_exercises()
+    if dialect not in JSON_AGG_DIALECTS:
+        return (
+            select(ranked.c.id, ranked.c.name, ranked.c.created_at)
+            .where(ranked.c.rn <= bindparam('limit'))
+            .order_by(ranked.c.name, ranked.c.created_at.desc(), ranked.c.id.desc())
+        )
+    return (
+        select(ranked.c.name, ranked.c.created_at, _sets_agg(dialect).label('sets'))
+        .select_from(ranked)
+        .outerjoin(ExerciseSet, ExerciseSet.exercise_id == ranked.c.id)
+        .where(ranked.c.rn <= bindparam('limit'))
+        .group_by(ranked.c.id, ranked.c.name, ranked.c.created_at)
+        .order_by(ranked.c.name, ranked.c.created_at.desc(), ranked.c.id.desc())
+    )
+
+
+def _build_sets_for(dialect):
+    """Sets of several exercises, for databases without a JSON aggregate."""
+    return (
+        select(ExerciseSet.exercise_id, *(getattr(ExerciseSet, field) for field in SET_FIELDS))
+        .where(ExerciseSet.exercise_id.in_(bindparam('exercise_ids', expanding=True)))
+        .order_by(ExerciseSet.exercise_id, ExerciseSet.set_number)
+    )
+
+
+def _build_last_workout(dialect):
+    """Latest workout of a subtype, including legacy strength workouts named after it."""
+    return (
+        select(
+            Workout.id,
+            Workout.name,
+            Workout.duration,
+            Workout.intensity,
+            Workout.distance,
+            Workout.created_at,
+            Workout.notes
+        )
+        .where(
+            Workout.user_id == bindparam('user_id'),
+            (Workout.subtype == bindparam('workout_type')) | (
+                Workout.subtype.is_(None)
+                & (Workout.type == 'strength')
+                & func.lower(Workout.name).like(bindparam('name_pattern'))
+            )
+        )
+        .order_by(Workout.created_at.desc(), Workout.id.desc())
+        .limit(1)
+    )
+
+
+def _build_exercise_summaries(dialect):
+    """Per-exercise set totals for one workout."""
+    return (
+        select(
+            Exercise.id,
+            Exercise.name,
+            func.count(ExerciseSet.id).label('total_sets'),
+            func.max(ExerciseSet.weight).label('max_weight'),
+            func.max(ExerciseSet.reps).label('max_reps'),
+            func.sum(ExerciseSet.weight * ExerciseSet.reps).label('total_volume')
+        )
+        .outerjoin(ExerciseSet, ExerciseSet.exercise_id == Exercise.id)
+        .where(Exercise.workout_id == bindparam('workout_id'))
+        .group_by(Exercise.id, Exercise.name)
+        .order_by(Exercise.id)
+    )
+
+
+def exercise_histories(user_id, names, limit=5):
+    """Return {name: [{'date', 'sets'}, ...]} with the latest `limit` entries per exercise name."""
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    rows = db.session.execute(
+        _statement('exercise_histories', _build_exercise_histories),
+        {'user_id': user_id, 'names': names, 'limit': limit}
+    ).all()
+    if _dialect() not in JSON_AGG_DIALECTS:
+        rows = _attach_sets(rows)
+    history = {}
+    for name, created_at, sets in rows:
+        history.setdefault(name, []).append({'date': created_at, 'sets': _decode_sets(sets)})
+    return history
+
+
+def _attach_sets(rows):
+    """Turn (id, name, created_at) rows into (name, created_at, sets) with one extra query."""
+    sets = {row.id: [] for row in rows}
+    if sets:
+        for set_row in db.session.execute(
+            _statement('sets_for', _build_sets_for), {'exercise_ids': list(sets)}
+        ):
+            sets[set_row.exercise_id].append({field: getattr(set_row, field) for field in SET_FIELDS})
+    return [(row.name, row.created_at, sets[row.id]) for row in rows]
+
+
+def last_workout(user_id, workout_type):
+    """Return the latest workout of a type with per-exercise set totals, or None."""
+    workout = db.session.execute(
+        _statement('last_workout', _build_last_workout),
+        {
+            'user_id': user_id,
+            'workout_type': workout_type,
+            'name_pattern': '%' + workout_type.replace('strength_', '').replace('_', ' ').lower() + '%'
+        }
+    ).first()
+    if not workout:
+        return None
+
+    exercises = db.session.execute(
+        _statement('exercise_summaries', _build_exercise_summaries),
+        {'workout_id': workout.id}
+    )
+    return {
+        'id': workout.id,
+        'name': workout.name,
+        'duration': workout.duration,
+        'intensity': workout.intensity,
+        'distance': workout.distance,
+        'date': workout.created_at.isoformat() if workout.created_at else None,
+        'created_at': workout.created_at.isoformat() if workout.created_at else None,
+        'notes': workout.notes,
+        'exercises': [{
+            'name': ex.name,
+            'total_sets': ex.total_sets,
+            'max_weight': ex.max_weight,
+            'max_reps': ex.max_reps,
+            'total_volume': ex.total_volume
+        } for ex in exercises]
+    }
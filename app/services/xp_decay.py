@@ -0,0 +1,43 @@
+from datetime import datetime
+
+# XP decay after inactivity: once the grace period after the last workout
+# is over, each day removes `rate` of the remaining XP. Decay that has
+# already been written (tracked by last_decay_applied_at) is never
+# counted twice.
+
+DEFAULT_RATE = 0.05
+DEFAULT_GRACE_DAYS = 3
+
+
+def days_in_decay(last_workout_date, grace_days, at):
+    """Number of decaying days between the grace period end and `at`."""
+    if not last_workout_date or not at:
+        return 0
+    if grace_days is None:
+        grace_days = DEFAULT_GRACE_DAYS
+    return max(0, (at - last_workout_date).days - grace_days)
+
+
+def pending_decay_days(last_workout_date, last_decay_applied_at, grace_days, now=None):
+    """Number of decaying days that have not been written to XP yet."""
+    now = now or datetime.utcnow()
+    total = days_in_decay(last_workout_date, grace_days, now)
+    # A marker from before the last workout belongs to an older inactivity streak
+    if last_decay_applied_at and last_workout_date and last_decay_applied_at >= last_workout_date:
+        total -= days_in_decay(last_workout_date, grace_days, last_decay_applied_at)
+    return max(0, total)
+
+
+def xp_lost(xp, rate, days):
+    """XP removed by `days` days of compounding decay."""
+    if days <= 0 or not xp or xp <= 0:
+        return 0
+    if rate is None:
+        rate = DEFAULT_RATE
+    return int(xp * (1 - pow(1 - rate, days)))
+
+
+def effective_xp(xp, rate, last_workout_date, last_decay_applied_at, grace_days, now=None):
+    """XP after projecting decay that has not been written yet, from a user's columns."""
+    days = pending_decay_days(last_workout_date, last_decay_applied_at, grace_days, now)
+    return max(0, (xp or 0) - xp_lost(xp, rate, days))
@@ -0,0 +1,121 @@
+from app import db
+from app.models.user import User
+from app.models.workout import Workout
+from app.services import dashboard, leveling
+from sqlalchemy import select, update, func
+import logging
+import time
+
+# Reconciles users' XP and level with the XP their workouts earned:
+# XP = SUM(xp_earned) over the user's workouts, level from the level curve.
+# Written XP decay is not kept, the same as the per-user recalculation has
+# always done.
+
+XP_CHUNK_SIZE = 1000
+
+
+def compute_user_xp(user_id):
+    """Total XP earned by a user's workouts, with one aggregate query."""
+    return int(db.session.scalar(
+        select(func.coalesce(func.sum(Workout.xp_earned), 0)).where(Workout.user_id == user_id)
+    ))
+
+
+def reconcile_user_xp(user, dry_run=False):
+    """Recompute one user's XP and level from their workouts (no commit).
+
+    Returns the change as {'id', 'username', 'old_xp', 'new_xp', 'old_level',
+    'new_level'}; with dry_run the user is left untouched.
+    """
+    xp = compute_user_xp(user.id)
+    change = {
+        'id': user.id,
+        'username': user.username,
+        'old_xp': user.xp,
+        'new_xp': xp,
+        'old_level': user.level,
+        'new_level': leveling.level_for_xp(xp),
+    }
+    if not dry_run:
+        user.xp = change['new_xp']
+        user.level = change['new_level']
+        dashboard.invalidate(user.id)
+    return change
+
+
+def reconcile_all_xp(chunk_size=XP_CHUNK_SIZE, dry_run=False):
+    """Recompute every user's XP and level from their workouts.
+
+    Users are walked in primary-key chunks; each chunk costs one grouped
+    SUM over workout and one bulk UPDATE for the users whose XP or level
+    drifted. With dry_run nothing is written. The report lists every
+    change under 'changes'.
+    """
+    return _reconcile(chunk_size, dry_run, from_workouts=True)
+
+
+def relevel_all(chunk_size=XP_CHUNK_SIZE, dry_run=False):
+    """Recompute every user's level from their stored XP, leaving XP as is."""
+    return _reconcile(chunk_size, dry_run, from_workouts=False)
+
+
+def _reconcile(chunk_size, dry_run, from_workouts):
+    started = time.perf_counter()
+    report = {'scanned': 0, 'updated': 0, 'chunks': 0, 'xp_delta': 0, 'changes': [],
+              'dry_run': dry_run, 'elapsed': 0.0}
+
+    last_id = 0
+    try:
+        while True:
+            users = db.session.execute(
+                select(User.id, User.username, User.xp, User.level)
+                .where(User.id > last_id).order_by(User.id).limit(chunk_size)
+            ).all()
+            if not users:
+                break
+            first_id, last_id = users[0].id, users[-1].id
+            report['scanned'] += len(users)
+            report['chunks'] += 1
+
+            if from_workouts:
+                earned = dict(db.session.execute(
+                    select(Workout.user_id, func.coalesce(func.sum(Workout.xp_earned), 0))
+                    .where(Workout.user_id.between(first_id, last_id))
+                    .group_by(Workout.user_id)
+                ).all())
+                xp_values = [int(earned.get(user.id, 0)) for user in users]
+            else:
+                xp_values = [user.xp or 0 for user in users]
+            levels = leveling.batch_level_for_xp(xp_values)
+
+            updates = []
+            for user, xp, level in zip(users, xp_values, levels):
+                if (user.xp, user.level) == (xp, level):
+                    continue
+                updates.append({'id': user.id, 'xp': xp, 'level': level})
+                report['xp_delta'] += xp - (user.xp or 0)
+                report['changes'].append({
+                    'id': user.id,
+                    'username': user.username,
+                    'old_xp': user.xp,
+                    'new_xp': xp,
+                    'old_level': user.level,
+                    'new_level': level,
+                })
+
+            if updates and not dry_run:
+                db.session.execute(update(User), updates)
+                dashboard.invalidate(*(u['id'] for u in updates))
+                db.session.commit()
+            report['updated'] += len(updates)
+    except Exception as e:
+        logging.error(f"Error reconciling XP and levels: {str(e)}")
+        db.session.rollback()
+        report['error'] = str(e)
+
+    report['elapsed'] = time.perf_counter() - started
+    logging.info(
+        f"XP: scanned {report['scanned']} users, "
+        f"{'would update' if dry_run else 'updated'} {report['updated']} in {report['elapsed']:.2f}s"
+    )
+    return report
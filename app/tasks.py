@@ -1,18 +1,106 @@
 from app import db
 from app.models.user import User
-from datetime import datetime
+from app.services import dashboard, leveling, xp_decay
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, or_, bindparam
 import logging
+import time
 
-def apply_xp_decay_to_all_users():
-    """Apply XP decay to all users who haven't worked out recently."""
+DECAY_CHUNK_SIZE = 1000
+
+def apply_xp_decay_to_all_users(chunk_size=DECAY_CHUNK_SIZE, now=None):
+    """Apply XP decay to all users who haven't worked out recently.
+
+    Users are processed in primary-key chunks: one narrow SELECT and one
+    bulk UPDATE (new xp, level and decay marker) per chunk, committed per
+    chunk. Users already processed today are skipped, so running the job
+    more than once a day is a no-op.
+
+    Each UPDATE only applies while the user's xp still equals the value
+    read, so XP gained in between is never overwritten; such users keep
+    no decay marker and are decayed on the next run.
+    """
+    now = now or datetime.utcnow()
+    start_of_day = datetime(now.year, now.month, now.day)
+    started = time.perf_counter()
+    report = {'scanned': 0, 'decayed': 0, 'xp_removed': 0, 'chunks': 0, 'elapsed': 0.0}
+
+    eligible = select(
+        User.id,
+        User.xp,
+        User.last_workout_date,
+        User.last_decay_applied_at,
+        User.xp_decay_rate,
+        User.xp_decay_grace_days,
+    ).where(
+        User.last_workout_date.isnot(None),
+        User.last_workout_date < now - timedelta(days=1),
+        User.xp > 0,
+        or_(User.last_decay_applied_at.is_(None), User.last_decay_applied_at < start_of_day),
+    ).order_by(User.id).limit(chunk_size)
+
+    users = User.__table__
+    apply_decay = update(users).where(
+        users.c.id == bindparam('uid'),
+        users.c.xp == bindparam('old_xp'),
+    ).values(
+        xp=bindparam('new_xp'),
+        level=bindparam('new_level'),
+        last_decay_applied_at=bindparam('decayed_at'),
+    )
+
+    last_id = 0
     try:
-        users = User.query.all()
-        for user in users:
-            xp_lost = user.apply_xp_decay()
-            if xp_lost > 0:
-                logging.info(f"User {user.username} lost {xp_lost} XP due to inactivity")
+        while True:
+            rows = db.session.execute(eligible.where(User.id > last_id)).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            report['scanned'] += len(rows)
+            report['chunks'] += 1
+
+            updates = []
+            for row in rows:
+                days = xp_decay.pending_decay_days(
+                    row.last_workout_date, row.last_decay_applied_at, row.xp_decay_grace_days, now
+                )
+                lost = xp_decay.xp_lost(row.xp, row.xp_decay_rate, days)
+                if lost <= 0:
+                    continue
+                new_xp = max(0, row.xp - lost)
+                updates.append({
+                    'uid': row.id,
+                    'old_xp': row.xp,
+                    'new_xp': new_xp,
+                    'new_level': leveling.level_for_xp(new_xp),
+                    'decayed_at': now,
+                })
+
+            if updates:
+                # Executemany UPDATE keyed on primary key and the xp we read
+                result = db.session.execute(apply_decay, updates)
+                if result.rowcount != len(updates):
+                    # Some users gained XP since the SELECT; keep only the rows that applied
+                    applied = set(db.session.scalars(
+                        select(User.id).where(
+                            User.id.in_([u['uid'] for u in updates]),
+                            User.last_decay_applied_at == now,
+                        )
+                    ))
+                    updates = [u for u in updates if u['uid'] in applied]
+                if updates:
+                    dashboard.invalidate(*(u['uid'] for u in updates))
+                report['decayed'] += len(updates)
+                report['xp_removed'] += sum(u['old_xp'] - u['new_xp'] for u in updates)
+            db.session.commit()
     except Exception as e:
         logging.error(f"Error applying XP decay: {str(e)}")
         db.session.rollback()
-    finally:
-        db.session.commit() 
\ No newline at end of file
+        report['error'] = str(e)
+
+    report['elapsed'] = time.perf_counter() - started
+    logging.info(
+        f"XP decay: scanned {report['scanned']} users in {report['chunks']} chunks, "
+        f"decayed {report['decayed']} users by {report['xp_removed']} XP in {report['elapsed']:.2f}s"
+    )
+    return report
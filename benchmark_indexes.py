@@ -0,0 +1,195 @@
+"""Benchmark the hot queries with and without their indexes.
+
+Seeds a scratch database, then runs EXPLAIN and times every hot query first
+without the tuned indexes and again after creating them.
+
+    python benchmark_indexes.py --users 200 --workouts 200
+    python benchmark_indexes.py --database-url postgresql://localhost/scratch
+
+Without --database-url a temporary SQLite file is used. A given database must
+be empty: tables are created and seeded there and indexes are dropped.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+HOT_QUERIES = [
+    ('workout feed page', """
+        SELECT id, name, created_at FROM workout
+        WHERE user_id = :user_id
+        ORDER BY created_at DESC, id DESC LIMIT 21"""),
+    ('latest workout of subtype', """
+        SELECT id, name, created_at FROM workout
+        WHERE user_id = :user_id AND subtype = :subtype
+        ORDER BY created_at DESC, id DESC LIMIT 1"""),
+    ('workouts in date range', """
+        SELECT count(*) FROM workout
+        WHERE user_id = :user_id AND created_at >= :since"""),
+    ('exercises of workout', """
+        SELECT id, name FROM exercise WHERE workout_id = :workout_id ORDER BY id"""),
+    ('exercise history', """
+        SELECT e.id, w.created_at FROM exercise e JOIN workout w ON w.id = e.workout_id
+        WHERE e.user_id = :user_id AND e.name = :exercise_name
+        ORDER BY w.created_at DESC LIMIT 5"""),
+    ('sets of exercise', """
+        SELECT set_number, reps, weight FROM exercise_set
+        WHERE exercise_id = :exercise_id ORDER BY set_number"""),
+    ('pending friend requests', """
+        SELECT id, user_id FROM friendship
+        WHERE friend_id = :user_id AND status = 'pending' ORDER BY created_at"""),
+    ('accepted friends (reverse)', """
+        SELECT user_id FROM friendship WHERE friend_id = :user_id AND status = 'accepted'"""),
+    ('challenges of user', """
+        SELECT challenge_id FROM challenge_participant WHERE user_id = :user_id"""),
+]
+
+EXERCISES = ['Bench Press', 'Squat', 'Deadlift', 'Overhead Press', 'Pull-up', 'Bent Over Row', 'Lunge', 'Dips']
+SUBTYPES = {
+    'cardio': ['cardio_running', 'cardio_cycling', 'cardio_swimming'],
+    'strength': ['strength_push', 'strength_pull', 'strength_lower', 'strength_full'],
+}
+
+
+def seed(db, users, workouts_per_user, friends_per_user):
+    from sqlalchemy import insert
+    from app.models.user import User
+    from app.models.workout import Workout
+    from app.models.exercise import Exercise
+    from app.models.exercise_set import ExerciseSet
+    from app.models.friendship import Friendship
+
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    db.session.execute(insert(User), [
+        {'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': 'x', 'xp': 0, 'level': 1}
+        for i in range(1, users + 1)
+    ])
+
+    workouts, exercises, sets = [], [], []
+    workout_id = exercise_id = 0
+    for user_id in range(1, users + 1):
+        for _ in range(workouts_per_user):
+            workout_id += 1
+            workout_type = rng.choice(['cardio', 'strength'])
+            workouts.append({
+                'id': workout_id, 'user_id': user_id, 'type': workout_type,
+                'subtype': rng.choice(SUBTYPES[workout_type]), 'name': f'{workout_type} session',
+                'duration': rng.randint(20, 90), 'intensity': rng.randint(1, 10), 'xp_earned': 100,
+                'created_at': now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60)),
+            })
+            if workout_type != 'strength':
+                continue
+            for name in rng.sample(EXERCISES, 4):
+                exercise_id += 1
+                exercises.append({'id': exercise_id, 'workout_id': workout_id, 'user_id': user_id,
+                                  'name': name, 'type': 'strength'})
+                for set_number in range(1, 4):
+                    sets.append({'exercise_id': exercise_id, 'user_id': user_id, 'set_number': set_number,
+                                 'reps': rng.randint(3, 12), 'weight': rng.randint(20, 150)})
+
+    friendships = set()
+    for user_id in range(1, users + 1):
+        for friend_id in rng.sample(range(1, users + 1), min(friends_per_user, users - 1)):
+            if friend_id != user_id and (friend_id, user_id) not in friendships:
+                friendships.add((user_id, friend_id))
+
+    for model, rows in ((Workout, workouts), (Exercise, exercises), (ExerciseSet, sets)):
+        for start in range(0, len(rows), 5000):
+            db.session.execute(insert(model), rows[start:start + 5000])
+    db.session.execute(insert(Friendship), [
+        {'user_id': a, 'friend_id': b, 'status': rng.choice(['accepted', 'accepted', 'pending', 'rejected']),
+         'created_at': now}
+        for a, b in friendships
+    ])
+    db.session.commit()
+    return {'users': users, 'workouts': len(workouts), 'exercises': len(exercises),
+            'sets': len(sets), 'friendships': len(friendships)}
+
+
+def tuned_indexes():
+    """Non-unique indexes declared on the models for the hot paths."""
+    from app.models.workout import Workout
+    from app.models.exercise import Exercise
+    from app.models.exercise_set import ExerciseSet
+    from app.models.friendship import Friendship
+    from app.models.challenge import ChallengeParticipant
+
+    return [index for model in (Workout, Exercise, ExerciseSet, Friendship, ChallengeParticipant)
+            for index in model.__table__.indexes if not index.unique]
+
+
+def measure(db, params, runs):
+    from sqlalchemy import text
+
+    explain = 'EXPLAIN QUERY PLAN ' if db.engine.dialect.name == 'sqlite' else 'EXPLAIN '
+    results = {}
+    for label, sql in HOT_QUERIES:
+        plan = db.session.execute(text(explain + sql), params).all()
+        started = time.perf_counter()
+        for _ in range(runs):
+            db.session.execute(text(sql), params).all()
+        elapsed_ms = (time.perf_counter() - started) * 1000 / runs
+        # SQLite plans end with the detail column; PostgreSQL returns one text column
+        results[label] = (elapsed_ms, [str(row[-1]) for row in plan])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='Empty scratch database (default: temporary SQLite file).')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--workouts', type=int, default=200, help='Workouts per user.')
+    parser.add_argument('--friends', type=int, default=20, help='Friend requests per user.')
+    parser.add_argument('--runs', type=int, default=50, help='Timed executions per query.')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+
+    from sqlalchemy import text
+    from app import create_app, db
+    from app.models.user import User
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if User.query.first() is not None:
+            raise SystemExit('The benchmark database must be empty.')
+
+        started = time.perf_counter()
+        counts = seed(db, args.users, args.workouts, args.friends)
+        print(f"Seeded {counts} in {time.perf_counter() - started:.1f}s")
+
+        sample = db.session.execute(text("""
+            SELECT w.user_id, w.id, e.id, e.name FROM workout w JOIN exercise e ON e.workout_id = w.id
+            ORDER BY w.id LIMIT 1""")).one()
+        params = {
+            'user_id': sample[0], 'workout_id': sample[1], 'exercise_id': sample[2], 'exercise_name': sample[3],
+            'subtype': 'strength_push', 'since': datetime.utcnow() - timedelta(days=30),
+        }
+
+        indexes = tuned_indexes()
+        for index in indexes:
+            index.drop(db.engine, checkfirst=True)
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+        before = measure(db, params, args.runs)
+
+        for index in indexes:
+            index.create(db.engine, checkfirst=True)
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+        after = measure(db, params, args.runs)
+
+    for label, _ in HOT_QUERIES:
+        (before_ms, before_plan), (after_ms, after_plan) = before[label], after[label]
+        speedup = before_ms / after_ms if after_ms else float('inf')
+        print(f"\n{label}: {before_ms:.3f} ms -> {after_ms:.3f} ms ({speedup:.1f}x)")
+        print("  before: " + "\n          ".join(before_plan))
+        print("  after:  " + "\n          ".join(after_plan))
+
+
+if __name__ == '__main__':
+    main()
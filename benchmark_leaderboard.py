@@ -0,0 +1,125 @@
+"""Benchmark the XP leaderboard at scale.
+
+Seeds a scratch database with synthetic users, then times leaderboard pages,
+rank lookups by indexed COUNT, the in-memory RankIndex, and the naive
+sort-everyone rank for comparison.
+
+    python benchmark_leaderboard.py --users 1000000
+    python benchmark_leaderboard.py --database-url postgresql://localhost/scratch
+
+Without --database-url a temporary SQLite file is used. A given database must
+be empty: tables are created and seeded there.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+
+def seed(db, users, batch_size=50000):
+    from sqlalchemy import insert
+    from app.models.user import User
+
+    rng = random.Random(0)
+    for start in range(1, users + 1, batch_size):
+        rows = []
+        for i in range(start, min(start + batch_size, users + 1)):
+            # Long tail: most players have little XP, a few have a lot
+            xp = int(rng.paretovariate(1.2) * 300) - 300
+            rows.append({'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com',
+                         'password_hash': 'x', 'xp': min(xp, 500000), 'level': 1})
+        db.session.execute(insert(User), rows)
+    db.session.commit()
+
+
+def timed(fn, runs):
+    started = time.perf_counter()
+    for _ in range(runs):
+        result = fn()
+    return (time.perf_counter() - started) * 1000 / runs, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='Empty scratch database (default: temporary SQLite file).')
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=200, help='Rank lookups per method.')
+    parser.add_argument('--naive-runs', type=int, default=3, help='Runs of the sort-everyone rank.')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+
+    from sqlalchemy import select, text
+    from app import create_app, db
+    from app.models.user import User
+    from app.services import leaderboard
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if User.query.first() is not None:
+            raise SystemExit('The benchmark database must be empty.')
+
+        started = time.perf_counter()
+        seed(db, args.users)
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+        print(f"Seeded {args.users} users in {time.perf_counter() - started:.1f}s")
+
+        rng = random.Random(1)
+        sample = [db.session.get(User, rng.randint(1, args.users)) for _ in range(args.lookups)]
+        middle = sample[0]
+        explain = 'EXPLAIN QUERY PLAN ' if db.engine.dialect.name == 'sqlite' else 'EXPLAIN '
+        plan = db.session.execute(text(
+            explain + 'SELECT count(id) FROM "user" WHERE xp > :xp'
+        ), {'xp': middle.xp}).all()
+        print("\nrank COUNT plan: " + " / ".join(str(row[-1]) for row in plan))
+
+        results = []
+        ms, _ = timed(lambda: leaderboard.get_page(page=1), 20)
+        results.append(('top page (50 users)', ms))
+        deep = args.users // 2 // leaderboard.DEFAULT_PAGE_SIZE
+        ms, _ = timed(lambda: leaderboard.get_page(page=deep), 5)
+        results.append((f'page {deep}', ms))
+        ms, _ = timed(lambda: leaderboard.get_page(page=1, tier='Gold'), 20)
+        results.append(('Gold tier top page', ms))
+
+        lookups = iter(sample * 20)
+        ms, _ = timed(lambda: leaderboard.get_rank(next(lookups)), len(sample))
+        results.append(('rank by indexed COUNT', ms))
+
+        def naive_rank(user):
+            ordered = db.session.execute(select(User.id).order_by(User.xp.desc(), User.id)).scalars().all()
+            return ordered.index(user.id) + 1
+        ms, naive = timed(lambda: naive_rank(middle), args.naive_runs)
+        results.append(('rank by sorting every user', ms))
+
+        ms, index = timed(lambda: leaderboard.RankIndex.load(), 1)
+        results.append(('RankIndex load', ms))
+        app.config['LEADERBOARD_MEMORY_INDEX'] = True
+        leaderboard._rank_index = index
+        ms, _ = timed(lambda: leaderboard.get_page(page=1), 20)
+        results.append(('top page, RankIndex total', ms))
+        app.config['LEADERBOARD_MEMORY_INDEX'] = False
+        lookups = iter(sample * 2000)
+        ms, _ = timed(lambda: index.rank((u := next(lookups)).xp, u.id), len(sample) * 1000)
+        results.append(('rank by RankIndex', ms))
+        lookups = iter(sample * 2000)
+        ms, _ = timed(lambda: index.rank((u := next(lookups)).xp, u.id, tier='Gold'), len(sample) * 1000)
+        results.append(('tier rank by RankIndex', ms))
+
+        by_count = leaderboard.get_rank(middle)
+        by_index = index.rank(middle.xp, middle.id)
+        assert by_count['rank'] == by_index['rank'] == naive, (by_count, by_index, naive)
+        print(f"user {middle.id} ({middle.xp} XP): rank {by_count['rank']} of {by_count['total']}, "
+              f"ahead of {by_count['percentile']}%; RankIndex holds {len(index)} keys "
+              f"in {index.keys.itemsize * len(index) / 1e6:.1f} MB")
+
+    print()
+    for label, ms in results:
+        print(f"{label:32s} {ms:10.4f} ms")
+
+
+if __name__ == '__main__':
+    main()
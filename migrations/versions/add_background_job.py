@@ -0,0 +1,48 @@
+"""add background_job table
+
+Revision ID: add_background_job
+Revises: add_strava_sync_cursor
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_background_job'
+down_revision = 'add_strava_sync_cursor'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Check if the table exists
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'background_job' not in inspector.get_table_names():
+        op.create_table('background_job',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('job_type', sa.String(length=50), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('payload', sa.Text(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('max_attempts', sa.Integer(), nullable=False),
+            sa.Column('run_at', sa.DateTime(), nullable=False),
+            sa.Column('locked_at', sa.DateTime(), nullable=True),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('result', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_background_job_status_run_at', 'background_job', ['status', 'run_at'])
+        op.create_index('ix_background_job_user_type', 'background_job', ['user_id', 'job_type'])
+
+
+def downgrade():
+    op.drop_index('ix_background_job_user_type', table_name='background_job')
+    op.drop_index('ix_background_job_status_run_at', table_name='background_job')
+    op.drop_table('background_job')
@@ -0,0 +1,34 @@
+"""add maintained progress columns to challenge_participant
+
+Revision ID: add_challenge_participant_progress
+Revises: add_last_decay_applied_at
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_challenge_participant_progress'
+down_revision = 'add_last_decay_applied_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Check if the columns exist
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    columns = [col['name'] for col in inspector.get_columns('challenge_participant')]
+    
+    if 'current_value' not in columns:
+        op.add_column('challenge_participant', sa.Column('current_value', sa.Float(), nullable=True, server_default='0'))
+    if 'workout_count' not in columns:
+        op.add_column('challenge_participant', sa.Column('workout_count', sa.Integer(), nullable=True, server_default='0'))
+    
+    # Existing rows are filled in by `flask rebuild-challenge-progress`
+
+
+def downgrade():
+    op.drop_column('challenge_participant', 'workout_count')
+    op.drop_column('challenge_participant', 'current_value')
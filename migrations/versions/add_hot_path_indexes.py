@@ -0,0 +1,47 @@
+"""add indexes for the hot query paths
+
+Revision ID: add_hot_path_indexes
+Revises: add_workout_feed_indexes
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_path_indexes'
+down_revision = 'add_workout_feed_indexes'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, partial index condition)
+INDEXES = [
+    ('ix_exercise_workout_id', 'exercise', ['workout_id'], None),
+    ('ix_exercise_user_name', 'exercise', ['user_id', 'name'], None),
+    ('ix_exercise_set_exercise_number', 'exercise_set', ['exercise_id', 'set_number'], None),
+    ('ix_friendship_friend_status', 'friendship', ['friend_id', 'status'], None),
+    ('ix_friendship_pending', 'friendship', ['friend_id', 'created_at'], "status = 'pending'"),
+    ('ix_challenge_participant_user', 'challenge_participant', ['user_id'], None),
+]
+
+
+def upgrade():
+    # Check which tables and indexes exist
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for name, table, columns, where in INDEXES:
+        if table not in tables:
+            continue
+        if name in {index['name'] for index in inspector.get_indexes(table)}:
+            continue
+        kwargs = {}
+        if where:
+            kwargs = {'postgresql_where': sa.text(where), 'sqlite_where': sa.text(where)}
+        op.create_index(name, table, columns, **kwargs)
+
+
+def downgrade():
+    for name, table, columns, where in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
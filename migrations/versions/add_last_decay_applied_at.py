@@ -0,0 +1,29 @@
+"""add last_decay_applied_at to user
+
+Revision ID: add_last_decay_applied_at
+Revises: fix_workout_id_column
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_last_decay_applied_at'
+down_revision = 'fix_workout_id_column'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Check if the column exists
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    columns = [col['name'] for col in inspector.get_columns('user')]
+    
+    if 'last_decay_applied_at' not in columns:
+        op.add_column('user', sa.Column('last_decay_applied_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('user', 'last_decay_applied_at')
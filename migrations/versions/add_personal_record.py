@@ -0,0 +1,39 @@
+"""add personal_record table
+
+Revision ID: add_personal_record
+Revises: add_background_job
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_personal_record'
+down_revision = 'add_background_job'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Check if the table exists
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'personal_record' not in inspector.get_table_names():
+        op.create_table('personal_record',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('exercise_name', sa.String(length=100), nullable=False),
+            sa.Column('metric', sa.String(length=20), nullable=False),
+            sa.Column('value', sa.Float(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id', 'exercise_name', 'metric', name='uq_personal_record_user_exercise_metric')
+        )
+        # Populate with 'flask rebuild-personal-records'
+
+
+def downgrade():
+    op.drop_table('personal_record')
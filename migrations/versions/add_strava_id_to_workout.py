@@ -0,0 +1,32 @@
+"""add strava_id to workout
+
+Revision ID: add_strava_id_to_workout
+Revises: add_challenge_participant_progress
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_strava_id_to_workout'
+down_revision = 'add_challenge_participant_progress'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Check if the column exists
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    columns = [col['name'] for col in inspector.get_columns('workout')]
+    
+    if 'strava_id' not in columns:
+        op.add_column('workout', sa.Column('strava_id', sa.String(length=50), nullable=True))
+        # Unique index backs the batched duplicate check during Strava imports
+        op.create_index('ix_workout_strava_id', 'workout', ['strava_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_workout_strava_id', table_name='workout')
+    op.drop_column('workout', 'strava_id')
@@ -0,0 +1,29 @@
+"""add strava_sync_cursor to user
+
+Revision ID: add_strava_sync_cursor
+Revises: add_strava_id_to_workout
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_strava_sync_cursor'
+down_revision = 'add_strava_id_to_workout'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Check if the column exists
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    columns = [col['name'] for col in inspector.get_columns('user')]
+    
+    if 'strava_sync_cursor' not in columns:
+        op.add_column('user', sa.Column('strava_sync_cursor', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('user', 'strava_sync_cursor')
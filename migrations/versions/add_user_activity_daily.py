@@ -0,0 +1,43 @@
+"""add user_activity_daily rollup table
+
+Revision ID: add_user_activity_daily
+Revises: add_workout_cascade_deletes
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_activity_daily'
+down_revision = 'add_workout_cascade_deletes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Check if the table exists
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'user_activity_daily' not in inspector.get_table_names():
+        op.create_table('user_activity_daily',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('type', sa.String(length=50), nullable=False),
+            sa.Column('subtype', sa.String(length=50), nullable=False),
+            sa.Column('workouts', sa.Integer(), nullable=False),
+            sa.Column('distance', sa.Float(), nullable=False),
+            sa.Column('duration', sa.Integer(), nullable=False),
+            sa.Column('calories', sa.Integer(), nullable=False),
+            sa.Column('xp', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id', 'day', 'type', 'subtype', name='uq_user_activity_daily_bucket')
+        )
+        # Populate with 'flask backfill-activity-rollup'
+
+
+def downgrade():
+    op.drop_table('user_activity_daily')
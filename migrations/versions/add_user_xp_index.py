@@ -0,0 +1,28 @@
+"""add the (xp DESC, id) leaderboard index on user
+
+Revision ID: add_user_xp_index
+Revises: add_user_activity_daily
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_xp_index'
+down_revision = 'add_user_activity_daily'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Check if the index exists
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'ix_user_xp_id' not in {index['name'] for index in inspector.get_indexes('user')}:
+        op.create_index('ix_user_xp_id', 'user', [sa.text('xp DESC'), 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_user_xp_id', table_name='user')
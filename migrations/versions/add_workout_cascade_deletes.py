@@ -0,0 +1,56 @@
+"""delete exercises and sets with their workout
+
+Revision ID: add_workout_cascade_deletes
+Revises: add_hot_path_indexes
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_workout_cascade_deletes'
+down_revision = 'add_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+# (table, column, referred table)
+FOREIGN_KEYS = [
+    ('exercise', 'workout_id', 'workout'),
+    ('exercise_set', 'exercise_id', 'exercise'),
+]
+
+
+def _replace_foreign_keys(ondelete):
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for table, column, referred in FOREIGN_KEYS:
+        if table not in tables:
+            continue
+        for fk in inspector.get_foreign_keys(table):
+            if fk['constrained_columns'] != [column] or fk['referred_table'] != referred:
+                continue
+            if (fk.get('options') or {}).get('ondelete') == ondelete:
+                continue
+            op.drop_constraint(fk['name'], table, type_='foreignkey')
+            op.create_foreign_key(fk['name'], table, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    # Remove rows orphaned by earlier bulk deletes that bypassed the ORM
+    op.execute("DELETE FROM exercise WHERE workout_id NOT IN (SELECT id FROM workout)")
+    op.execute("DELETE FROM exercise_set WHERE exercise_id NOT IN (SELECT id FROM exercise)")
+
+    # SQLite cannot alter constraints in place; the app deletes children
+    # explicitly there (see app/services/workout_removal.py)
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    _replace_foreign_keys(None)
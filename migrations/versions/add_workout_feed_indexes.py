@@ -0,0 +1,37 @@
+"""add keyset pagination indexes to workout
+
+Revision ID: add_workout_feed_indexes
+Revises: add_personal_record
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_workout_feed_indexes'
+down_revision = 'add_personal_record'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_workout_user_created': ['user_id', 'created_at', 'id'],
+    'ix_workout_user_type_created': ['user_id', 'type', 'created_at', 'id'],
+    'ix_workout_user_subtype_created': ['user_id', 'subtype', 'created_at', 'id'],
+}
+
+
+def upgrade():
+    # Check which indexes exist
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    existing = {index['name'] for index in inspector.get_indexes('workout')}
+
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'workout', columns)
+
+
+def downgrade():
+    for name in INDEXES:
+        op.drop_index(name, table_name='workout')
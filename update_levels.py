@@ -1,14 +1,12 @@
-from app import create_app, db
-from app.models.user import User
+from app import create_app
+from app.services.xp_reconcile import relevel_all
 
 app = create_app()
 
 with app.app_context():
-    users = User.query.all()
-    for user in users:
-        old_level = user.level
-        user.update_level()
-        print(f"Updated {user.username}: Level {old_level} -> {user.level} (XP: {user.xp})")
+    # Same as `flask relevel-users`: chunked bulk updates of the users whose level changed
+    report = relevel_all()
+    for change in report['changes']:
+        print(f"Updated {change['username']}: Level {change['old_level']} -> {change['new_level']} (XP: {change['new_xp']})")
     
-    db.session.commit()
-    print("All user levels have been updated!") 
\ No newline at end of file
+    print("All user levels have been updated!")